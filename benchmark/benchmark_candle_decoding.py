@@ -0,0 +1,46 @@
+"""
+Micro-benchmark comparing the per-candle prepare_candle() path with the bulk decode_candles() path, on synthetic v20 candlesticks.
+Like the other entry points, run it from the src folder: python3 ../benchmark/benchmark_candle_decoding.py
+"""
+import os
+import sys
+import time
+from types import SimpleNamespace
+from typing import Callable, List
+
+from pandas import DataFrame
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark.synthetic_data import create_v20_candles  # noqa: E402
+from src.util.CandleDecoding import decode_candles, decoded_candles_to_dataframe  # noqa: E402
+from src.util.Utilities import prepare_candle  # noqa: E402
+
+PAGE_SIZE: int = 5000
+PAGES: int = 20
+
+
+def decode_with_prepare_candle(candles: List[SimpleNamespace]) -> DataFrame:
+    return DataFrame([prepare_candle(vars(candle)) for candle in candles if candle.complete])
+
+
+def decode_in_bulk(candles: List[SimpleNamespace]) -> DataFrame:
+    return decoded_candles_to_dataframe(decode_candles(candles))
+
+
+def measure(decode: Callable[[List[SimpleNamespace]], DataFrame], page: List[SimpleNamespace]) -> float:
+    """
+    :return: Candles decoded per second.
+    """
+    start: float = time.perf_counter()
+    for _ in range(PAGES):
+        decode(page)
+    return PAGES * len(page) / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    v20_candles: List[SimpleNamespace] = create_v20_candles(PAGE_SIZE)
+    before: float = measure(decode_with_prepare_candle, v20_candles)
+    after: float = measure(decode_in_bulk, v20_candles)
+    print("prepare_candle: {:>12,.0f} candles/s".format(before))
+    print("decode_candles: {:>12,.0f} candles/s ({:.1f}x)".format(after, after / before))
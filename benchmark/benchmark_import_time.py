@@ -0,0 +1,103 @@
+"""
+Cold-start benchmark for the entry points. Each entry point is imported in a fresh interpreter, from a folder outside any project
+root and without credentials, to check that importing has no side effects, and the median wall time of REPEATS imports is compared
+against the baseline stored in baseline.json. The exit code is 1 if an import fails, loads a plotting library, or is slower than the
+baseline by more than REGRESSION_TOLERANCE.
+
+Usage: python3 benchmark/benchmark_import_time.py [--save-baseline]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+PROJECT_FOLDER: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILENAME: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+BASELINE_KEY: str = 'import_time'
+ENTRY_POINTS: List[str] = ['src.real_time_trading_main', 'src.backtesting_main']
+# Only needed for plotting, so they must not be imported on startup.
+DEFERRED_MODULES: List[str] = ['plotly', 'seaborn', 'matplotlib']
+REPEATS: int = 5
+REGRESSION_TOLERANCE: float = 0.25
+
+IMPORT_SCRIPT: str = """
+import importlib, json, sys
+importlib.import_module(sys.argv[1])
+print(json.dumps([module for module in sys.argv[2:] if module in sys.modules]))
+"""
+
+
+def measure(entry_point: str) -> float:
+    """
+    :return: The wall time to start an interpreter and import the entry point, in seconds.
+    """
+    with tempfile.TemporaryDirectory() as working_directory:
+        start: float = time.perf_counter()
+        process = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT, entry_point, *DEFERRED_MODULES], cwd=working_directory,
+                                 env=dict(os.environ, PYTHONPATH=PROJECT_FOLDER), capture_output=True, text=True)
+        seconds: float = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError("Importing {} failed:\n{}".format(entry_point, process.stderr))
+    loaded_modules: List[str] = json.loads(process.stdout.splitlines()[-1])
+    if loaded_modules:
+        raise RuntimeError("Importing {} loaded {}".format(entry_point, ', '.join(loaded_modules)))
+    return seconds
+
+
+def load_baseline() -> Dict:
+    if not os.path.exists(BASELINE_FILENAME):
+        return {}
+    with open(BASELINE_FILENAME) as file:
+        return json.load(file)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--save-baseline', action='store_true', help="Store the results as the new baseline, keeping other stored results.")
+    arguments = parser.parse_args()
+
+    baseline: Dict = load_baseline()
+    failures: List[str] = []
+    print("{:<28} {:>12} {:>12} {:>16} {:>8}".format('entry point', 'median ms', 'min ms', 'baseline ms', 'change'))
+    for entry_point in ENTRY_POINTS:
+        try:
+            # The first import compiles the bytecode, which a restart would not have to do.
+            measure(entry_point)
+            timings: List[float] = [measure(entry_point) for _ in range(REPEATS)]
+        except RuntimeError as e:
+            print("{:<28} failed: {}".format(entry_point, e), flush=True)
+            failures.append(entry_point)
+            continue
+        median_seconds: float = statistics.median(timings)
+        baseline_seconds: float | None = baseline.get(BASELINE_KEY, {}).get(entry_point, {}).get('seconds')
+        change: str = ''
+        if baseline_seconds:
+            relative_change: float = median_seconds / baseline_seconds - 1
+            change = '{:+.0%}'.format(relative_change)
+            if relative_change > REGRESSION_TOLERANCE:
+                change += ' REGRESSION'
+                failures.append(entry_point)
+        print("{:<28} {:>12.0f} {:>12.0f} {:>16} {:>8}".format(entry_point, median_seconds * 1e3, min(timings) * 1e3,
+                                                               '{:.0f}'.format(baseline_seconds * 1e3) if baseline_seconds else '-', change), flush=True)
+        if arguments.save_baseline:
+            baseline.setdefault(BASELINE_KEY, {})[entry_point] = {'seconds': median_seconds}
+
+    if arguments.save_baseline:
+        with open(BASELINE_FILENAME, 'w') as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+        print("Saved baseline to {}".format(BASELINE_FILENAME))
+    if failures:
+        print("Failed or slower than the baseline by more than {:.0%}: {}".format(REGRESSION_TOLERANCE, ', '.join(failures)))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""
+Throughput and memory benchmarks for the backtesting and live trading hot paths, on deterministic synthetic data.
+Each benchmark runs at each size in its own process, and reports items per second and the growth of the process' peak memory
+while it ran (setup excluded). Results are compared against the stored baseline, and the exit code is 1 if any benchmark is
+slower than the baseline by more than REGRESSION_TOLERANCE.
+
+Usage: python3 benchmark/benchmark_suite.py [--sizes 10000 1000000] [--benchmarks ma_crossover_iterate candle_generator] [--save-baseline]
+The benchmarks run in a temporary project root, so they do not need credentials or downloaded data.
+Per-item benchmarks cycle through CHUNK_SIZE inputs, so that the largest sizes fit in memory.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import synthetic_data  # noqa: E402
+
+BASELINE_FILENAME: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+CREDENTIALS_TEMPLATE_FILENAME: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'configuration', 'credentials_template.json')
+SIZES: List[int] = [10_000, 1_000_000, 10_000_000]
+CHUNK_SIZE: int = 10_000
+REGRESSION_TOLERANCE: float = 0.25
+PAIR: str = 'EUR_USD'
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    # What is counted, e.g. bars or quotes.
+    unit: str
+    # Prepares the inputs for a size. Not timed.
+    setup: Callable[[int], Any]
+    # Processes size items, given the output of setup.
+    run: Callable[[Any, int], None]
+
+
+def _cycle(items: List[Any], size: int):
+    return itertools.islice(itertools.cycle(items), size)
+
+
+def setup_prepare_candle(_: int) -> List[Dict[str, Any]]:
+    return [vars(candle) for candle in synthetic_data.create_v20_candles(CHUNK_SIZE)]
+
+
+def run_prepare_candle(candles: List[Dict[str, Any]], size: int) -> None:
+    from src.util.Utilities import prepare_candle
+    for candle in _cycle(candles, size):
+        prepare_candle(candle)
+
+
+def _create_ma_crossover_generator(**kwargs):
+    from src.model.Granularity import Granularity
+    from src.service.signal_generators.MovingAverageCrossoverSignalGenerator import MovingAverageCrossoverSignalGenerator
+    return MovingAverageCrossoverSignalGenerator(PAIR, -4, Granularity.M5, short_window=16, long_window=64, **kwargs)
+
+
+def setup_iterate_from_dataframe(size: int):
+    return _create_ma_crossover_generator(), synthetic_data.create_candles(size)
+
+
+def run_iterate_from_dataframe(inputs, _: int) -> None:
+    signal_generator, candles = inputs
+    signal_generator.iterate_from_dataframe(candles)
+
+
+def setup_ma_crossover_iterate(_: int):
+    # Bounded, as when trading live.
+    return _create_ma_crossover_generator(max_iterations_in_memory=CHUNK_SIZE), synthetic_data.create_candle_objects(CHUNK_SIZE)
+
+
+def run_ma_crossover_iterate(inputs, size: int) -> None:
+    signal_generator, candles = inputs
+    for candle in _cycle(candles, size):
+        signal_generator.iterate(candle)
+
+
+def setup_candle_generator(_: int):
+    return synthetic_data.create_quotes(CHUNK_SIZE)
+
+
+def run_candle_generator(quotes, size: int) -> None:
+    from src.model.Granularity import Granularity
+    from src.service.CandleGenerator import CandleGenerator
+    for start in range(0, size, CHUNK_SIZE):
+        # Quote times restart with each chunk, so restart the generator too.
+        candle_generator: CandleGenerator = CandleGenerator(PAIR, Granularity.M1)
+        for quote in quotes[:min(CHUNK_SIZE, size - start)]:
+            candle_generator.generate(quote)
+
+
+def setup_candle_serialisation(_: int):
+    return synthetic_data.create_candle_objects(CHUNK_SIZE)
+
+
+def run_candle_serialisation(candles, size: int) -> None:
+    from src.model.candle.Candle import Candle
+    for candle in _cycle(candles, size):
+        Candle.deserialise(candle.serialise())
+
+
+def run_binary_candle_serialisation(candles, size: int) -> None:
+    from src.util.CandleWireFormat import decode_candles, encode_candles
+    for start in range(0, size, CHUNK_SIZE):
+        decode_candles(*encode_candles(candles[:min(CHUNK_SIZE, size - start)], 'binary'))
+
+
+def setup_generate_signals_dataframe(size: int):
+    from src.model.Granularity import Granularity
+    from src.service.signal_generators.InsideBarMomentumSignalGenerator import InsideBarMomentumSignalGenerator
+    signal_generator: InsideBarMomentumSignalGenerator = InsideBarMomentumSignalGenerator(PAIR, -4, Granularity.H4)
+    # Candle times do not matter to the signals, and 10M H4 candles would not fit in datetime64[ns].
+    signal_generator.generate_signals_for_backtesting(synthetic_data.create_candles(size), use_pips=True, vectorised=True)
+    return signal_generator
+
+
+def run_generate_signals_dataframe(signal_generator, _: int) -> None:
+    signal_generator.generate_signals_dataframe()
+
+
+def setup_evaluate_ma_crossover_sweep(size: int):
+    from src.model.Granularity import Granularity
+    from src.service.signal_generators.MovingAverageCrossoverSweep import MovingAverageCrossoverSweep
+    # Few windows, so that the signal matrix of the largest size fits in memory.
+    sweep: MovingAverageCrossoverSweep = MovingAverageCrossoverSweep(PAIR, -4, Granularity.M5, [16, 64, 256])
+    sweep.generate_signals_for_backtesting(synthetic_data.create_candles(size))
+    return sweep
+
+
+def run_evaluate_ma_crossover_sweep(sweep, _: int) -> None:
+    sweep.evaluate()
+
+
+def setup_backtester_run(size: int):
+    """
+    Stores size M5 candles for a pair, to backtest the inside bar momentum indicator on H4 candles resampled from them.
+    """
+    import pandas as pd
+    from src.model.Granularity import Granularity
+    from src.util.Constants import get_instruments_filename
+    from src.util.Utilities import get_candle_store
+    candles = synthetic_data.create_candles(size)
+    from_time, to_time = candles['time'].iloc[0].to_pydatetime(), candles['time'].iloc[-1].to_pydatetime() + Granularity.M5.value
+    os.makedirs(os.path.dirname(get_instruments_filename()), exist_ok=True)
+    pd.DataFrame({'name': [PAIR], 'pipLocation': [-4]}).to_pickle(get_instruments_filename())
+    get_candle_store().append(PAIR, Granularity.M5, candles, from_time, to_time)
+    os.makedirs('test_results', exist_ok=True)
+    return from_time, to_time
+
+
+def run_backtester_run(times, _: int) -> None:
+    from src.app.Backtester import Backtester
+    from src.model.Granularity import Granularity
+    from src.model.Indicator import Indicator
+    from_time, to_time = times
+    backtester: Backtester = Backtester(indicator=Indicator.INSIDE_BAR_MOMENTUM, use_downloaded_currency_pairs=True)
+    backtester.run(currencies=['EUR', 'USD'], trade_granularity=Granularity.H4, simulation_granularity=Granularity.M5, from_time=from_time,
+                   to_time=to_time, use_only_downloaded_price_data=True, file_type='csv')
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark('prepare_candle', 'candles', setup_prepare_candle, run_prepare_candle),
+    Benchmark('iterate_from_dataframe', 'bars', setup_iterate_from_dataframe, run_iterate_from_dataframe),
+    Benchmark('ma_crossover_iterate', 'bars', setup_ma_crossover_iterate, run_ma_crossover_iterate),
+    Benchmark('candle_generator', 'quotes', setup_candle_generator, run_candle_generator),
+    Benchmark('candle_serialisation', 'candles', setup_candle_serialisation, run_candle_serialisation),
+    Benchmark('binary_candle_serialisation', 'candles', setup_candle_serialisation, run_binary_candle_serialisation),
+    Benchmark('generate_signals_dataframe', 'bars', setup_generate_signals_dataframe, run_generate_signals_dataframe),
+    Benchmark('evaluate_ma_crossover_sweep', 'bars', setup_evaluate_ma_crossover_sweep, run_evaluate_ma_crossover_sweep),
+    Benchmark('backtester_run', 'bars', setup_backtester_run, run_backtester_run),
+]
+
+
+def _read_memory_status(field: str) -> int | None:
+    """
+    :return: A memory field of /proc/self/status (e.g. VmRSS or VmHWM), in bytes, or None where it is not available.
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def _start_peak_memory_measurement() -> int:
+    """
+    Resets the peak memory of the process where the OS allows it.
+    :return: The memory to measure the growth of the peak memory from, in bytes.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return _read_memory_status('VmRSS')
+    except OSError:
+        return _get_peak_memory_bytes()
+
+
+def _get_peak_memory_bytes() -> int:
+    peak_memory: int | None = _read_memory_status('VmHWM')
+    if peak_memory is not None:
+        return peak_memory
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak_memory if sys.platform == 'darwin' else peak_memory * 1024
+
+
+def measure(benchmark_index: int, size: int) -> Tuple[float, int]:
+    """
+    Runs a benchmark in a temporary project root. Call in a fresh process, so that the peak memory is the benchmark's own.
+    :return: The run time in seconds, and the growth of the peak memory during the run, in bytes.
+    """
+    benchmark: Benchmark = BENCHMARKS[benchmark_index]
+    project_root: str = os.path.join(tempfile.mkdtemp(), 'fxbot')
+    os.makedirs(os.path.join(project_root, 'src'))
+    os.makedirs(os.path.join(project_root, 'configuration'))
+    shutil.copy(CREDENTIALS_TEMPLATE_FILENAME, os.path.join(project_root, 'configuration', 'credentials.json'))
+    os.chdir(os.path.join(project_root, 'src'))
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            inputs: Any = benchmark.setup(size)
+            peak_memory_before: int = _start_peak_memory_measurement()
+            start: float = time.perf_counter()
+            benchmark.run(inputs, size)
+            seconds: float = time.perf_counter() - start
+        return seconds, max(_get_peak_memory_bytes() - peak_memory_before, 0)
+    finally:
+        shutil.rmtree(os.path.dirname(project_root), ignore_errors=True)
+
+
+def load_baseline() -> Dict[str, Dict[str, Dict[str, float]]]:
+    if not os.path.exists(BASELINE_FILENAME):
+        return {}
+    with open(BASELINE_FILENAME) as file:
+        return json.load(file)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--benchmarks', nargs='+', choices=[benchmark.name for benchmark in BENCHMARKS], default=[benchmark.name for benchmark in BENCHMARKS])
+    parser.add_argument('--save-baseline', action='store_true', help="Store the results as the new baseline, keeping other stored results.")
+    arguments = parser.parse_args()
+
+    baseline: Dict[str, Dict[str, Dict[str, float]]] = load_baseline()
+    regressions: List[str] = []
+    print("{:<28} {:>12} {:>24} {:>10} {:>16} {:>8}".format('benchmark', 'size', 'rate', 'peak MB', 'baseline rate', 'change'))
+    for benchmark_index, benchmark in enumerate(BENCHMARKS):
+        if benchmark.name not in arguments.benchmarks:
+            continue
+        for size in arguments.sizes:
+            try:
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                    seconds, peak_memory = executor.submit(measure, benchmark_index, size).result()
+            except BrokenProcessPool:
+                print("{:<28} {:>12,} {:>24}".format(benchmark.name, size, 'failed (out of memory?)'), flush=True)
+                continue
+            except Exception as e:
+                print("{:<28} {:>12,} {:>24}: {}".format(benchmark.name, size, 'failed', e), flush=True)
+                continue
+            rate: float = size / seconds
+            result: Dict[str, float] = {'rate': rate, 'peak_memory_mb': peak_memory / 2 ** 20}
+            baseline_result: Dict[str, float] | None = baseline.get(benchmark.name, {}).get(str(size))
+            change: str = ''
+            if baseline_result:
+                relative_change: float = rate / baseline_result['rate'] - 1
+                change = '{:+.0%}'.format(relative_change)
+                if relative_change < -REGRESSION_TOLERANCE:
+                    change += ' REGRESSION'
+                    regressions.append('{} ({:,})'.format(benchmark.name, size))
+            print("{:<28} {:>12,} {:>24} {:>10.1f} {:>16} {:>8}".format(
+                benchmark.name, size, '{:,.0f} {}/s'.format(rate, benchmark.unit), result['peak_memory_mb'],
+                '{:,.0f}'.format(baseline_result['rate']) if baseline_result else '-', change), flush=True)
+            if arguments.save_baseline:
+                baseline.setdefault(benchmark.name, {})[str(size)] = result
+
+    if arguments.save_baseline:
+        with open(BASELINE_FILENAME, 'w') as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+        print("Saved baseline to {}".format(BASELINE_FILENAME))
+    if regressions:
+        print("Slower than the baseline by more than {:.0%}: {}".format(REGRESSION_TOLERANCE, ', '.join(regressions)))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
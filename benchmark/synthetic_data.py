@@ -0,0 +1,61 @@
+"""
+Deterministic synthetic market data for the benchmarks. The same size and seed always give the same data.
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.model.Quote import Quote
+from src.model.candle.Candle import Candle
+from src.model.candle.Price import CANDLES_DF_COLUMNS
+
+START_TIME: datetime = datetime(2020, 1, 6)
+SPREAD: float = 0.0001
+
+
+def create_candles(size: int, seed: int = 0, frequency: str = '5min') -> DataFrame:
+    """
+    :return: Candles in the CANDLES_DF_COLUMNS schema, following a random walk around 1.1.
+    """
+    random: np.random.Generator = np.random.default_rng(seed)
+    mid_closes: np.ndarray = 1.1 + np.cumsum(random.normal(0, 0.0002, size))
+    mid_opens: np.ndarray = np.concatenate(([1.1], mid_closes[:-1]))
+    mid_highs: np.ndarray = np.maximum(mid_opens, mid_closes) + random.exponential(0.0001, size)
+    mid_lows: np.ndarray = np.minimum(mid_opens, mid_closes) - random.exponential(0.0001, size)
+    candles: DataFrame = DataFrame({'time': pd.date_range(START_TIME, periods=size, freq=frequency),
+                                    'volume': random.integers(1, 200, size).astype(np.float64)})
+    for price_type, offset in (('ask', SPREAD / 2), ('bid', -SPREAD / 2), ('mid', 0.0)):
+        for suffix, prices in (('o', mid_opens), ('h', mid_highs), ('l', mid_lows), ('c', mid_closes)):
+            candles['{}_{}'.format(price_type, suffix)] = prices + offset
+    return candles[CANDLES_DF_COLUMNS]
+
+
+def create_candle_objects(size: int, seed: int = 0) -> List[Candle]:
+    return [Candle(*values) for values in create_candles(size, seed).itertuples(index=False, name=None)]
+
+
+def create_quotes(size: int, seed: int = 0) -> List[Quote]:
+    """
+    :return: One quote per second, following a random walk around 1.1.
+    """
+    random: np.random.Generator = np.random.default_rng(seed)
+    mids: np.ndarray = 1.1 + np.cumsum(random.normal(0, 0.00002, size))
+    return [Quote(time=START_TIME + timedelta(seconds=index), ask=mid + SPREAD / 2, bid=mid - SPREAD / 2, mid=mid)
+            for index, mid in enumerate(mids.tolist())]
+
+
+def create_v20_candles(size: int) -> List[SimpleNamespace]:
+    """
+    :return: Stand-ins for v20 candlesticks requested with price='MBA', with prices as strings as the API returns them.
+    """
+    candles: List[SimpleNamespace] = []
+    for index in range(size):
+        price: str = '{:.5f}'.format(1.1 + (index % 1000) / 1e5)
+        prices = SimpleNamespace(o=price, h=price, l=price, c=price)
+        candles.append(SimpleNamespace(complete=True, time='{}.000000000'.format(1717372800 + index * 5), volume=index % 50,
+                                       mid=prices, bid=prices, ask=prices))
+    return candles
@@ -1,25 +1,25 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-import itertools
 import sys
-from typing import List, Dict, Tuple
+from typing import Any, List, Dict, Set, Tuple
 
 import pandas as pd
 from pandas import DataFrame
 
-# from math import isnan
-
 from src.client.DataClient import DataClient
 
-from src.util.Constants import INSTRUMENTS_FILENAME
+from src.util.InstrumentRegistry import get_instrument_registry, InstrumentRegistry
 from src.util.PlotProperties import PlotProperties
 from src.util.IndicatorEvaluation import IndicatorEvaluation
-from src.util.Utilities import get_downloaded_price_data_for_pair
-from src.util.CandlePlotter import CandlePlotter
-from src.service.signal_generators.MovingAverageCrossoverSignalGenerator import MovingAverageCrossoverSignalGenerator
-# from src.service.signal_generators.SignalGenerator import SignalGenerator
-# from src.model.Trade import Trade
+from src.util.SharedCandles import SharedCandles, SharedCandlesHandle
+from src.util.ResultStore import ResultStore, get_result_key, hash_candles
+from src.util.Utilities import get_downloaded_price_data_for_pair, get_result_store
+from src.util.CandleResampler import CandleResampler
+from src.service.signal_generators.MovingAverageCrossoverSweep import MovingAverageCrossoverSweep
+from src.service.signal_generators.InsideBarMomentumSignalGenerator import InsideBarMomentumSignalGenerator
+from src.service.TradeSimulator import TradeSimulator, TRADE_COLUMNS
 from src.model.Granularity import Granularity
 from src.model.Indicator import Indicator
 
@@ -29,29 +29,63 @@ else:
     from typing import Literal
 
 
+def _simulate_ma_crossover_for_shared_candles(ma_windows: List[int], pair: str, pip_location: float, granularity: Granularity,
+                                              candles_handle: SharedCandlesHandle,
+                                              ma_pairs_to_plot: List[Tuple[int, int]],
+                                              window_pairs: List[Tuple[int, int]] | None) -> Tuple[List[IndicatorEvaluation], Dict[Tuple[str, int, int], DataFrame]]:
+    """
+    Worker process entry point for Backtester.simulate_ma_crossover_in_parallel.
+    """
+    candle_data, shared_memory = candles_handle.attach()
+    try:
+        return Backtester.sweep_ma_crossover(ma_windows, pair, pip_location, granularity, candle_data, ma_pairs_to_plot, window_pairs)
+    finally:
+        del candle_data
+        for memory in shared_memory:
+            memory.close()
+
+
 class Backtester:
-    def __init__(self, indicator: Indicator = Indicator.MA_CROSSOVER, use_downloaded_currency_pairs: bool = True, data_range_for_plotting: PlotProperties = PlotProperties()):
+    def __init__(self, indicator: Indicator = Indicator.MA_CROSSOVER, use_downloaded_currency_pairs: bool = True, data_range_for_plotting: PlotProperties = PlotProperties(),
+                 result_store: ResultStore | None = None):
+        """
+        :param result_store: Where results are stored, so that reruns skip the combinations already computed. Defaults to the project's
+        results database.
+        """
         self.data_client: DataClient = DataClient(live=False)
-        self.instruments: DataFrame = (pd.read_pickle(INSTRUMENTS_FILENAME) if use_downloaded_currency_pairs
-                                       else self.data_client.get_instruments_and_save_to_file())
+        self.instrument_registry: InstrumentRegistry = get_instrument_registry()
+        if not use_downloaded_currency_pairs:
+            self.instrument_registry.refresh(self.data_client)
         self.indicator: Indicator = indicator
         self.data_range_for_plotting: PlotProperties = data_range_for_plotting
         self.plot_data: Dict[Tuple[str, int, int] | str, DataFrame] = {}
+        self.result_store: ResultStore = result_store or get_result_store()
 
-    def get_price_data_for_pair(self, pair: str, granularity: Granularity, from_time: datetime, to_time: datetime, use_only_downloaded_price_data: bool) -> DataFrame:
+    def get_price_data_for_pair(self, pair: str, granularity: Granularity, from_time: datetime, to_time: datetime, use_only_downloaded_price_data: bool,
+                                source_granularity: Granularity | None = None) -> DataFrame:
+        """
+        :param source_granularity: If provided and the candles are not stored, downloads candles of this finer granularity instead,
+        and resamples them. Use when the finer candles are needed anyway, so that they serve both granularities.
+        """
         price_data: DataFrame = get_downloaded_price_data_for_pair(pair, granularity, from_time, to_time)
         if price_data.size != 0:
             return price_data
         if use_only_downloaded_price_data:
             raise IOError("No price data found for pair '{}'. Skipping pair - please enable \"use_only_downloaded_data\".".format(pair))
-        return self.data_client.create_data_for_pair(pair, granularity, from_time, to_time)
+        if source_granularity is not None and CandleResampler.can_resample(source_granularity, granularity):
+            self.data_client.fill_gaps_for_pair(pair, source_granularity, from_time, to_time)
+            price_data = get_downloaded_price_data_for_pair(pair, granularity, from_time, to_time)
+            if price_data.size != 0:
+                return price_data
+        return self.data_client.create_data_for_pair(pair, granularity, from_time, to_time, incremental=True)
 
     def get_price_data_for_all_combinations_of_currencies(self,
                                                           currencies: List[str],
                                                           granularity: Granularity,
                                                           use_only_downloaded_price_data: bool,
                                                           from_time: datetime,
-                                                          to_time: datetime) -> Dict[str, DataFrame]:
+                                                          to_time: datetime,
+                                                          source_granularity: Granularity | None = None) -> Dict[str, DataFrame]:
         """
         For all selected currency combinations, retrieve historical price data. Look for downloaded prices first. If not found, download from OANDA.
         :param currencies: Currencies to pair up and retrieve data for.
@@ -59,16 +93,17 @@ class Backtester:
         :param use_only_downloaded_price_data: If True, skips pairs without downloaded data. If false, retrieves data from OANDA for pairs without downloaded data.
         :param from_time: The start date and time to download the price data from.
         :param to_time: The end date and time to download the price data to.
+        :param source_granularity: A finer granularity to download and resample from, if the price data is not stored.
         :return: A dictionary with pairs and their corresponding historical trade data.
         """
         currency_data: Dict[str, DataFrame] = {}
         for curr1 in currencies:
             for curr2 in currencies:
                 pair = '{}_{}'.format(curr1, curr2)
-                if (curr1 == curr2) or pair not in self.instruments['name'].unique():
+                if (curr1 == curr2) or not self.instrument_registry.is_valid_pair(pair):
                     continue
                 try:
-                    currency_data[pair] = self.get_price_data_for_pair(pair, granularity, from_time, to_time, use_only_downloaded_price_data)
+                    currency_data[pair] = self.get_price_data_for_pair(pair, granularity, from_time, to_time, use_only_downloaded_price_data, source_granularity)
                 except IOError as e:
                     print(e)
                     continue
@@ -94,6 +129,8 @@ class Backtester:
         print(results)
 
     def plot_results_for_selected_data(self):
+        # Plotly is only imported when plotting, so that backtesting without plots starts faster.
+        from src.util.CandlePlotter import CandlePlotter
         if not self.plot_data:
             raise ValueError("No data saved for plotting.")
 
@@ -113,80 +150,111 @@ class Backtester:
                     .format(self.indicator.value, pair, plot_start, plot_end)
                 CandlePlotter(data, plot_start, plot_end).plot_candles_for_inside_bar_momentum(title)
 
-    def simulate_ma_crossover(self, ma_windows: List[int], pair: str, pip_location: int, granularity: Granularity, candle_data: DataFrame, results: List[IndicatorEvaluation]):
-        for short_window, long_window in itertools.combinations(ma_windows, 2):
-            if short_window >= long_window:
-                continue
-            signal_generator: MovingAverageCrossoverSignalGenerator = MovingAverageCrossoverSignalGenerator(pair, pip_location, granularity, short_window, long_window)
-            signal_generator.generate_signals_for_backtesting(candle_data, use_pips=True)
-            results.append(signal_generator.evaluate_indicator())
+    @staticmethod
+    def sweep_ma_crossover(ma_windows: List[int], pair: str, pip_location: float, granularity: Granularity, candle_data: DataFrame,
+                           ma_pairs_to_plot: List[Tuple[int, int]],
+                           window_pairs: List[Tuple[int, int]] | None = None) -> Tuple[List[IndicatorEvaluation], Dict[Tuple[str, int, int], DataFrame]]:
+        """
+        Evaluates the MA crossover indicator for all combinations of the given windows on a single pair.
+        :param ma_pairs_to_plot: The window pairs to return the signals of, for plotting.
+        :param window_pairs: If provided, only these window pairs are evaluated, e.g. those without stored results.
+        :return: The evaluation of each window pair, and the signals to be plotted.
+        """
+        sweep: MovingAverageCrossoverSweep = MovingAverageCrossoverSweep(pair, pip_location, granularity, ma_windows, window_pairs)
+        sweep.generate_signals_for_backtesting(candle_data)
+        results: List[IndicatorEvaluation] = []
+        plot_data: Dict[Tuple[str, int, int], DataFrame] = {}
+        for (short_window, long_window), evaluation in sweep.evaluate_indicators().items():
+            results.append(evaluation)
             # Save data to be plotted
-            if pair in self.data_range_for_plotting.currency_pairs and (short_window, long_window) in self.data_range_for_plotting.ma_pairs:
-                self.plot_data[(pair, short_window, long_window)] = signal_generator.generate_signals_dataframe()
-
-    # TODO: Implement the signal generator for this indicator and re-enable backtesting
-    # def simulate_inside_bar_momentum(self,
-    #                                  pair: str,
-    #                                  results: List[IndicatorEvaluation],
-    #                                  signal_generator: SignalGenerator,
-    #                                  simulation_granularity: Granularity,
-    #                                  from_time: datetime,
-    #                                  to_time: datetime,
-    #                                  use_only_downloaded_price_data: bool):
-    #     if simulation_granularity not in [Granularity.S5, Granularity.S10, Granularity.S15, Granularity.S30, Granularity.M1, Granularity.M2, Granularity.M3, Granularity.M4, Granularity.M5]:
-    #         raise ValueError("The simulation granularity is too coarse for te inside bar momentum simulation. Please choose a granularity finer than M5.")
-    #     signal_generator.generate_signals_for_backtesting(use_pips=True)
-    #     simulation_data: DataFrame = self.get_price_data_for_pair(pair, simulation_granularity, from_time, to_time, use_only_downloaded_price_data)
-    #     simulation_data = self.sort_and_reset(simulation_data)
-    #
-    #     signal_cols = ['time', 'signal', 'entry_stop', 'stop_loss', 'take_profit']
-    #     sim_data_tmp: DataFrame = pd.merge_asof(signal_generator.signals[signal_cols], simulation_data, on='time', tolerance=simulation_granularity.value, direction='nearest')
-    #     simulation_data = simulation_data.merge(sim_data_tmp[signal_cols], how='left', on='time')
-    #     del sim_data_tmp
-    #     simulation_data = self.sort_and_reset(simulation_data[simulation_data[simulation_data['signal'].notna()].index[0]:])  # Remove candles until the first trade, won't make a diff.
-    #
-    #     non_materialised_trades: List[Dict[str, Any]] = []
-    #     closed_trades: List[Dict[str, Any]] = []
-    #     current_trade: Trade | None = Trade(simulation_data.iloc[0])
-    #     closed_trade_already_saved: bool = False
-    #
-    #     for index, row in simulation_data.iterrows():
-    #         # Our trade is closed and there are no new trades. Keep skipping.
-    #         if closed_trade_already_saved and isnan(row['signal']):
-    #             continue
-    #
-    #         current_trade.update(row)
-    #
-    #         # --- CASE WHEN WE HAVE A NEW TRADE. ---
-    #         if not isnan(row['signal']):
-    #             if current_trade.is_open():  # Check whether the previous trade is open.
-    #                 current_trade.close_trade(row)  # If so, close and append to the non-materialised trades list.
-    #                 non_materialised_trades.append(vars(current_trade))
-    #             current_trade = Trade(row)  # Create a new trade from the current row.
-    #             closed_trade_already_saved = False  # New trade! Not already saved.
-    #             continue  # We don't want to update the trade (We just opened it), so skip the rest.
-    #
-    #         # --- CASE WHEN THE TRADE IS CLOSED ---
-    #         if current_trade.exit_time is not None and not closed_trade_already_saved:
-    #             closed_trades.append(vars(current_trade))
-    #             closed_trade_already_saved = True
-    #
-    #     closed_trades_df: DataFrame = DataFrame(closed_trades)
-    #     closed_trades_df['trade_closed'] = True
-    #     non_materialised_trades_df: DataFrame = DataFrame(non_materialised_trades)
-    #     non_materialised_trades_df.drop(columns=['signal', 'entry_stop', 'stop_loss', 'take_profit', '_Trade__trade_is_open'], inplace=True)
-    #     non_materialised_trades_df['trade_closed'] = False
-    #
-    #     simulation_data = simulation_data.merge(closed_trades_df[['time', 'entry_time', 'entry_price', 'exit_time', 'exit_price', 'trade_closed']], how='left', on='time')
-    #     simulation_data = simulation_data[~simulation_data['time'].isin(list(non_materialised_trades_df['time']))]
-    #     simulation_data = self.sort_and_reset(pd.concat([simulation_data, non_materialised_trades_df]))
-    #
-    #     signal_generator.set_candles_df(simulation_data)
-    #     signal_generator.generate_inside_bar_momentum_signal_detail_columns(use_pips=True)
-    #     results.append(signal_generator.evaluate_indicator())
-    #     # Save data to be plotted
-    #     if pair in self.data_range_for_plotting.currency_pairs:
-    #         self.plot_data[pair] = signal_generator.queue.copy()
+            if (short_window, long_window) in ma_pairs_to_plot:
+                plot_data[(pair, short_window, long_window)] = sweep.generate_signals_dataframe(short_window, long_window)
+        return results, plot_data
+
+    def get_ma_pairs_to_plot(self, pair: str) -> List[Tuple[int, int]]:
+        if pair not in self.data_range_for_plotting.currency_pairs:
+            return []
+        return self.data_range_for_plotting.ma_pairs or []
+
+    def simulate_ma_crossover(self, ma_windows: List[int], pair: str, pip_location: float, granularity: Granularity, candle_data: DataFrame, results: List[IndicatorEvaluation],
+                              window_pairs: List[Tuple[int, int]] | None = None):
+        pair_results, plot_data = self.sweep_ma_crossover(ma_windows, pair, pip_location, granularity, candle_data, self.get_ma_pairs_to_plot(pair), window_pairs)
+        results.extend(pair_results)
+        self.plot_data.update(plot_data)
+
+    def simulate_ma_crossover_in_parallel(self,
+                                          ma_windows: List[int],
+                                          pip_locations: Dict[str, float],
+                                          granularity: Granularity,
+                                          price_data_for_pairs: Dict[str, DataFrame],
+                                          results: List[IndicatorEvaluation],
+                                          workers: int,
+                                          window_pairs: Dict[str, List[Tuple[int, int]]] | None = None):
+        """
+        Runs the MA crossover simulation for each pair in its own worker process. The candles are placed in shared memory
+        rather than being pickled to the workers. Results are appended in the order of the pairs, whichever worker finishes first.
+        The signals of the returned evaluations are not sent back from the workers, apart from those to be plotted.
+        :param pip_locations: The pip location of each pair.
+        :param price_data_for_pairs: The candles of each pair.
+        :param workers: Number of worker processes.
+        :param window_pairs: If provided, the window pairs to evaluate for each pair. All combinations of the windows otherwise.
+        """
+        pairs: List[str] = list(price_data_for_pairs.keys())
+        print("Running simulations for {} pairs on {} workers".format(len(pairs), workers))
+        shared_candles: List[SharedCandles] = []
+        try:
+            for pair in pairs:
+                shared_candles.append(SharedCandles(price_data_for_pairs[pair]))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pair_results = executor.map(_simulate_ma_crossover_for_shared_candles,
+                                            [ma_windows] * len(pairs),
+                                            pairs,
+                                            [pip_locations[pair] for pair in pairs],
+                                            [granularity] * len(pairs),
+                                            [candles.handle for candles in shared_candles],
+                                            [self.get_ma_pairs_to_plot(pair) for pair in pairs],
+                                            [(window_pairs or {}).get(pair) for pair in pairs])
+                for evaluations, plot_data in pair_results:
+                    results.extend(evaluations)
+                    self.plot_data.update(plot_data)
+        finally:
+            for candles in shared_candles:
+                candles.release()
+
+    def simulate_inside_bar_momentum(self,
+                                     pair: str,
+                                     pip_location: float,
+                                     trade_granularity: Granularity,
+                                     candle_data: DataFrame,
+                                     results: List[IndicatorEvaluation],
+                                     simulation_granularity: Granularity,
+                                     from_time: datetime,
+                                     to_time: datetime,
+                                     use_only_downloaded_price_data: bool,
+                                     simulation_data: DataFrame | None = None):
+        """
+        Generates inside bar momentum signals on the trade granularity candles, and simulates the resulting trades on the
+        simulation granularity candles.
+        :param simulation_data: If provided, the simulation granularity candles, sorted by time. Retrieved otherwise.
+        """
+        if simulation_granularity.value > Granularity.M5.value:
+            raise ValueError("The simulation granularity is too coarse for te inside bar momentum simulation. Please choose a granularity finer than M5.")
+        signal_generator: InsideBarMomentumSignalGenerator = InsideBarMomentumSignalGenerator(pair, pip_location, trade_granularity)
+        signal_generator.generate_signals_for_backtesting(candle_data, use_pips=True, vectorised=True)
+        signals: DataFrame = signal_generator.generate_signals_dataframe()
+        if simulation_data is None:
+            simulation_data = self.sort_and_reset(self.get_price_data_for_pair(pair, simulation_granularity, from_time, to_time, use_only_downloaded_price_data))
+
+        # A signal is only known once its candle is complete, so its trade is simulated from the end of the candle.
+        trade_signals: DataFrame = signals.loc[signals['signal'] != 0, ['time', 'signal', 'entry_stop', 'stop_loss', 'take_profit']]
+        trade_signals['time'] = pd.to_datetime(trade_signals['time']) + trade_granularity.value
+        trades: DataFrame = TradeSimulator(simulation_data).simulate(trade_signals)
+        trades = InsideBarMomentumSignalGenerator.add_trade_details(trades, pip_location, use_pips=True)
+        results.append(IndicatorEvaluation(pair=pair, signals=trades))
+        # Save data to be plotted
+        if pair in self.data_range_for_plotting.currency_pairs:
+            trades['time'] -= trade_granularity.value
+            self.plot_data[pair] = signals.merge(trades[['time'] + TRADE_COLUMNS + ['gain', 'duration']], how='left', on='time')
 
     @staticmethod
     def sort_and_reset(simulation_data):
@@ -205,9 +273,11 @@ class Backtester:
             to_time: datetime = datetime.now(),
             simulation_granularity: Granularity = None,
             use_only_downloaded_price_data: bool = False,
-            ma_windows: List[int] | None = None, file_type: str = Literal['csv', 'pkl']) -> None:
+            ma_windows: List[int] | None = None, file_type: str = Literal['csv', 'pkl'],
+            workers: int | None = None, recompute: bool = False) -> None:
         """
         Run simulations on selected currencies with a given indicator between given dates. Save the results.
+        Results already in the result store, for the same candles and parameters, are reused rather than computed again.
         :param simulation_granularity: In some cases, the simulation might have to be run at a different granularity than
         when the trades are generated. If not specified, this will be set to the same granularity as the trade granularity.
         :param currencies: Currency pairs to run the simulation for.
@@ -219,25 +289,95 @@ class Backtester:
         :param ma_windows: Only provide if the indicator is MA_CROSSOVER. The moving average windows to run the simulation for.
         The simulation will be run on all logical combinations on these windows.
         :param file_type: The output file type. Can be 'csv' or 'pkl'.
+        :param workers: If provided, runs the simulation for each pair in a pool of this many worker processes.
+        Only supported for MA_CROSSOVER - other indicators run in this process.
+        :param recompute: If True, computes all results again, replacing the stored ones.
         """
         if self.indicator == Indicator.MA_CROSSOVER and not ma_windows:
             ma_windows = [4, 8, 16, 32, 64, 96, 128, 256]
         if not simulation_granularity:
             simulation_granularity = trade_granularity
         # Retrieve candles for each currency
+        # The simulation candles are needed anyway, so the trade candles are resampled from them rather than downloaded.
+        source_granularity: Granularity | None = simulation_granularity if CandleResampler.can_resample(simulation_granularity, trade_granularity) else None
         historical_price_data_for_currencies: Dict[str, DataFrame] = \
-            self.get_price_data_for_all_combinations_of_currencies(currencies, trade_granularity, use_only_downloaded_price_data, from_time, to_time)
+            self.get_price_data_for_all_combinations_of_currencies(currencies, trade_granularity, use_only_downloaded_price_data, from_time, to_time,
+                                                                   source_granularity)
+
+        # The inside bar momentum trades are simulated on the simulation candles, so their results depend on those candles too.
+        simulation_price_data_for_pairs: Dict[str, DataFrame] | None = {
+            pair: self.sort_and_reset(self.get_price_data_for_pair(pair, simulation_granularity, from_time, to_time, use_only_downloaded_price_data))
+            for pair in historical_price_data_for_currencies
+        } if self.indicator == Indicator.INSIDE_BAR_MOMENTUM else None
+
+        # Results are stored by the hash of the candles and the strategy parameters, so only combinations that are not stored yet are run.
+        # Results to be plotted are always run, as their signals are not stored.
+        result_descriptions: Dict[str, Dict[str, Any]] = self.describe_results(historical_price_data_for_currencies, trade_granularity, simulation_granularity,
+                                                                               ma_windows, from_time, to_time, simulation_price_data_for_pairs)
+        stored_keys: Set[str] = set() if recompute else self.result_store.get_stored_keys(result_descriptions)
+        keys_to_run_for_pairs: Dict[str, List[str]] = {}
+        for key, description in result_descriptions.items():
+            if key not in stored_keys or self.is_plotted(description):
+                keys_to_run_for_pairs.setdefault(description['pair'], []).append(key)
+        print("{} of {} results already stored.".format(len(result_descriptions) - sum(map(len, keys_to_run_for_pairs.values())), len(result_descriptions)))
+        window_pairs: Dict[str, List[Tuple[int, int]]] = {
+            pair: [(result_descriptions[key]['parameters']['short_window'], result_descriptions[key]['parameters']['long_window']) for key in keys]
+            for pair, keys in keys_to_run_for_pairs.items()
+        } if self.indicator == Indicator.MA_CROSSOVER else {}
 
         results: List[IndicatorEvaluation] = []
-        for pair, price_data in historical_price_data_for_currencies.items():
-            print("Running simulation for pair", pair)
-            pip_location = float(self.instruments.query('name=="{}"'.format(pair))['pipLocation'].iloc[0])
+        if workers and self.indicator == Indicator.MA_CROSSOVER:
+            pip_locations: Dict[str, float] = {pair: self.instrument_registry.get_pip_location(pair) for pair in keys_to_run_for_pairs}
+            self.simulate_ma_crossover_in_parallel(ma_windows, pip_locations, trade_granularity,
+                                                   {pair: historical_price_data_for_currencies[pair] for pair in keys_to_run_for_pairs}, results, workers, window_pairs)
+        else:
+            for pair in keys_to_run_for_pairs:
+                print("Running simulation for pair", pair)
+                price_data: DataFrame = historical_price_data_for_currencies[pair]
+                pip_location = self.instrument_registry.get_pip_location(pair)
 
-            if self.indicator == Indicator.MA_CROSSOVER:
-                self.simulate_ma_crossover(ma_windows, pair, pip_location, trade_granularity, price_data, results)
+                if self.indicator == Indicator.MA_CROSSOVER:
+                    self.simulate_ma_crossover(ma_windows, pair, pip_location, trade_granularity, price_data, results, window_pairs[pair])
 
-            # elif self.indicator == Indicator.INSIDE_BAR_MOMENTUM:
-            #     self.simulate_inside_bar_momentum(pair, results, simulation_granularity, from_time, to_time, use_only_downloaded_price_data)
+                elif self.indicator == Indicator.INSIDE_BAR_MOMENTUM:
+                    self.simulate_inside_bar_momentum(pair, pip_location, trade_granularity, price_data, results, simulation_granularity, from_time, to_time,
+                                                      use_only_downloaded_price_data, simulation_price_data_for_pairs[pair])
 
-        results_df = self.create_results_df(results)
+        # Results are appended in the order of the pairs, and of the window pairs of each pair.
+        keys_run: List[str] = [key for keys in keys_to_run_for_pairs.values() for key in keys]
+        self.result_store.save((key, result_descriptions[key], result) for key, result in zip(keys_run, results, strict=True))
+        results_df: DataFrame = self.result_store.get_results(list(result_descriptions))
         self.save_results(results_df, file_type)
+
+    def describe_results(self, price_data_for_pairs: Dict[str, DataFrame], trade_granularity: Granularity, simulation_granularity: Granularity,
+                         ma_windows: List[int] | None, from_time: datetime, to_time: datetime,
+                         simulation_price_data_for_pairs: Dict[str, DataFrame] | None = None) -> Dict[str, Dict[str, Any]]:
+        """
+        :param simulation_price_data_for_pairs: The simulation candles of each pair, if the indicator is simulated on them. They are
+        hashed along with the candles.
+        :return: The key and description of each result the run produces, in the order they are produced. A description holds the
+        pair, indicator, granularity, hash of the candles and strategy parameters that the key is computed from.
+        """
+        parameter_sets: List[Dict[str, Any]] = []
+        if self.indicator == Indicator.MA_CROSSOVER:
+            parameter_sets = [{'short_window': short_window, 'long_window': long_window}
+                              for short_window, long_window in MovingAverageCrossoverSweep.get_window_pairs(ma_windows)]
+        elif self.indicator == Indicator.INSIDE_BAR_MOMENTUM:
+            parameter_sets = [{'simulation_granularity': simulation_granularity.name}]
+        result_descriptions: Dict[str, Dict[str, Any]] = {}
+        for pair, price_data in price_data_for_pairs.items():
+            hashed_candles: List[DataFrame] = [price_data] + ([simulation_price_data_for_pairs[pair]] if simulation_price_data_for_pairs is not None else [])
+            data_hash: str = hash_candles(*hashed_candles)
+            for parameters in parameter_sets:
+                result_descriptions[get_result_key(pair, self.indicator, trade_granularity, data_hash, parameters)] = {
+                    'pair': pair, 'indicator': self.indicator, 'granularity': trade_granularity, 'data_hash': data_hash, 'parameters': parameters,
+                    'from_time': from_time, 'to_time': to_time
+                }
+        return result_descriptions
+
+    def is_plotted(self, result_description: Dict[str, Any]) -> bool:
+        pair: str = result_description['pair']
+        if self.indicator == Indicator.MA_CROSSOVER:
+            parameters: Dict[str, Any] = result_description['parameters']
+            return (parameters['short_window'], parameters['long_window']) in self.get_ma_pairs_to_plot(pair)
+        return pair in self.data_range_for_plotting.currency_pairs
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import contextlib
+import heapq
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Literal, Tuple
+
+from pandas import DataFrame
+
+from src.app.RealTimeTrader import LiveTrader
+from src.client.PaperBroker import PaperBroker
+from src.model.Granularity import Granularity
+from src.model.Indicator import Indicator
+from src.model.Quote import Quote
+from src.model.candle.Price import CANDLES_DF_COLUMNS
+from src.service.InProcessChannel import InProcessChannel
+from src.service.LiveDataStore import LiveDataStore
+from src.util.CandleWireFormat import WireFormat
+from src.util.LatencyTracker import LatencyTracker
+from src.util.Utilities import get_candle_store
+
+Transport = Literal['in_process', 'rabbitmq']
+# How long to wait for the traders to consume the last candles published to RabbitMQ.
+DRAIN_TIMEOUT_SECONDS: float = 10
+
+
+@dataclass
+class ReplayReport:
+    number_of_quotes: int
+    number_of_candles: int
+    number_of_orders: int
+    seconds: float
+    # Latencies from publishing each candle to handling it in the trader, in milliseconds, per stage.
+    latency: Dict[str, Dict[str, float]]
+    realised_pl: Dict[str, float]
+
+    @property
+    def quotes_per_second(self) -> float:
+        return self.number_of_quotes / self.seconds if self.seconds else 0.0
+
+    @property
+    def candles_per_second(self) -> float:
+        return self.number_of_candles / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        lines: List[str] = ["Replayed {:,} quotes and {:,} candles in {:.2f} s: {:,.0f} quotes/s, {:,.0f} candles/s. {:,} orders filled.".format(
+            self.number_of_quotes, self.number_of_candles, self.seconds, self.quotes_per_second, self.candles_per_second, self.number_of_orders)]
+        for stage, summary in self.latency.items():
+            lines.append("  {:<20} p50: {:>9.3f} ms, p99: {:>9.3f} ms, max: {:>9.3f} ms".format(stage, summary['p50_ms'], summary['p99_ms'], summary['max_ms']))
+        for pair, pl in self.realised_pl.items():
+            lines.append("  {} realised P/L: {:.5f}".format(pair, pl))
+        return '\n'.join(lines)
+
+
+class HistoricalReplay:
+    """
+    Replays historical quotes, or candles, through the live trading code path as fast as possible: the LiveDataStore generates
+    candles from the quotes and publishes them, a LiveTrader per pair consumes them and iterates its signal generator, and orders
+    are filled by a PaperBroker. Use to load-test and validate the live code path offline.
+    """
+    def __init__(self, pairs: List[str], indicator: Indicator, granularity: Granularity, order_units: int, indicator_params: Dict | None = None,
+                 transport: Transport = 'in_process', wire_format: WireFormat = 'binary', quiet: bool = True):
+        """
+        :param transport: 'in_process' delivers candles straight from the data store to the traders. 'rabbitmq' sends them through the
+        local RabbitMQ broker, as when trading live.
+        :param quiet: Whether to silence the per-candle logging of the data store and traders while replaying.
+        """
+        self.pairs: List[str] = pairs
+        self.indicator: Indicator = indicator
+        self.granularity: Granularity = granularity
+        self.order_units: int = order_units
+        self.indicator_params: Dict | None = indicator_params
+        self.transport: Transport = transport
+        self.wire_format: WireFormat = wire_format
+        self.quiet: bool = quiet
+
+    @staticmethod
+    def candles_to_quotes(pair: str, candles: DataFrame, granularity: Granularity) -> Iterator[Tuple[str, Quote]]:
+        """
+        Splits each candle into four quotes, spread over the candle: the open, the low and high (high first for bearish candles),
+        and the close.
+        :param granularity: The granularity of the candles.
+        """
+        quarter: timedelta = granularity.value / 4
+        for row in candles.reindex(columns=CANDLES_DF_COLUMNS).itertuples(index=False):
+            extremes: Tuple[str, str] = ('l', 'h') if row.mid_c >= row.mid_o else ('h', 'l')
+            candle_time: datetime = row.time.to_pydatetime()
+            for index, price in enumerate(('o',) + extremes + ('c',)):
+                yield pair, Quote(time=candle_time + index * quarter, ask=getattr(row, 'ask_' + price), bid=getattr(row, 'bid_' + price),
+                                  mid=getattr(row, 'mid_' + price))
+
+    def replay_candles(self, candles: Dict[str, DataFrame], granularity: Granularity) -> ReplayReport:
+        """
+        :param candles: The candles of each pair.
+        :param granularity: The granularity of the candles. Use a finer granularity than the traded one, so that candles are generated
+        from several quotes.
+        """
+        quotes: Iterable[Tuple[str, Quote]] = heapq.merge(*(self.candles_to_quotes(pair, pair_candles, granularity) for pair, pair_candles in candles.items()),
+                                                          key=lambda pair_quote: pair_quote[1].time)
+        return self.replay_quotes(quotes)
+
+    def replay_stored_candles(self, granularity: Granularity, from_time: datetime, to_time: datetime) -> ReplayReport:
+        """
+        Replays the candles of the pairs in the candle store, between two times.
+        """
+        candle_store = get_candle_store()
+        return self.replay_candles({pair: candle_store.read(pair, granularity, from_time, to_time) for pair in self.pairs}, granularity)
+
+    def replay_quotes(self, quotes: Iterable[Tuple[str, Quote]]) -> ReplayReport:
+        """
+        :param quotes: The pair and quote of each price, in time order.
+        """
+        paper_broker: PaperBroker = PaperBroker()
+        latency_tracker: LatencyTracker = LatencyTracker('Replay', log_interval_seconds=None)
+        number_of_quotes: int = 0
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull) if self.quiet else contextlib.nullcontext():
+            live_data_store: LiveDataStore = LiveDataStore(self.pairs, [self.granularity], self.granularity, streaming=True, wire_format=self.wire_format,
+                                                           channel=InProcessChannel() if self.transport == 'in_process' else None, historical=True)
+            live_traders: List[LiveTrader] = []
+            for pair in self.pairs:
+                live_trader: LiveTrader = LiveTrader(pair, self.indicator, self.granularity, False, datetime.now(), self.order_units, self.indicator_params,
+                                                     initial_candles=DataFrame(columns=CANDLES_DF_COLUMNS), order_client=paper_broker)
+                live_trader.latency_tracker = latency_tracker
+                live_trader.subscribe(live_data_store.channel)
+                live_traders.append(live_trader)
+
+            start: float = time.perf_counter()
+            for pair, quote in quotes:
+                paper_broker.update_quote(pair, quote)
+                live_data_store.ingest_quotes([(pair, quote)])
+                if live_data_store.connection:
+                    live_data_store.connection.process_data_events(time_limit=0)
+                number_of_quotes += 1
+            if live_data_store.connection:
+                self._drain(live_data_store, live_traders)
+            seconds: float = time.perf_counter() - start
+            if live_data_store.connection:
+                live_data_store.connection.close()
+        return ReplayReport(number_of_quotes, live_data_store.number_of_published_candles, len(paper_broker.fills), seconds, latency_tracker.summarise(),
+                            paper_broker.realised_pl)
+
+    @staticmethod
+    def _drain(live_data_store: LiveDataStore, live_traders: List[LiveTrader]) -> None:
+        """
+        Waits for the traders to consume the candles still queued in RabbitMQ.
+        """
+        deadline: float = time.monotonic() + DRAIN_TIMEOUT_SECONDS
+        while (sum(live_trader.number_of_consumed_candles for live_trader in live_traders) < live_data_store.number_of_published_candles
+               and time.monotonic() < deadline):
+            live_data_store.connection.process_data_events(time_limit=0.1)
@@ -1,4 +1,5 @@
-import json
+import functools
+from concurrent.futures import Future
 from datetime import datetime
 from typing import Dict
 
@@ -7,13 +8,28 @@ from pandas import DataFrame
 
 from src.client.DataClient import DataClient
 from src.client.OrderClient import OrderClient
+from src.model.candle.Candle import Candle
+from src.service.LiveDataStore import get_channel_name
+from src.service.signal_generators.InsideBarMomentumSignalGenerator import InsideBarMomentumSignalGenerator
+from src.service.signal_generators.MovingAverageCrossoverSignalGenerator import MovingAverageCrossoverSignalGenerator
 from src.service.signal_generators.SignalGenerator import SignalGenerator
 from src.model.Granularity import Granularity
 from src.model.Indicator import Indicator
+from src.util.CandleWireFormat import decode_candles
+from src.util.RingBuffer import RingBuffer
+from src.util.LatencyTracker import CONSUME, LatencyTracker, ORDER_ACKNOWLEDGED, ORDER_SENT, SIGNAL, stamp
+
+# The number of latest candles, and iterations of the signal generator, kept in memory.
+LIVE_WINDOW_SIZE: int = 1000
 
 
 class LiveTrader:
-    def __init__(self, pair: str, indicator: Indicator, granularity: Granularity, live: bool, historical_data_start_time: datetime, order_units: int, indicator_params: Dict | None = None):
+    def __init__(self, pair: str, indicator: Indicator, granularity: Granularity, live: bool, historical_data_start_time: datetime, order_units: int, indicator_params: Dict | None = None,
+                 initial_candles: DataFrame | None = None, order_client: OrderClient | None = None):
+        """
+        :param initial_candles: The candles to initialise the signal generator with. Downloaded from historical_data_start_time if not provided.
+        :param order_client: The client to place orders with, e.g. a PaperBroker. Defaults to an OrderClient for the account.
+        """
         print("Initializing LiveTrader for pair {}, indicator {} and granularity {}.".format(pair, indicator, granularity))
         print("Collecting initial data from {}.".format(historical_data_start_time.strftime("%Y-%m-%d %H:%M:%S")))
         print("############# CAUTION: TRADING LIVE. #############" if live else "Demo trading mode.")
@@ -24,37 +40,92 @@ class LiveTrader:
         self.pair: str = pair
         self.indicator: Indicator = indicator
         self.granularity: Granularity = granularity
-        self.data_client: DataClient = DataClient(live=live)
+        self.live: bool = live
         self.historical_data_start_time: datetime = historical_data_start_time
-        self.candles: DataFrame = self._get_initial_price_data()
-        pip_location: float = DataClient.get_pip_location(pair)
-        self.signal_generator: SignalGenerator = SignalGenerator(pair, pip_location, granularity, self.candles)
-        self.signal_generator.generate_signals_for_backtesting(use_pips=True, **self.indicator_params)
+        if initial_candles is None:
+            initial_candles = self._get_initial_price_data()
+        window_size: int = max(LIVE_WINDOW_SIZE, self.indicator_params.get('long_window', 0))
+        # Rolling window of the latest candles. Appending is O(1), however much history is held.
+        self.candles: RingBuffer = RingBuffer(window_size, dtype=object)
+        for candle_values in initial_candles.reindex(columns=Candle.columns()).tail(window_size).itertuples(index=False, name=None):
+            self.candles.append(Candle(*candle_values))
+        self.signal_generator: SignalGenerator = self._create_signal_generator(initial_candles, window_size)
 
-        self.order_client: OrderClient = OrderClient(live=live)
+        self.order_client: OrderClient = order_client or OrderClient(live=live)
+        self.latency_tracker: LatencyTracker = LatencyTracker(pair)
+        self.number_of_consumed_candles: int = 0
 
     def _get_initial_price_data(self) -> DataFrame:
-        return self.data_client.create_data_for_pair(self.pair, self.granularity, self.historical_data_start_time, datetime.now())
-
-    def consume_candle(self, _, __, ___, body):
-        print("Candle consumed: {}".format(body))
-        candle_dict: Dict[str, float | datetime] = json.loads(body)
-        candle_dict['volume'] = 1
-        self.candles.loc[-1] = candle_dict
-        self.candles = self.candles.iloc[1:]
-        self.candles.reset_index(inplace=True)
-        # TODO: Add support for limit orders and stop orders
-        self.order_client.place_market_order(self.pair, self.order_units, 'FOK', 1)
+        return DataClient(live=self.live).create_data_for_pair(self.pair, self.granularity, self.historical_data_start_time, datetime.now())
+
+    def _create_signal_generator(self, initial_candles: DataFrame, window_size: int) -> SignalGenerator:
+        """
+        Creates the signal generator for the indicator, iterated over the initial candles and keeping only window_size iterations in memory.
+        """
+        pip_location: float = DataClient.get_pip_location(self.pair)
+        if self.indicator == Indicator.MA_CROSSOVER:
+            return MovingAverageCrossoverSignalGenerator(self.pair, pip_location, self.granularity, initial_candles=initial_candles,
+                                                         max_iterations_in_memory=window_size, **self.indicator_params)
+        if self.indicator == Indicator.INSIDE_BAR_MOMENTUM:
+            return InsideBarMomentumSignalGenerator(self.pair, pip_location, self.granularity, initial_candles=initial_candles,
+                                                    max_iterations_in_memory=window_size, **self.indicator_params)
+        raise ValueError("Live trading is not supported for indicator {}.".format(self.indicator))
+
+    def consume_candle(self, _, __, properties: pika.BasicProperties, body: bytes):
+        message_stamps: Dict[str, int] = stamp(dict(properties.headers or {}), CONSUME)
+        for candle in decode_candles(properties.content_type, body):
+            print("Candle consumed: {}".format(candle))
+            # Skip candles that are not newer than the latest one, e.g. redelivered messages.
+            if len(self.candles) and candle.time <= self.candles.latest().time:
+                continue
+            stamps: Dict[str, int] = dict(message_stamps)
+            self.number_of_consumed_candles += 1
+            self.candles.append(candle)
+            self.signal_generator.iterate(candle)
+            signal: int = self.signal_generator.queue.latest('signal')
+            stamp(stamps, SIGNAL)
+            if signal == 0:
+                self.latency_tracker.record(stamps)
+                continue
+            # TODO: Add support for limit orders and stop orders
+            stamp(stamps, ORDER_SENT)
+            try:
+                # Consumption does not wait for the broker: the order is acknowledged in the background.
+                self.order_client.submit_market_order(self.pair, signal * self.order_units, 'FOK', 1,
+                                                      on_complete=functools.partial(self._on_order_complete, stamps))
+            except RuntimeError as error:
+                print("{}: {}".format(self.pair, error))
+
+    def _on_order_complete(self, stamps: Dict[str, int], order: Future) -> None:
+        stamp(stamps, ORDER_ACKNOWLEDGED)
+        if order.exception():
+            print("{}: Order failed: {}".format(self.pair, order.exception()))
+        self.latency_tracker.record(stamps)
+
+    def get_latency_summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        :return: The count, mean, p50, p99 and maximum latency in milliseconds of each stage of the live pipeline.
+        """
+        return self.latency_tracker.summarise()
 
     def iterate(self):
         pass
 
-    def start(self):
-        connection = pika.BlockingConnection(pika.ConnectionParameters('localhost'))
-        channel = connection.channel()
-        channel_name: str = '{}_LIVE_CANDLES'.format(self.pair)
+    def subscribe(self, channel) -> None:
+        """
+        Consumes the candles of the pair and granularity published to a channel.
+        :param channel: A pika channel, or an InProcessChannel.
+        """
+        channel_name: str = get_channel_name(self.pair, self.granularity)
+        channel.queue_declare(queue=channel_name)
         channel.basic_consume(queue=channel_name,
                               auto_ack=True,
                               on_message_callback=self.consume_candle)
         print('Listening for new candles on channel: {}'.format(channel_name))
+
+    def start(self):
+        connection = pika.BlockingConnection(pika.ConnectionParameters('localhost'))
+        channel = connection.channel()
+        self.subscribe(channel)
+        self.order_client.warm_up()
         channel.start_consuming()
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import requests
+import v20
+from requests.adapters import HTTPAdapter
+
+
+def mount_connection_pool(api: v20.Context, pool_size: int) -> bool:
+    """
+    Lets a v20 context keep up to pool_size connections alive, so that concurrent requests reuse them rather than opening new ones.
+    The v20 SDK does not expose the requests session it sends requests with, so its private _session attribute is used if it exists.
+    Otherwise, the context is left as it is: requests still work, over the SDK's default pool.
+    :param api: The v20 context to send the concurrent requests with.
+    :param pool_size: How many connections to keep alive.
+    :return: Whether the pool was mounted.
+    """
+    session: requests.Session | None = getattr(api, '_session', None)
+    if not isinstance(session, requests.Session):
+        print("The v20 context has no requests session to mount a pool of {} connections on. Using the default pool.".format(pool_size))
+        return False
+    adapter: HTTPAdapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return True
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import math
 import time
 from http.client import HTTPException
 from typing import Tuple, List, Dict
@@ -9,77 +12,157 @@ import v20
 import pandas as pd
 from pandas import DataFrame
 
-from src.util.Constants import OANDA_DEMO_HOSTNAME, OANDA_LIVE_HOSTNAME, OANDA_DEMO_API_KEY, OANDA_LIVE_API_KEY, OANDA_DEMO_ACCOUNT_ID, OANDA_LIVE_ACCOUNT_ID, INSTRUMENTS_FILENAME
-from src.util.Utilities import prepare_candle, save_candles_to_file, save_instruments_to_file, validate_candles_df
+from src.client.ConnectionPool import mount_connection_pool
+from src.client.PriceStreamClient import PriceStreamClient
+from src.util.Constants import OANDA_DEMO_HOSTNAME, OANDA_LIVE_HOSTNAME, get_account_id, get_api_key
+from src.util.CandleDecoding import decode_candles, decoded_candles_to_dataframe
+from src.util.CandleStore import CandleStore
+from src.util.InstrumentRegistry import get_instrument_registry
+from src.util.RateLimiter import RateLimiter
+from src.util.Utilities import prepare_candle, save_candles_to_file, save_instruments_to_file, validate_candles_df, get_candle_store
 from src.model.Granularity import Granularity
+from src.model.candle.Price import CANDLES_DF_COLUMNS
 from src.model.candle.Candle import Candle
+from src.model.Quote import Quote
 
 from typing_extensions import deprecated
 
 MAX_CANDLESTICKS: int = 5000
+# OANDA allows 120 requests per second per connection - stay below it.
+MAX_REQUESTS_PER_SECOND: int = 100
 
 
 class DataClient:
-    def __init__(self, live: bool):
+    def __init__(self, live: bool, max_concurrent_requests: int = 1):
+        """
+        :param live: Whether to use the live or the demo account.
+        :param max_concurrent_requests: If more than 1, historical candles are downloaded in time-based pages, with up to this many
+        requests in flight over pooled keep-alive connections.
+        """
         self.live: bool = live
+        self.max_concurrent_requests: int = max_concurrent_requests
         self.api = v20.Context(
             hostname=OANDA_LIVE_HOSTNAME if live else OANDA_DEMO_HOSTNAME,
-            token=OANDA_LIVE_API_KEY if live else OANDA_DEMO_API_KEY,
+            token=get_api_key(live),
             datetime_format='UNIX'
         )
+        # Allow one pooled keep-alive connection per concurrent request.
+        mount_connection_pool(self.api, max_concurrent_requests)
+        self.rate_limiter: RateLimiter = RateLimiter(rate=MAX_REQUESTS_PER_SECOND, capacity=max_concurrent_requests)
 
     def get_max_candles_possible(self, pair: str, granularity: Granularity, from_time: datetime, to_time: datetime) -> Tuple[DataFrame, datetime]:
 
+        self.rate_limiter.acquire()
         number_of_candlesticks_from_start_to_now = (to_time - from_time) / granularity.value
-        number_of_candlesticks_to_fetch = min(MAX_CANDLESTICKS, int(number_of_candlesticks_from_start_to_now))
+        number_of_candlesticks_to_fetch = max(1, min(MAX_CANDLESTICKS, math.ceil(number_of_candlesticks_from_start_to_now)))
         response: v20.response = self.api.instrument.candles(instrument=pair, fromTime=time.mktime(from_time.timetuple()), granularity=granularity.name, price='MBA',
                                                              count=number_of_candlesticks_to_fetch)
         if response.status != 200:
             raise HTTPException(
                 "Cannot get candlesticks for currency pair {}, status code: {}, error message: {}".format(pair, response.status, response.body.errorMessage))
-        candles: DataFrame = DataFrame([prepare_candle(vars(candle)) for candle in response.body['candles'] if candle.complete])
-        # candles[CandleDefinitions.CANDLES_DF_COLUMNS] = candles[CandleDefinitions.CANDLES_DF_COLUMNS].apply(pd.to_numeric, errors='coerce')
-        # candles['time'] = pd.to_datetime(pd.to_numeric(candles['time']), unit='s')
+        candles: DataFrame = decoded_candles_to_dataframe(decode_candles(response.body['candles']))
+        if candles.empty:
+            # Nothing was traded in the remaining range, e.g. over a weekend.
+            return candles, to_time
         return candles, candles.iloc[-1]['time']
 
+    def get_candles_between(self, pair: str, granularity: Granularity, from_time: datetime, to_time: datetime) -> DataFrame:
+        """
+        Retrieves the complete candles between two times in a single request. The range must not hold more than MAX_CANDLESTICKS candles.
+        """
+        self.rate_limiter.acquire()
+        response: v20.response = self.api.instrument.candles(instrument=pair, fromTime=time.mktime(from_time.timetuple()), toTime=time.mktime(to_time.timetuple()),
+                                                             granularity=granularity.name, price='MBA')
+        if response.status != 200:
+            raise HTTPException(
+                "Cannot get candlesticks for currency pair {}, status code: {}, error message: {}".format(pair, response.status, response.body.errorMessage))
+        return decoded_candles_to_dataframe(decode_candles(response.body['candles']))
+
+    def get_candles_for_pair_concurrently(self, pair: str, granularity: Granularity, from_time: datetime, to_time: datetime) -> DataFrame:
+        """
+        For a given pair, retrieves the candles from the start time to the end time. The range is split into pages of MAX_CANDLESTICKS
+        candles up front, which are downloaded concurrently and stitched back together in order.
+        :param pair: Currency pair name.
+        :param granularity: Candlestick granularity.
+        :param from_time: Start time, inclusive.
+        :param to_time: End time, exclusive.
+        :return: The candles DataFrame.
+        """
+        # Both ends of a page are inclusive, so a page spanning MAX_CANDLESTICKS - 1 intervals holds at most MAX_CANDLESTICKS candles.
+        page_duration: timedelta = (MAX_CANDLESTICKS - 1) * granularity.value
+        page_starts: List[datetime] = []
+        page_start: datetime = from_time
+        while page_start < to_time:
+            page_starts.append(page_start)
+            page_start += page_duration
+        page_ends: List[datetime] = page_starts[1:] + [to_time]
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_requests) as executor:
+            pages: List[DataFrame] = list(executor.map(functools.partial(self.get_candles_between, pair, granularity), page_starts, page_ends))
+        candles: DataFrame = pd.concat(pages) if pages else DataFrame(columns=CANDLES_DF_COLUMNS)
+        # Pages share their boundary candle.
+        candles = candles.drop_duplicates(subset='time', keep='last')
+        return candles[(from_time <= candles['time']) & (candles['time'] < to_time)].reset_index(drop=True)
+
     def get_candles_for_pair(self, pair: str, granularity: Granularity, from_time: datetime, to_time: datetime) -> DataFrame:
         """
         For a given pair, retrieves the candles from the start time to the end time.
         :param pair: Currency pair name.
         :param granularity: Candlestick granularity.
-        :param from_time:
-        :param to_time:
-        :return:
+        :param from_time: Start time, inclusive.
+        :param to_time: End time, exclusive.
+        :return: The candles DataFrame.
         """
+        if self.max_concurrent_requests > 1:
+            return self.get_candles_for_pair_concurrently(pair, granularity, from_time, to_time)
         start_time: datetime = from_time
-        prev_start_time: datetime = start_time - timedelta(seconds=1)
         candles: List[DataFrame] = []
-        while to_time > start_time != prev_start_time:
-            prev_start_time = start_time
-            start_time += timedelta(seconds=1)
-            curr_candles, start_time = self.get_max_candles_possible(pair, granularity, start_time, to_time)
+        while start_time < to_time:
+            curr_candles, last_candle_time = self.get_max_candles_possible(pair, granularity, start_time, to_time)
             candles.append(curr_candles)
-        return pd.concat(candles).drop_duplicates()
+            start_time = last_candle_time + granularity.value
+        candles_df: DataFrame = pd.concat(candles).drop_duplicates()
+        # The last page can run past the end time when the market was closed for part of it.
+        return candles_df[candles_df['time'] < to_time].reset_index(drop=True)
 
     def get_instruments_and_save_to_file(self) -> DataFrame:
         """
         Retrieves the instruments from the OANDA API and saves them to a file.
         :return: The instruments DataFrame.
         """
-        response: v20.response = self.api.account.instruments(OANDA_LIVE_ACCOUNT_ID if self.live else OANDA_DEMO_ACCOUNT_ID)
+        response: v20.response = self.api.account.instruments(get_account_id(self.live))
         instruments = DataFrame([vars(instrument) for instrument in response.body['instruments']])
         save_instruments_to_file(instruments)
+        get_instrument_registry().load(instruments)
         return instruments
 
     @staticmethod
     def get_pip_location(pair: str) -> float:
-        try:
-            instruments: DataFrame = pd.read_pickle(INSTRUMENTS_FILENAME)
-        except IOError:
-            raise IOError("Instruments file could not be found. Please first retrieve account instruments using get_instruments_and_save_to_file().")
-        return float(instruments.query('name=="{}"'.format(pair))['pipLocation'].iloc[0])
+        return get_instrument_registry().get_pip_location(pair)
 
-    def create_data_for_pair(self, pair: str, granularity: Granularity, from_time: datetime, to_time: datetime = datetime.now()) -> DataFrame:
+    def fill_gaps_for_pair(self, pair: str, granularity: Granularity, from_time: datetime, to_time: datetime) -> None:
+        """
+        Downloads only the parts of the time range that are missing from the candle store, and merges them into it.
+        :param pair: Currency pair name.
+        :param granularity: Candlestick granularity.
+        :param from_time: The start of the time range to have stored.
+        :param to_time: The end of the time range to have stored.
+        """
+        candle_store: CandleStore = get_candle_store()
+        for gap_from, gap_to in candle_store.get_missing_ranges(pair, granularity, from_time, to_time):
+            candles: DataFrame = self.get_candles_for_pair(pair=pair, granularity=granularity, from_time=gap_from, to_time=gap_to)
+            print("Downloaded {} candles for pair {}, from {} to {}".format(candles.shape[0], pair, gap_from, gap_to))
+            # The latest candle may not be complete yet, so it is not recorded as downloaded.
+            candle_store.append(pair, granularity, candles, gap_from, min(gap_to, datetime.now() - granularity.value))
+
+    def create_data_for_pair(self, pair: str, granularity: Granularity, from_time: datetime, to_time: datetime = datetime.now(), incremental: bool = False) -> DataFrame:
+        """
+        Retrieves the candles for a pair between two times and saves them to the candle store.
+        :param incremental: If True, only downloads the parts of the range that are not stored yet, then reads the whole range from the store.
+        :return: The candles DataFrame.
+        """
+        if incremental:
+            self.fill_gaps_for_pair(pair, granularity, from_time, to_time)
+            return get_candle_store().read(pair, granularity, from_time, to_time)
         candles: DataFrame = self.get_candles_for_pair(pair=pair, granularity=granularity, from_time=from_time, to_time=to_time)
         print("Loaded {} candles for pair {}, from {} to {}".format(candles.shape[0], pair, candles['time'].min(), candles['time'].max()))
         if not validate_candles_df(candles):
@@ -94,7 +177,7 @@ class DataClient:
         :param pair: Currency pair to get the latest price for.
         :return: A dictionary containing the ask, bid and midpoint prices and the timestamp.
         """
-        response: v20.response = self.api.pricing.get(OANDA_LIVE_ACCOUNT_ID if self.live else OANDA_DEMO_ACCOUNT_ID, instruments=pair)
+        response: v20.response = self.api.pricing.get(get_account_id(self.live), instruments=pair)
         if response.status != 200:
             raise HTTPException(
                 "Cannot get price for currency pair {}, status code: {}, error message: {}".format(pair, response.status, response.reason))
@@ -104,6 +187,19 @@ class DataClient:
         candle_time: datetime = datetime.fromtimestamp(float(response.body['prices'][0].time))
         return {'ask': ask, 'bid': bid, 'mid': mid, 'time': candle_time}
 
+    def get_prices(self, pairs: List[str]) -> Dict[str, Quote]:
+        """
+        Returns the latest prices for many pairs in a single request.
+        :param pairs: Currency pairs to get the latest prices for.
+        :return: The latest quote of each pair.
+        """
+        self.rate_limiter.acquire()
+        response: v20.response = self.api.pricing.get(get_account_id(self.live), instruments=','.join(pairs))
+        if response.status != 200:
+            raise HTTPException(
+                "Cannot get prices for currency pairs {}, status code: {}, error message: {}".format(pairs, response.status, response.reason))
+        return {price.instrument: PriceStreamClient.to_quote(price) for price in response.body['prices']}
+
     def get_latest_candle(self, pair: str, granularity: Granularity) -> Candle:
         """
         For a given pair, returns the latest candle, given the granularity and price type.
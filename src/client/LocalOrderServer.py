@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+
+ORDERS_PATH: re.Pattern = re.compile(r'^/v3/accounts/[^/]+/orders$')
+SUMMARY_PATH: re.Pattern = re.compile(r'^/v3/accounts/[^/]+/summary$')
+
+
+class LocalOrderServer:
+    """
+    Local stand-in for the v20 REST server, filling every market order after an artificial latency, so that orders can be sent and
+    tested offline over real, pooled HTTP connections. Records how many connections are opened and how many requests overlap.
+    Point an OrderClient at it with hostname='localhost', port=server.port and ssl=False.
+    """
+    def __init__(self, latency_seconds: float = 0, error_message: str | None = None):
+        """
+        :param latency_seconds: How long to wait before responding to each request.
+        :param error_message: If provided, every order is rejected with this error message.
+        """
+        self.latency_seconds: float = latency_seconds
+        self.error_message: str | None = error_message
+        self.number_of_connections: int = 0
+        self.requests_in_flight: int = 0
+        self.max_requests_in_flight: int = 0
+        # The order requests received, in the order they arrived.
+        self.orders: List[Dict[str, Any]] = []
+        self.lock: threading.Lock = threading.Lock()
+        self.server: ThreadingHTTPServer = ThreadingHTTPServer(('localhost', 0), self._create_handler())
+        self.port: int = self.server.server_address[1]
+        self.thread: threading.Thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def _respond(self, method: str, path: str, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        with self.lock:
+            self.requests_in_flight += 1
+            self.max_requests_in_flight = max(self.max_requests_in_flight, self.requests_in_flight)
+        time.sleep(self.latency_seconds)
+        with self.lock:
+            self.requests_in_flight -= 1
+            if method == 'GET' and SUMMARY_PATH.match(path):
+                return 200, {'account': {'id': path.split('/')[3]}, 'lastTransactionID': str(len(self.orders))}
+            if method != 'POST' or not ORDERS_PATH.match(path):
+                return 404, {'errorMessage': "Path {} {} is not supported.".format(method, path)}
+            if self.error_message:
+                return 400, {'errorMessage': self.error_message}
+            order: Dict[str, Any] = body['order']
+            self.orders.append(order)
+            transaction_id: str = str(len(self.orders))
+            return 201, {'orderFillTransaction': {'id': transaction_id, 'type': 'ORDER_FILL', 'instrument': order['instrument'],
+                                                  'units': str(order['units'])},
+                         'lastTransactionID': transaction_id}
+
+    def _create_handler(self) -> type:
+        server: LocalOrderServer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Responses have a content length, so that clients can keep the connection alive and reuse it.
+            protocol_version = 'HTTP/1.1'
+
+            def handle(self):
+                with server.lock:
+                    server.number_of_connections += 1
+                super().handle()
+
+            def do_GET(self):
+                self._send(*server._respond('GET', self.path, {}))
+
+            def do_POST(self):
+                content_length: int = int(self.headers.get('Content-Length', 0))
+                self._send(*server._respond('POST', self.path, json.loads(self.rfile.read(content_length) or '{}')))
+
+            def _send(self, status: int, body: Dict[str, Any]):
+                content: bytes = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *_):
+                pass
+
+        return Handler
+
+    def start(self) -> LocalOrderServer:
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -1,25 +1,68 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from http.client import HTTPException
-from typing import Literal
+from typing import Any, Callable, Deque, Dict, Literal, Tuple
 
 import v20
 
-from src.util.Constants import OANDA_DEMO_HOSTNAME, OANDA_LIVE_HOSTNAME, OANDA_DEMO_API_KEY, OANDA_LIVE_API_KEY, OANDA_DEMO_ACCOUNT_ID, OANDA_LIVE_ACCOUNT_ID
+from src.client.ConnectionPool import mount_connection_pool
+from src.util.Constants import OANDA_DEMO_HOSTNAME, OANDA_LIVE_HOSTNAME, get_account_id, get_api_key
 from src.model.Order import TakeProfitOrder, StopLossOrder, TrailingStopLossOrder
 
 MAX_CANDLESTICKS: int = 5000
+# Orders submitted asynchronously are sent over this many pooled keep-alive connections at most.
+MAX_CONCURRENT_ORDERS: int = 4
+# Orders waiting for a connection, on top of those being sent. Submitting more fails immediately rather than blocking the caller.
+MAX_QUEUED_ORDERS: int = 64
 
 
 class OrderClient:
-    def __init__(self, live: bool):
+    def __init__(self, live: bool, hostname: str | None = None, port: int = 443, ssl: bool = True,
+                 max_concurrent_orders: int = MAX_CONCURRENT_ORDERS, max_queued_orders: int = MAX_QUEUED_ORDERS):
+        """
+        :param live: Whether to use the live or the demo account.
+        :param hostname: The REST server to send orders to. Defaults to OANDA's REST server, override to use e.g. a LocalOrderServer.
+        :param max_concurrent_orders: How many asynchronously submitted orders can be in flight at once.
+        :param max_queued_orders: How many asynchronously submitted orders can wait for a connection.
+        """
         self.live: bool = live
         self.api = v20.Context(
-            hostname=OANDA_LIVE_HOSTNAME if live else OANDA_DEMO_HOSTNAME,
-            token=OANDA_LIVE_API_KEY if live else OANDA_DEMO_API_KEY,
+            hostname=hostname or (OANDA_LIVE_HOSTNAME if live else OANDA_DEMO_HOSTNAME),
+            port=port,
+            ssl=ssl,
+            token=get_api_key(live),
             datetime_format='UNIX'
         )
+        # Allow one pooled keep-alive connection per concurrent order.
+        mount_connection_pool(self.api, max_concurrent_orders)
+        self.max_concurrent_orders: int = max_concurrent_orders
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max_concurrent_orders, thread_name_prefix='OrderClient')
+        self.order_slots: threading.BoundedSemaphore = threading.BoundedSemaphore(max_concurrent_orders + max_queued_orders)
+        # The orders of each pair waiting to be sent or being sent, in submission order. Orders for the same pair are sent one after
+        # the other, so that the broker receives them in the order they were submitted.
+        self.queued_orders: Dict[str, Deque[Tuple[Future, Tuple, Dict[str, Any]]]] = {}
+        self.number_of_pending_orders: int = 0
+        self.pending_orders_changed: threading.Condition = threading.Condition()
+
+    def get_account_id(self) -> str:
+        return get_account_id(self.live)
+
+    def warm_up(self) -> None:
+        """
+        Opens the pooled connections ahead of the first orders, with lightweight account requests, so that orders do not pay for the
+        TCP and TLS handshakes.
+        """
+        wait([self.executor.submit(self.api.account.summary, self.get_account_id()) for _ in range(self.max_concurrent_orders)])
 
     def place_market_order(self, pair: str, units: int, time_in_force: Literal['FOK', 'GTC', 'GTD', 'GFD', 'MOO', 'LOO', 'IOC', 'DTC'], price_bound: float, take_profit_on_fill: TakeProfitOrder = None, stop_loss_on_fill: StopLossOrder = None, trailing_stop_loss_on_fill: TrailingStopLossOrder = None):
-        response: v20.response = self.api.order.market(OANDA_LIVE_ACCOUNT_ID if self.live else OANDA_DEMO_ACCOUNT_ID,
+        """
+        Places a market order, blocking until the broker responds.
+        :return: The body of the response, holding the order and fill transactions.
+        """
+        response: v20.response = self.api.order.market(self.get_account_id(),
                                                        instrument=pair,
                                                        units=units,
                                                        timeInForce=time_in_force,
@@ -29,5 +72,61 @@ class OrderClient:
                                                        trailingStopLossOnFill=vars(trailing_stop_loss_on_fill) if trailing_stop_loss_on_fill else None)
         if response.status != 201:
             raise HTTPException(
-                "Could not place a market order for pair {}. status code: {}, error message: {}".format(pair, response.status, response.body.errorMessage))
+                "Could not place a market order for pair {}. status code: {}, error message: {}".format(pair, response.status, response.body.get('errorMessage')))
         print(response.body)
+        return response.body
+
+    def submit_market_order(self, pair: str, units: int, time_in_force: Literal['FOK', 'GTC', 'GTD', 'GFD', 'MOO', 'LOO', 'IOC', 'DTC'], price_bound: float,
+                            on_complete: Callable[[Future], None] | None = None, **kwargs) -> Future:
+        """
+        Places a market order without waiting for the broker. Takes the same arguments as place_market_order(). Orders for different
+        pairs are sent concurrently, and orders for the same pair in the order they were submitted.
+        :param on_complete: Called with the future once the order is acknowledged or fails, from the thread that sent the order.
+        :return: A future of the body of the response, holding the order and fill transactions.
+        """
+        if not self.order_slots.acquire(blocking=False):
+            raise RuntimeError("Could not submit a market order for pair {}: too many orders are in flight.".format(pair))
+        future: Future = Future()
+        if on_complete:
+            future.add_done_callback(on_complete)
+        with self.pending_orders_changed:
+            self.number_of_pending_orders += 1
+            pair_orders: Deque[Tuple[Future, Tuple, Dict[str, Any]]] | None = self.queued_orders.get(pair)
+            if pair_orders is None:
+                pair_orders = self.queued_orders[pair] = deque()
+                self.executor.submit(self._send_queued_orders, pair)
+            pair_orders.append((future, (pair, units, time_in_force, price_bound), kwargs))
+        return future
+
+    def _send_queued_orders(self, pair: str) -> None:
+        """
+        Sends the queued orders of a pair one after the other, until none are left.
+        """
+        while True:
+            with self.pending_orders_changed:
+                future, args, kwargs = self.queued_orders[pair][0]
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(self.place_market_order(*args, **kwargs))
+                except BaseException as exception:
+                    future.set_exception(exception)
+            # The done callbacks, including on_complete, have run by now, so the order only counts as completed afterwards.
+            self.order_slots.release()
+            with self.pending_orders_changed:
+                self.number_of_pending_orders -= 1
+                self.pending_orders_changed.notify_all()
+                pair_orders: Deque[Tuple[Future, Tuple, Dict[str, Any]]] = self.queued_orders[pair]
+                pair_orders.popleft()
+                if not pair_orders:
+                    del self.queued_orders[pair]
+                    return
+
+    def wait_for_orders(self, timeout: float | None = None) -> None:
+        """
+        Waits until all submitted orders are acknowledged or have failed, and their on_complete callbacks have run.
+        """
+        with self.pending_orders_changed:
+            self.pending_orders_changed.wait_for(lambda: self.number_of_pending_orders == 0, timeout)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
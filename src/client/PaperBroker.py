@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+from src.model.Quote import Quote
+
+
+class PaperBroker:
+    """
+    In-process stand-in for the OrderClient, which fills market orders immediately at the latest quote of the pair: buys at the ask
+    and sells at the bid. Keeps the net position of each pair and the profit or loss realised when positions are reduced, in the quote
+    currency. Use to run the live trading code path without a broker, e.g. when replaying historical data.
+    """
+    def __init__(self):
+        self.quotes: Dict[str, Quote] = {}
+        self.positions: Dict[str, int] = {}
+        self.average_prices: Dict[str, float] = {}
+        self.realised_pl: Dict[str, float] = {}
+        self.fills: List[Dict[str, Any]] = []
+
+    def update_quote(self, pair: str, quote: Quote) -> None:
+        self.quotes[pair] = quote
+
+    def warm_up(self) -> None:
+        pass
+
+    def place_market_order(self, pair: str, units: int, time_in_force: str, price_bound: float, **_) -> Dict[str, Any]:
+        """
+        Takes the same arguments as OrderClient.place_market_order(). Price bounds and orders placed on fill are not simulated.
+        :return: A response body, with the fill in the orderFillTransaction.
+        """
+        if pair not in self.quotes:
+            raise ValueError("Could not place a market order for pair {}: no price received yet.".format(pair))
+        quote: Quote = self.quotes[pair]
+        price: float = quote.ask if units > 0 else quote.bid
+        position: int = self.positions.get(pair, 0)
+        pl: float = 0.0
+        if position and (position > 0) != (units > 0):
+            # Reduces the position: realise the profit or loss of the closed units.
+            closed_units: int = min(abs(units), abs(position)) * (1 if position > 0 else -1)
+            pl = closed_units * (price - self.average_prices[pair])
+            self.realised_pl[pair] = self.realised_pl.get(pair, 0.0) + pl
+        new_position: int = position + units
+        if new_position == 0:
+            self.average_prices.pop(pair, None)
+        elif position == 0 or (position > 0) != (new_position > 0):
+            self.average_prices[pair] = price
+        elif abs(new_position) > abs(position):
+            self.average_prices[pair] = (self.average_prices[pair] * position + price * units) / new_position
+        self.positions[pair] = new_position
+        fill: Dict[str, Any] = {'instrument': pair, 'units': units, 'price': price, 'time': quote.time, 'pl': pl}
+        self.fills.append(fill)
+        return {'orderFillTransaction': fill}
+
+    def submit_market_order(self, pair: str, units: int, time_in_force: str, price_bound: float, on_complete: Callable[[Future], None] | None = None,
+                            **kwargs) -> Future:
+        """
+        Takes the same arguments as OrderClient.submit_market_order(). The order is filled before returning.
+        """
+        future: Future = Future()
+        try:
+            future.set_result(self.place_market_order(pair, units, time_in_force, price_bound, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        if on_complete:
+            on_complete(future)
+        return future
+
+    def wait_for_orders(self, timeout: float | None = None) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
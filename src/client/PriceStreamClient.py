@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime
+from typing import Iterator, List, Tuple
+
+import v20
+from v20.errors import V20ConnectionError, V20Timeout
+
+from src.util.Constants import OANDA_DEMO_STREAM_HOSTNAME, OANDA_LIVE_STREAM_HOSTNAME, get_account_id, get_api_key
+from src.model.Quote import Quote
+
+PRICE_MESSAGE_TYPE: str = 'pricing.ClientPrice'
+# OANDA sends a heartbeat every 5 seconds, so a stream that stays silent for longer than this has dropped.
+STREAM_TIMEOUT_SECONDS: float = 10
+INITIAL_BACKOFF_SECONDS: float = 1
+MAX_BACKOFF_SECONDS: float = 60
+
+
+class PriceStreamClient:
+    def __init__(self, live: bool, hostname: str | None = None, port: int = 443, ssl: bool = True,
+                 initial_backoff_seconds: float = INITIAL_BACKOFF_SECONDS, max_backoff_seconds: float = MAX_BACKOFF_SECONDS,
+                 max_reconnect_attempts: int | None = None):
+        """
+        Consumes the v20 pricing stream, reconnecting with exponential backoff whenever the stream drops.
+        :param live: Whether to use the live or the demo account.
+        :param hostname: The stream server to connect to. Defaults to OANDA's stream server, override to use e.g. a ReplayPriceStreamServer.
+        :param initial_backoff_seconds: How long to wait before the first reconnection attempt. Doubles after each failed attempt.
+        :param max_reconnect_attempts: How many consecutive reconnection attempts to make before giving up. Retries forever if None.
+        """
+        self.live: bool = live
+        self.initial_backoff_seconds: float = initial_backoff_seconds
+        self.max_backoff_seconds: float = max_backoff_seconds
+        self.max_reconnect_attempts: int | None = max_reconnect_attempts
+        self.number_of_reconnections: int = 0
+        self.api = v20.Context(
+            hostname=hostname or (OANDA_LIVE_STREAM_HOSTNAME if live else OANDA_DEMO_STREAM_HOSTNAME),
+            port=port,
+            ssl=ssl,
+            token=get_api_key(live),
+            datetime_format='UNIX',
+            stream_timeout=STREAM_TIMEOUT_SECONDS
+        )
+
+    def stream(self, pairs: List[str]) -> Iterator[Tuple[str, Quote]]:
+        """
+        Yields each price as it arrives, skipping heartbeats. Reconnects if the stream drops, however many prices were received.
+        :param pairs: Currency pairs to stream prices for.
+        :return: An iterator of the pair and the quote of each price.
+        """
+        failed_attempts: int = 0
+        while True:
+            try:
+                for message_type, price in self._connect(pairs).parts():
+                    failed_attempts = 0
+                    if message_type == PRICE_MESSAGE_TYPE:
+                        yield price.instrument, self.to_quote(price)
+                print("Price stream for {} ended.".format(', '.join(pairs)))
+            except (V20ConnectionError, V20Timeout, ConnectionError) as error:
+                print("Price stream for {} dropped: {}".format(', '.join(pairs), error))
+            if self.max_reconnect_attempts is not None and failed_attempts >= self.max_reconnect_attempts:
+                raise ConnectionError("Could not reconnect to the price stream after {} attempts.".format(failed_attempts))
+            backoff_seconds: float = min(self.initial_backoff_seconds * 2 ** failed_attempts, self.max_backoff_seconds)
+            print("Reconnecting in {} seconds.".format(backoff_seconds))
+            time.sleep(backoff_seconds)
+            failed_attempts += 1
+            self.number_of_reconnections += 1
+
+    def _connect(self, pairs: List[str]) -> v20.response.Response:
+        response: v20.response.Response = self.api.pricing.stream(get_account_id(self.live),
+                                                                 instruments=','.join(pairs), snapshot=True)
+        if response.status != 200:
+            raise ConnectionError("Cannot stream prices for currency pairs {}, status code: {}, reason: {}".format(pairs, response.status, response.reason))
+        return response
+
+    @staticmethod
+    def to_quote(price) -> Quote:
+        """
+        :param price: A v20 ClientPrice, requested with datetime_format='UNIX'.
+        """
+        ask: float = float(price.asks[0].price)
+        bid: float = float(price.bids[0].price)
+        return Quote(time=datetime.fromtimestamp(float(price.time)), ask=ask, bid=bid, mid=(ask + bid) / 2)
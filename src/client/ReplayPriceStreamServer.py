@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+import pandas as pd
+
+from src.model.Quote import Quote
+
+HEARTBEAT_MESSAGE: str = '{"type": "HEARTBEAT"}'
+
+
+class ReplayPriceStreamServer:
+    """
+    Local stand-in for the v20 pricing stream, replaying recorded quotes for a pair, so that streaming can be run and tested offline.
+    Point a PriceStreamClient at it with hostname='localhost', port=server.port and ssl=False.
+    """
+    def __init__(self, pair: str, quotes: List[Quote], interval_seconds: float = 0, quotes_per_connection: int | None = None):
+        """
+        :param interval_seconds: How long to wait between quotes.
+        :param quotes_per_connection: If provided, the connection is dropped after this many quotes, to simulate an unreliable stream.
+        Each connection continues from the first quote that has not been sent yet.
+        """
+        self.pair: str = pair
+        self.quotes: List[Quote] = quotes
+        self.interval_seconds: float = interval_seconds
+        self.quotes_per_connection: int | None = quotes_per_connection
+        self.next_quote: int = 0
+        self.number_of_connections: int = 0
+        self.server: ThreadingHTTPServer = ThreadingHTTPServer(('localhost', 0), self._create_handler())
+        self.port: int = self.server.server_address[1]
+        self.thread: threading.Thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @staticmethod
+    def read_quotes(filename: str) -> List[Quote]:
+        """
+        :param filename: A CSV file with the epoch time, ask and bid of each quote.
+        """
+        quotes: pd.DataFrame = pd.read_csv(filename)
+        return [Quote(time=pd.Timestamp.fromtimestamp(epoch_time).to_pydatetime(), ask=ask, bid=bid, mid=(ask + bid) / 2)
+                for epoch_time, ask, bid in quotes[['time', 'ask', 'bid']].itertuples(index=False, name=None)]
+
+    def to_message(self, quote: Quote) -> str:
+        return json.dumps({'type': 'PRICE', 'instrument': self.pair, 'time': '{:.9f}'.format(quote.time.timestamp()), 'tradeable': True,
+                           'asks': [{'price': quote.ask, 'liquidity': 1000000}], 'bids': [{'price': quote.bid, 'liquidity': 1000000}]})
+
+    def _create_handler(self) -> type:
+        server: ReplayPriceStreamServer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Without a content length, the response lasts until the connection is closed, like a stream.
+            protocol_version = 'HTTP/1.0'
+
+            def do_GET(self):
+                server.number_of_connections += 1
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/octet-stream')
+                self.end_headers()
+                self._write_line(HEARTBEAT_MESSAGE)
+                sent_quotes: int = 0
+                while server.next_quote < len(server.quotes) and (server.quotes_per_connection is None or sent_quotes < server.quotes_per_connection):
+                    self._write_line(server.to_message(server.quotes[server.next_quote]))
+                    server.next_quote += 1
+                    sent_quotes += 1
+                    time.sleep(server.interval_seconds)
+
+            def _write_line(self, line: str):
+                self.wfile.write(line.encode('utf-8') + b'\n')
+                self.wfile.flush()
+
+            def log_message(self, *_):
+                pass
+
+        return Handler
+
+    def start(self) -> ReplayPriceStreamServer:
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, List
+
+import src.util.Utilities as Utilities
+from src.app.HistoricalReplay import HistoricalReplay, ReplayReport, Transport
+from src.client.DataClient import DataClient
+from src.model.Granularity import Granularity
+from src.model.Indicator import Indicator
+
+
+if __name__ == '__main__':
+    if not Utilities.instruments_file_exists():
+        DataClient(live=False).get_instruments_and_save_to_file()
+
+    pairs: List[str] = ["EUR_USD", "GBP_USD"]
+    candlestick_granularity: Granularity = Granularity.M5
+    # The granularity of the stored candles to replay, which are split into quotes.
+    replay_granularity: Granularity = Granularity.M1
+    indicator: Indicator = Indicator.MA_CROSSOVER
+    indicator_params: Dict | None = {'short_window': 16, 'long_window': 64}
+    order_units: int = 100000
+    # 'in_process' runs without RabbitMQ. Use 'rabbitmq' to include the message broker, as when trading live.
+    transport: Transport = 'in_process'
+    historical_replay: HistoricalReplay = HistoricalReplay(pairs, indicator, candlestick_granularity, order_units, indicator_params, transport)
+    report: ReplayReport = historical_replay.replay_stored_candles(replay_granularity, datetime(2024, 1, 1), datetime(2024, 6, 28))
+    print(report)
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+import math
+import struct
+from dataclasses import dataclass, fields
 from datetime import datetime
-from typing import Dict, Set, List
+from typing import Dict, FrozenSet, List, Tuple
 
 
-@dataclass
+@dataclass(slots=True)
 class Candle:
     time: datetime
     volume: float = None
@@ -25,22 +27,27 @@ class Candle:
 
     @staticmethod
     def from_dict(candle_dict: Dict[str, datetime | float]):
-        candle_keys: Set[str] = set(Candle.columns())
         # if candle_dict.keys() != vars(Candle(datetime.now())).keys():
         #     raise ValueError("Invalid candle data: {}".format(candle_dict))
-        return Candle(**{key: value for key, value in candle_dict.items() if key in candle_keys})
+        return Candle(**{key: value for key, value in candle_dict.items() if key in CANDLE_COLUMN_SET})
 
     @staticmethod
     def columns() -> List[str]:
-        return list(vars(Candle(datetime.now())).keys())
+        return list(CANDLE_COLUMNS)
+
+    def to_dict(self) -> Dict[str, datetime | float]:
+        """
+        Candles use slots to stay small, so use this instead of vars().
+        """
+        return {column: getattr(self, column) for column in CANDLE_COLUMNS}
 
     def __str__(self):
-        non_null_vars = {key: value for key, value in vars(self).items() if value is not None}
+        non_null_vars = {key: value for key, value in self.to_dict().items() if value is not None}
         non_null_vars['time'] = self.time.timestamp()
         return json.dumps(non_null_vars)
 
     def __eq__(self, other):
-        return all(x == y for x, y in zip(vars(self).values(), vars(other).values()))
+        return all(getattr(self, column) == getattr(other, column) for column in CANDLE_COLUMNS)
 
     def serialise(self):
         return self.__str__()
@@ -50,3 +57,35 @@ class Candle:
         candle_dict: Dict = json.loads(candle_json)
         candle_dict['time'] = datetime.fromtimestamp(candle_dict['time'])
         return Candle(**candle_dict)
+
+    def to_bytes(self) -> bytes:
+        """
+        Binary counterpart of serialise(): the epoch time followed by the volume and prices, as little-endian doubles in
+        CANDLE_COLUMNS order. Missing values are encoded as NaN.
+        """
+        return CANDLE_STRUCT.pack(self.time.timestamp(), *(math.nan if value is None else value for value in self.to_values()))
+
+    def to_values(self) -> Tuple[float | None, ...]:
+        """
+        :return: The volume and prices, in CANDLE_COLUMNS order.
+        """
+        return (self.volume, self.ask_o, self.ask_h, self.ask_l, self.ask_c, self.bid_o, self.bid_h, self.bid_l, self.bid_c,
+                self.mid_o, self.mid_h, self.mid_l, self.mid_c)
+
+    @staticmethod
+    def from_values(values: Tuple[float, ...]) -> Candle:
+        """
+        :param values: The epoch time followed by the volume and prices, as unpacked with CANDLE_STRUCT.
+        """
+        return Candle(datetime.fromtimestamp(values[0]), *(value if value == value else None for value in values[1:]))
+
+    @staticmethod
+    def from_bytes(candle_bytes: bytes) -> Candle:
+        return Candle.from_values(CANDLE_STRUCT.unpack(candle_bytes))
+
+
+# Column metadata is computed once, rather than per candle.
+CANDLE_COLUMNS: Tuple[str, ...] = tuple(field.name for field in fields(Candle))
+CANDLE_COLUMN_SET: FrozenSet[str] = frozenset(CANDLE_COLUMNS)
+# Fixed binary layout of a candle: one little-endian double per column, with the time as epoch seconds.
+CANDLE_STRUCT: struct.Struct = struct.Struct('<{}d'.format(len(CANDLE_COLUMNS)))
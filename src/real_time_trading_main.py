@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import Dict
+from typing import Dict, List
 
 import src.util.Utilities as Utilities
 from src.client.DataClient import DataClient
@@ -13,8 +13,8 @@ from src.model.Indicator import Indicator
 from multiprocessing import Process
 
 
-def start_live_data_store(_pair: str, _candlestick_granularity: Granularity, _price_granularity: Granularity):
-    live_data_store = LiveDataStore(_pair, _candlestick_granularity, _price_granularity)
+def start_live_data_store(_pairs: List[str], _candlestick_granularities: List[Granularity], _price_granularity: Granularity, _streaming: bool, _live_prices: bool):
+    live_data_store = LiveDataStore(_pairs, _candlestick_granularities, _price_granularity, _streaming, _live_prices)
     live_data_store.start()
 
 
@@ -27,17 +27,27 @@ if __name__ == '__main__':
     if not Utilities.instruments_file_exists():
         DataClient(live=False).get_instruments_and_save_to_file()
 
-    pair: str = "EUR_USD"
+    pairs: List[str] = ["EUR_USD"]
     candlestick_granularity: Granularity = Granularity.S30
     price_granularity: Granularity = Granularity.S5
+    # Generate candles from the pricing stream, rather than polling for the latest prices every price_granularity.
+    streaming: bool = True
+    # Prices come from the live account, whichever account is traded on.
+    live_prices: bool = True
     indicator: Indicator = Indicator.MA_CROSSOVER
     indicator_params: Dict | None = {'short_window': 16, 'long_window': 64}
     live: bool = False
     order_units: int = 100000
     historical_data_start_time: datetime = datetime.now() - timedelta(days=1)
-    live_data_store_process: Process = Process(target=start_live_data_store, args=(pair, candlestick_granularity, price_granularity))
-    live_trader_process: Process = Process(target=start_live_trader, args=(pair, indicator, candlestick_granularity, live, historical_data_start_time, order_units, indicator_params))
+    # A single data store serves all pairs, with one trader per pair.
+    live_data_store_process: Process = Process(target=start_live_data_store, args=(pairs, [candlestick_granularity], price_granularity, streaming, live_prices))
+    live_trader_processes: List[Process] = [
+        Process(target=start_live_trader, args=(pair, indicator, candlestick_granularity, live, historical_data_start_time, order_units, indicator_params))
+        for pair in pairs
+    ]
     live_data_store_process.start()
-    live_trader_process.start()
+    for live_trader_process in live_trader_processes:
+        live_trader_process.start()
     live_data_store_process.join()
-    live_trader_process.join()
+    for live_trader_process in live_trader_processes:
+        live_trader_process.join()
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+import pika
+
+
+class InProcessChannel:
+    """
+    Stand-in for a pika channel that delivers each published message straight to the consumers of its queue, in the publishing
+    thread. Use to run the data store and traders in one process without RabbitMQ, e.g. when replaying historical data.
+    """
+    def __init__(self):
+        self.consumers: Dict[str, List[Callable]] = {}
+        self.number_of_messages: int = 0
+        self.method: SimpleNamespace = SimpleNamespace(delivery_tag=0)
+
+    def queue_declare(self, queue: str) -> None:
+        self.consumers.setdefault(queue, [])
+
+    def basic_consume(self, queue: str, on_message_callback: Callable, auto_ack: bool = True) -> None:
+        """
+        :param on_message_callback: Called with the channel, the delivery method, the properties and the body of each message.
+        """
+        self.consumers.setdefault(queue, []).append(on_message_callback)
+
+    def basic_publish(self, exchange: str, routing_key: str, body: bytes, properties: pika.BasicProperties | None = None) -> None:
+        self.number_of_messages += 1
+        for on_message_callback in self.consumers.get(routing_key, ()):
+            on_message_callback(self, self.method, properties or pika.BasicProperties(), body)
@@ -1,48 +1,114 @@
+from datetime import datetime
 from time import sleep
+from typing import Dict, Iterable, List, Tuple
 
 import pika
 
 from src.model.candle.Candle import Candle
 from src.model.Granularity import Granularity
+from src.model.Quote import Quote
 from src.service.CandleGenerator import CandleGenerator
 from src.client.DataClient import DataClient
+from src.client.PriceStreamClient import PriceStreamClient
+from src.util.CandleWireFormat import encode_candles, WireFormat
+from src.util.LatencyTracker import CANDLE_CLOSE, PUBLISH, stamp
+
+
+def get_channel_name(pair: str, granularity: Granularity) -> str:
+    """
+    :return: The name of the queue that the candles of a pair and granularity are published to.
+    """
+    return '{}_{}_LIVE_CANDLES'.format(pair, granularity.name)
 
 
 class LiveDataStore:
-    def __init__(self, pair: str, candlestick_granularity: Granularity, price_granularity: Granularity):
-        print("Initialising LiveDataStore for pair {}, candlestick granularity {} and price granularity {}".format(pair, candlestick_granularity.name, price_granularity.name))
-        self.pair: str = pair
-        self.candlestick_granularity: Granularity = candlestick_granularity
+    def __init__(self, pairs: List[str], candlestick_granularities: List[Granularity], price_granularity: Granularity, streaming: bool = False, live: bool = True,
+                 price_stream_client: PriceStreamClient | None = None, wire_format: WireFormat = 'binary', channel=None, historical: bool = False):
+        """
+        Generates candles for many pairs and granularities in a single process. Prices for all pairs are retrieved with one request, or
+        one stream subscription, and candles are published to one queue per pair and granularity over a single channel.
+        :param price_granularity: How often to poll for the latest prices, if not streaming.
+        :param streaming: If True, candles are generated from the pricing stream as prices arrive, rather than from polled prices.
+        :param live: Whether prices come from the live or the demo account, whether streamed or polled.
+        :param price_stream_client: The client to stream prices with. Defaults to the pricing stream of the account chosen by live.
+        :param wire_format: How candles are encoded. The format is sent in the content type of each message, so traders can decode either.
+        :param channel: The channel to publish candles over, e.g. an InProcessChannel. Defaults to a channel to the local RabbitMQ broker.
+        :param historical: Whether the quotes are historical, e.g. when replaying. Candle close times are then not sent as latency stamps,
+        as they are not comparable with the current time.
+        """
+        print("Initialising LiveDataStore for pairs {}, candlestick granularities {} and price granularity {}".format(
+            ', '.join(pairs), ', '.join(granularity.name for granularity in candlestick_granularities), price_granularity.name))
+        self.pairs: List[str] = pairs
+        self.candlestick_granularities: List[Granularity] = candlestick_granularities
         self.price_granularity: Granularity = price_granularity
+        self.streaming: bool = streaming
+        self.live: bool = live
+        self.wire_format: WireFormat = wire_format
+        self.historical: bool = historical
+
+        self.data_client: DataClient | None = None if streaming else DataClient(live=live)
+        self.price_stream_client: PriceStreamClient | None = price_stream_client
+        # One candle generator per pair and granularity, looked up by pair as each quote arrives.
+        self.candle_generators: Dict[str, List[Tuple[Granularity, CandleGenerator]]] = {
+            pair: [(granularity, CandleGenerator(pair, granularity)) for granularity in candlestick_granularities] for pair in pairs
+        }
+
+        self.connection: pika.BlockingConnection | None = None
+        if channel is None:
+            self.connection = pika.BlockingConnection(pika.ConnectionParameters('localhost'))
+            channel = self.connection.channel()
+        self.channel: pika.adapters.blocking_connection.BlockingChannel = channel
+        self.number_of_published_candles: int = 0
+        for pair in pairs:
+            for granularity in candlestick_granularities:
+                self.channel.queue_declare(queue=get_channel_name(pair, granularity))
+                print("Created queue {}".format(get_channel_name(pair, granularity)))
 
-        self.data_client: DataClient = DataClient(live=True)
-        self.candle_generator: CandleGenerator = CandleGenerator(pair, candlestick_granularity)
+    def publish(self, pair: str, granularity: Granularity, candles: List[Candle], close_time: datetime):
+        """
+        Publishes candles of a pair and granularity in a single message.
+        :param close_time: When the first candle closed. Sent along with the publish time as latency stamps in the message headers,
+        so that the trader can measure each stage of the pipeline.
+        """
+        content_type, body = encode_candles(candles, self.wire_format)
+        stamps: Dict[str, int] = {} if self.historical else {CANDLE_CLOSE: int(close_time.timestamp() * 1e9)}
+        properties: pika.BasicProperties = pika.BasicProperties(content_type=content_type, headers=stamp(stamps, PUBLISH))
+        self.channel.basic_publish(exchange='', routing_key=get_channel_name(pair, granularity), body=body, properties=properties)
+        self.number_of_published_candles += len(candles)
+        print("{}: {} {} candle(s) published, timestamp: {}".format(pair, len(candles), granularity.name, candles[-1].time.strftime("%Y-%m-%d %H:%M:%S")))
 
-        self.connection: pika.BlockingConnection = pika.BlockingConnection(pika.ConnectionParameters('localhost'))
-        self.channel: pika.adapters.blocking_connection.BlockingChannel = self.connection.channel()
-        self.channel_name: str = '{}_LIVE_CANDLES'.format(self.pair)
-        self.channel.queue_declare(queue=self.channel_name)
-        print("Created queue {}".format(self.channel_name))
+    def ingest_quotes(self, quotes: Iterable[Tuple[str, Quote]]):
+        """
+        Feeds quotes to the candle generators of their pairs, then publishes the candles they complete, in one message per queue.
+        """
+        completed_candles: Dict[Tuple[str, Granularity], Tuple[List[Candle], datetime]] = {}
+        for pair, quote in quotes:
+            for granularity, candle_generator in self.candle_generators[pair]:
+                candle: Candle | None = candle_generator.generate(quote)
+                if candle:
+                    completed_candles.setdefault((pair, granularity), ([], quote.time))[0].append(candle)
+        for (pair, granularity), (candles, close_time) in completed_candles.items():
+            self.publish(pair, granularity, candles, close_time)
 
-    def get_channel_name(self) -> str:
-        return self.channel_name
+    def stream(self):
+        if self.price_stream_client is None:
+            self.price_stream_client = PriceStreamClient(live=self.live)
+        for pair, quote in self.price_stream_client.stream(self.pairs):
+            self.ingest_quotes([(pair, quote)])
 
-    def publish_candle(self):
-        # quote: Quote = Quote.from_dict(self.data_client.get_price(self.pair))
-        # candle: Candle = self.candle_generator.generate(quote)
-        candle: Candle = self.data_client.get_latest_candle(self.pair, self.candlestick_granularity)
-        if candle:
-            self.channel.basic_publish(exchange='', routing_key=self.channel_name, body=str(candle))
-            print("{}: Candle published, timestamp: {}".format(self.pair, candle.time.strftime("%Y-%m-%d %H:%M:%S")))
-        # else:
-        #     print("No candle yet. Price: {}".format(quote))
+    def poll(self):
+        while True:
+            sleep(self.price_granularity.value.total_seconds())
+            self.ingest_quotes(self.data_client.get_prices(self.pairs).items())
 
     def start(self):
         try:
-            while True:
-                sleep(self.price_granularity.value.total_seconds())
-                self.publish_candle()
+            if self.streaming:
+                self.stream()
+            else:
+                self.poll()
         except KeyboardInterrupt:
-            self.connection.close()
+            if self.connection:
+                self.connection.close()
             print("Stopped LiveDataStore.")
             exit(1)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.model.candle.Price import Price
+
+TRADE_COLUMNS = ['entry_time', 'entry_price', 'exit_time', 'exit_price', 'trade_closed']
+
+
+class TradeSimulator:
+    """
+    Simulates the fills of entry-stop trades on finer granularity candles, with the same rules as Trade:
+    - A trade is entered on the first candle after its signal candle whose close reaches the entry stop (ask for buys, bid for sells).
+    - It is exited on the first candle after its entry candle whose close reaches the stop loss or take profit (bid for buys,
+      ask for sells).
+    - A new signal replaces the current trade. The current trade is updated with the new signal candle first, and if it is still
+      open, it is closed at that candle without having reached its stop loss or take profit (trade_closed is False).
+    Instead of updating a Trade candle by candle, the candles at which each condition holds are found for all trades at once,
+    and the first of them after each trade's entry or signal candle is looked up with a binary search.
+    """
+    def __init__(self, candles: DataFrame):
+        """
+        :param candles: The candles to simulate the trades on, sorted by time.
+        """
+        self.times: np.ndarray = pd.to_datetime(candles['time']).to_numpy(dtype='datetime64[ns]')
+        self.ask_closes: np.ndarray = candles[Price.ASK_CLOSE.value].to_numpy(dtype=np.float64)
+        self.bid_closes: np.ndarray = candles[Price.BID_CLOSE.value].to_numpy(dtype=np.float64)
+
+    def simulate(self, signals: DataFrame) -> DataFrame:
+        """
+        :param signals: One row per non-zero signal, sorted by time, with the time, signal, entry_stop, stop_loss and
+        take_profit columns. Each signal applies from the first candle at or after its time.
+        :return: The signals, along with the entry_time, entry_price, exit_time, exit_price and trade_closed columns.
+        Entry and exit columns are missing (NaN/NaT) for trades that were never entered or are still open at the last candle.
+        """
+        trades: DataFrame = signals.reset_index(drop=True)
+        if trades.empty or not len(self.times):
+            return trades.reindex(columns=list(trades.columns) + TRADE_COLUMNS)
+        signal_rows: np.ndarray = np.searchsorted(self.times, pd.to_datetime(trades['time']).to_numpy(dtype='datetime64[ns]'))
+        # Each trade can be updated from the candle after its signal candle up to, and including, the next signal candle.
+        first_rows: np.ndarray = signal_rows + 1
+        last_rows: np.ndarray = np.minimum(np.append(signal_rows[1:], len(self.times)), len(self.times) - 1)
+        # The trade that each candle can update. Candles up to the first signal candle are given the first trade, but never read.
+        trade_indices: np.ndarray = np.maximum(np.searchsorted(signal_rows, np.arange(len(self.times)), side='left') - 1, 0)
+        trade_for_each_candle: DataFrame = trades[['signal', 'entry_stop', 'stop_loss', 'take_profit']].iloc[trade_indices]
+        entry_rows: np.ndarray = self._first_rows_where(self._entry_reached(trade_for_each_candle), first_rows, last_rows)
+        entered: np.ndarray = entry_rows >= 0
+        exit_rows: np.ndarray = self._first_rows_where(self._exit_reached(trade_for_each_candle), entry_rows + 1, np.where(entered, last_rows, -1))
+        trade_closed: np.ndarray = exit_rows >= 0
+        # Trades still open at the next signal are closed there. The last trade stays open.
+        has_next_signal: np.ndarray = np.arange(len(signal_rows)) < len(signal_rows) - 1
+        replaced: np.ndarray = entered & ~trade_closed & has_next_signal
+        exit_rows[replaced] = last_rows[replaced]
+        exited: np.ndarray = exit_rows >= 0
+
+        buy: np.ndarray = trades['signal'].to_numpy() == 1
+        entry_prices: np.ndarray = np.where(buy, self.ask_closes[np.where(entered, entry_rows, 0)], self.bid_closes[np.where(entered, entry_rows, 0)])
+        exit_prices: np.ndarray = np.where(buy, self.bid_closes[np.where(exited, exit_rows, 0)], self.ask_closes[np.where(exited, exit_rows, 0)])
+        trades['entry_time'] = np.where(entered, self.times[np.where(entered, entry_rows, 0)], np.datetime64('NaT', 'ns'))
+        trades['entry_price'] = np.where(entered, entry_prices, np.nan)
+        trades['exit_time'] = np.where(exited, self.times[np.where(exited, exit_rows, 0)], np.datetime64('NaT', 'ns'))
+        trades['exit_price'] = np.where(exited, exit_prices, np.nan)
+        trades['trade_closed'] = trade_closed
+        return trades
+
+    def _entry_reached(self, trade_for_each_candle: DataFrame) -> np.ndarray:
+        """
+        :param trade_for_each_candle: The trade that each candle can update, one row per candle.
+        :return: Whether each candle reaches the entry stop of its trade.
+        """
+        buy: np.ndarray = trade_for_each_candle['signal'].to_numpy() == 1
+        entry_stops: np.ndarray = trade_for_each_candle['entry_stop'].to_numpy(dtype=np.float64)
+        return np.where(buy, self.ask_closes >= entry_stops, self.bid_closes <= entry_stops)
+
+    def _exit_reached(self, trade_for_each_candle: DataFrame) -> np.ndarray:
+        """
+        :param trade_for_each_candle: The trade that each candle can update, one row per candle.
+        :return: Whether each candle reaches the stop loss or take profit of its trade.
+        """
+        buy: np.ndarray = trade_for_each_candle['signal'].to_numpy() == 1
+        stop_losses: np.ndarray = trade_for_each_candle['stop_loss'].to_numpy(dtype=np.float64)
+        take_profits: np.ndarray = trade_for_each_candle['take_profit'].to_numpy(dtype=np.float64)
+        buy_exit: np.ndarray = (self.bid_closes <= stop_losses) | (self.bid_closes >= take_profits)
+        sell_exit: np.ndarray = (self.ask_closes >= stop_losses) | (self.ask_closes <= take_profits)
+        return np.where(buy, buy_exit, sell_exit)
+
+    @staticmethod
+    def _first_rows_where(condition: np.ndarray, first_rows: np.ndarray, last_rows: np.ndarray) -> np.ndarray:
+        """
+        :return: For each trade, the first row between first_rows and last_rows (inclusive) where the condition holds, or -1.
+        """
+        hit_rows: np.ndarray = np.append(np.flatnonzero(condition), len(condition))
+        first_hit_rows: np.ndarray = hit_rows[np.searchsorted(hit_rows, np.minimum(first_rows, len(condition)))]
+        return np.where(first_hit_rows <= last_rows, first_hit_rows, -1)
@@ -1,58 +1,106 @@
-# from pandas import DataFrame
-#
-# from src.service.signal_generators.SignalGenerator import SignalGenerator
-# from src.model.signal_generator_iterations.SignalGeneratorIteration import SignalGeneratorIteration
-#
-#
-# ENTRY_PRICE_MUL = 0.1
-# STOP_LOSS_MUL = 0.4
-# TAKE_PROFIT_MUL = 0.8
-#
-#
-# TODO: Implement this signal generator.
-# class InsideBarMomentumSignalGenerator(SignalGenerator):
-#
-#     def _generate_inside_bar_momentum_indicators(self):
-#         self.queue['range_prev'] = (self.queue[Price.MID_HIGH.value] - self.queue[Price.MID_LOW.value]).shift(1)
-#         self.queue['mid_h_prev'] = self.queue[Price.MID_HIGH.value].shift(1)
-#         self.queue['mid_l_prev'] = self.queue[Price.MID_LOW.value].shift(1)
-#         self.queue['direction_prev'] = self.queue.apply(lambda row: 1 if row[Price.MID_CLOSE.value] > row[Price.MID_OPEN.value] else -1, axis=1).shift(1)
-#         self.queue.dropna(inplace=True)
-#         self.queue.reset_index(drop=True, inplace=True)
-#
-#     def _inside_bar_momentum_indicators(self, indicator: Literal['entry_stop', 'stop_loss', 'take_profit'], row: Dict[str, float]):
-#         if self.granularity not in [Granularity.H4, Granularity.H6, Granularity.H8, Granularity.H12, Granularity.D, Granularity.W, Granularity.M]:
-#             raise ValueError('Please enter a granularity larger than or equal to H4 to generate inside bar momentum indicators.')
-#         reference_price_column = 'mid_h_prev' if row['signal'] == 1 else 'mid_l_prev'
-#         if indicator == 'entry_stop':
-#             return row[reference_price_column] + row['signal'] * (row['range_prev'] * ENTRY_PRICE_MUL)
-#         if indicator == 'stop_loss':
-#             return row[reference_price_column] + -1 * row['signal'] * (row['range_prev'] * STOP_LOSS_MUL)
-#         if indicator == 'take_profit':
-#             return row[reference_price_column] + row['signal'] * (row['range_prev'] * TAKE_PROFIT_MUL)
-#
-#     def _generate_inside_bar_momentum_signals(self):
-#         self._generate_inside_bar_momentum_indicators()
-#         self.queue['signal'] = self.queue.apply(lambda row: row['direction_prev'] if row['mid_h_prev'] > row[Price.MID_HIGH.value] and row['mid_l_prev'] < row[Price.MID_LOW.value] else 0, axis=1)
-#         self.queue['entry_stop'] = self.queue.apply(functools.partial(self._inside_bar_momentum_indicators, 'entry_stop'), axis=1)
-#         self.queue['stop_loss'] = self.queue.apply(functools.partial(self._inside_bar_momentum_indicators, 'stop_loss'), axis=1)
-#         self.queue['take_profit'] = self.queue.apply(functools.partial(self._inside_bar_momentum_indicators, 'take_profit'), axis=1)
-#         self.queue.drop(['mid_h_prev', 'mid_l_prev', 'direction_prev'], axis=1, inplace=True)
-#         self.signals = self.queue[self.queue['signal'] != 0]
-#
-#     def generate_inside_bar_momentum_signal_detail_columns(self, use_pips: bool) -> DataFrame:
-#         if self.signals.empty or 'entry_time' not in self.queue.columns:
-#             raise ValueError("Please generate signals before using this function.")
-#         gain_literal = (self.queue['exit_price'] - self.queue['entry_price']) * self.queue['signal']
-#         self.queue['gain'] = gain_literal / (10 ** self.pip_location if use_pips else 1)
-#         self.queue['duration'] = (self.queue['exit_time'] - self.queue['entry_time']).apply(lambda time: time.seconds / 60)
-#         self.signals = self.queue[self.queue['signal'].notna()]
-#         return self.signals
-#
-#     def iterate(self) -> SignalGeneratorIteration:
-#         pass
-#
-#     def generate_signals_for_backtesting(self, use_pips: bool) -> DataFrame:
-#         self._generate_inside_bar_momentum_signals()
-#         return self.signals
-#
+import math
+from typing import Dict, override
+
+import numpy as np
+from pandas import DataFrame
+
+from src.model.Granularity import Granularity
+from src.model.candle.Candle import Candle
+from src.model.candle.Price import Price
+from src.service.signal_generators.SignalGenerator import SignalGenerator
+from src.model.signal_generator_iterations.InsideBarMomentumIteration import InsideBarMomentumIteration
+
+ENTRY_PRICE_MUL = 0.1
+STOP_LOSS_MUL = 0.4
+TAKE_PROFIT_MUL = 0.8
+MINIMUM_GRANULARITY: Granularity = Granularity.H4
+
+
+class InsideBarMomentumSignalGenerator(SignalGenerator):
+    """
+    A generator to generate signals for the Inside Bar Momentum indicator. A candle whose range lies within the range of the
+    previous candle gives a signal in the direction of the previous candle, along with an entry stop, stop loss and take profit
+    placed around the previous candle's high (for buys) or low (for sells), relative to its range.
+    Works for backtesting, where all signals are computed in one go with array operations, or iterative generation for live
+    trading, where only the previous candle is kept.
+    """
+    iteration_type: type = InsideBarMomentumIteration
+
+    def __init__(self, pair: str, pip_location: float, granularity: Granularity, initial_candles: DataFrame = None,
+                 max_iterations_in_memory: int | None = None, iteration_log_filename: str | None = None):
+        if granularity.value < MINIMUM_GRANULARITY.value:
+            raise ValueError('Please enter a granularity larger than or equal to H4 to generate inside bar momentum indicators.')
+        super().__init__(pair, pip_location, granularity, initial_candles, max_iterations_in_memory, iteration_log_filename)
+        self.previous_candle: Candle | None = None
+        # Initialise queue if initial data was provided
+        if isinstance(initial_candles, DataFrame):
+            self.iterate_from_dataframe(initial_candles)
+
+    @staticmethod
+    def trade_levels(signal: int | np.ndarray, mid_h_prev: float | np.ndarray, mid_l_prev: float | np.ndarray,
+                     range_prev: float | np.ndarray) -> Dict[str, float | np.ndarray]:
+        """
+        Computes the entry stop, stop loss and take profit, for a single candle or for arrays of candles.
+        :return: A dictionary with the entry_stop, stop_loss and take_profit.
+        """
+        reference_price = np.where(signal == 1, mid_h_prev, mid_l_prev) if isinstance(signal, np.ndarray) else (mid_h_prev if signal == 1 else mid_l_prev)
+        return {
+            'entry_stop': reference_price + signal * (range_prev * ENTRY_PRICE_MUL),
+            'stop_loss': reference_price + -1 * signal * (range_prev * STOP_LOSS_MUL),
+            'take_profit': reference_price + signal * (range_prev * TAKE_PROFIT_MUL),
+        }
+
+    @override
+    def iterate(self, candle: Candle) -> None:
+        previous_candle: Candle | None = self.previous_candle
+        self.previous_candle = candle
+        if previous_candle is None:
+            self.queue.record(candle, signal=0, range_prev=math.nan, mid_h_prev=math.nan, mid_l_prev=math.nan, direction_prev=math.nan,
+                              **self.trade_levels(0, math.nan, math.nan, math.nan))
+            return
+        range_prev: float = previous_candle.mid_h - previous_candle.mid_l
+        direction_prev: float = 1.0 if previous_candle.mid_c > previous_candle.mid_o else -1.0
+        inside_bar: bool = previous_candle.mid_h > candle.mid_h and previous_candle.mid_l < candle.mid_l
+        signal: int = int(direction_prev) if inside_bar else 0
+        self.queue.record(candle, signal=signal, range_prev=range_prev, mid_h_prev=previous_candle.mid_h, mid_l_prev=previous_candle.mid_l,
+                          direction_prev=direction_prev, **self.trade_levels(signal, previous_candle.mid_h, previous_candle.mid_l, range_prev))
+
+    @override
+    def generate_signals_for_backtesting(self, candles: DataFrame, use_pips: bool, vectorised: bool = False) -> None:
+        """
+        Generate signals for all candles in one go, for backtesting.
+        :param candles: DataFrame containing all historical data to generate signals for.
+        :param use_pips: Whether to use pips to calculate returns. If false, will use nominal value.
+        :param vectorised: If True, computes the signals over the whole DataFrame with array operations, comparing each candle
+        with the previous one, instead of iterating candle by candle. Both record the same iterations in the queue.
+        """
+        if not vectorised:
+            super().generate_signals_for_backtesting(candles, use_pips)
+            return
+        if self.queue:
+            raise ValueError("Please do not initialise the iteration queue if backtesting.")
+        mid_o, mid_h, mid_l, mid_c = (candles[price.value].to_numpy(dtype=np.float64)
+                                      for price in (Price.MID_OPEN, Price.MID_HIGH, Price.MID_LOW, Price.MID_CLOSE))
+        # Shift each column by one candle. The first candle has no previous candle.
+        mid_h_prev, mid_l_prev, range_prev, direction_prev = (np.full(len(candles), np.nan) for _ in range(4))
+        mid_h_prev[1:] = mid_h[:-1]
+        mid_l_prev[1:] = mid_l[:-1]
+        range_prev[1:] = (mid_h - mid_l)[:-1]
+        direction_prev[1:] = np.where(mid_c > mid_o, 1.0, -1.0)[:-1]
+        signals: np.ndarray = np.where((mid_h_prev > mid_h) & (mid_l_prev < mid_l), direction_prev, 0).astype(np.int64)
+        self.queue.extend(candles, signals, range_prev=range_prev, mid_h_prev=mid_h_prev, mid_l_prev=mid_l_prev, direction_prev=direction_prev,
+                          **self.trade_levels(signals, mid_h_prev, mid_l_prev, range_prev))
+        if len(candles):
+            self.previous_candle = self.queue[-1].candle
+
+    @staticmethod
+    def add_trade_details(trades: DataFrame, pip_location: float, use_pips: bool) -> DataFrame:
+        """
+        :param trades: Simulated trades, as returned by TradeSimulator.simulate().
+        :param pip_location: The pip location of the pair.
+        :param use_pips: Whether to express the gain in pips. If false, will use nominal value.
+        :return: The trades, along with the gain and the duration of each trade, in minutes.
+        """
+        gain_literal = (trades['exit_price'] - trades['entry_price']) * trades['signal']
+        return trades.assign(gain=gain_literal / (10 ** pip_location if use_pips else 1),
+                             duration=(trades['exit_time'] - trades['entry_time']).dt.total_seconds() / 60)
@@ -1,30 +1,38 @@
-from collections import deque
-from typing import Literal, override, List
+import math
+from typing import Literal, override
 
+import numpy as np
 from pandas import DataFrame
 
 from src.model.Granularity import Granularity
 from src.model.candle.Candle import Candle
+from src.model.candle.Price import Price
 from src.service.signal_generators.SignalGenerator import SignalGenerator
+from src.util.RingBuffer import RingBuffer
 from src.model.signal_generator_iterations.MovingAverageCrossoverIteration import MovingAverageCrossoverIteration
 
+# Averages closer than this (relative to the larger average) are considered equal, so that rounding noise from the way the averages
+# were summed cannot create or hide a crossover.
+AVERAGE_RELATIVE_TOLERANCE: float = 1e-9
+
 
 class MovingAverageCrossoverSignalGenerator(SignalGenerator):
     """
     A generator to generate signals for the Moving Average Crossover indicator. Works for backtesting or iterative generation
     for live trading.
     """
-    def __init__(self, pair: str, pip_location: float, granularity: Granularity, short_window: int, long_window: int, initial_candles: DataFrame = None):
-        super().__init__(pair, pip_location, granularity, initial_candles)
+    iteration_type: type = MovingAverageCrossoverIteration
+
+    def __init__(self, pair: str, pip_location: float, granularity: Granularity, short_window: int, long_window: int, initial_candles: DataFrame = None,
+                 max_iterations_in_memory: int | None = None, iteration_log_filename: str | None = None):
+        super().__init__(pair, pip_location, granularity, initial_candles, max_iterations_in_memory, iteration_log_filename)
         # Set windows and averages
         self.short_window = short_window
         self.long_window = long_window
         self.current_long_average, self.current_short_average = 0, 0
-        # Set queue
-        self.queue: List[MovingAverageCrossoverIteration] = []
-        # Set queues
-        self.long_candles_queue: deque[Candle] = deque(maxlen=self.long_window)
-        self.short_candles_queue: deque[Candle] = deque(maxlen=self.short_window)
+        # Set closing price buffers
+        self.long_closes: RingBuffer = RingBuffer(self.long_window)
+        self.short_closes: RingBuffer = RingBuffer(self.short_window)
         # Initialise queue if initial data was provided
         if isinstance(initial_candles, DataFrame):
             self.iterate_from_dataframe(initial_candles)
@@ -32,48 +40,136 @@ class MovingAverageCrossoverSignalGenerator(SignalGenerator):
     def generate_signal(self) -> int:
         """
         Generates a signal for the latest short and long total values.
+        No signal is generated until the previous iteration had a full long window, as the averages are partial until then. Every
+        iteration recorded counts, including those no longer held in memory.
         :return: A signal: 1 for buy, -1 for sell and 0 for nothing.
         """
-        if not self.short_candles_queue or self.long_candles_queue:
+        if self.queue.number_of_iterations < self.long_window:
             return 0
-        previous_difference = self.queue[-1].short_average - self.queue[-1].long_average
-        current_difference = self.current_short_average - self.current_long_average
+        previous_difference = self.average_difference(self.queue.latest('short_average'), self.queue.latest('long_average'))
+        current_difference = self.average_difference(self.current_short_average, self.current_long_average)
         if current_difference <= 0 < previous_difference:
             return -1
         if previous_difference < 0 <= current_difference:
             return 1
         return 0
 
-    def _iterate_queue(self, candle, window_type: Literal["long", "short"]):
+    @staticmethod
+    def average_difference(short_average: float, long_average: float) -> float:
+        """
+        :return: The difference between the short and long averages, or zero if they are equal within AVERAGE_RELATIVE_TOLERANCE.
+        """
+        if math.isclose(short_average, long_average, rel_tol=AVERAGE_RELATIVE_TOLERANCE):
+            return 0.0
+        return short_average - long_average
+
+    @staticmethod
+    def average_differences(short_averages: np.ndarray, long_averages: np.ndarray) -> np.ndarray:
+        """
+        Array version of average_difference().
+        """
+        differences: np.ndarray = short_averages - long_averages
+        tolerances: np.ndarray = AVERAGE_RELATIVE_TOLERANCE * np.maximum(np.abs(short_averages), np.abs(long_averages))
+        differences[np.abs(differences) <= tolerances] = 0.0
+        return differences
+
+    def _iterate_queue(self, candle: Candle, window_type: Literal["long", "short"]):
         """
-        - Add new candle to the appropriate queue,
+        - Add the closing price of the new candle to the appropriate buffer,
         - Add the closing price to the total price,
         - Remove the oldest closing price from the total price.
         :param candle: The latest candle
-        :param window_type: Whether to iterate the long or short window queue.
+        :param window_type: Whether to iterate the long or short window buffer.
         """
-        # Defining variables based on window
-        window: int = vars(self)[window_type + '_window']
-        candles_queue: deque[Candle] = vars(self)[window_type + '_candles_queue']
-        # Updating the averages
         if window_type == "long":
-            if len(candles_queue) >= window:
-                self.current_long_average -= candles_queue.popleft().mid_c / window
-            self.current_long_average += candle.mid_c / window
+            evicted_close: float | None = self.long_closes.append(candle.mid_c)
+            if evicted_close is not None:
+                self.current_long_average -= evicted_close / self.long_window
+            self.current_long_average += candle.mid_c / self.long_window
         else:
-            if len(candles_queue) >= window:
-                self.current_short_average -= candles_queue.popleft().mid_c / window
-            self.current_short_average += candle.mid_c / window
-        candles_queue.append(candle)
+            evicted_close: float | None = self.short_closes.append(candle.mid_c)
+            if evicted_close is not None:
+                self.current_short_average -= evicted_close / self.short_window
+            self.current_short_average += candle.mid_c / self.short_window
 
     @override
     def iterate(self, candle: Candle) -> None:
         self._iterate_queue(candle, window_type="long")
         self._iterate_queue(candle, window_type="short")
-        iteration: MovingAverageCrossoverIteration = MovingAverageCrossoverIteration(
-            candle=candle,
+        self.queue.record(
+            candle,
             signal=self.generate_signal(),
             short_average=self.current_short_average,
             long_average=self.current_long_average
         )
-        self.queue.append(iteration)
+
+    @staticmethod
+    def cumulative_closes(closes: np.ndarray) -> np.ndarray:
+        """
+        Running total of the closing prices, prefixed with a zero so that any window total is the difference of two entries.
+        :param closes: Closing prices, oldest first.
+        :return: An array one element longer than the closing prices.
+        """
+        return np.concatenate(([0.0], np.cumsum(closes, dtype=np.float64)))
+
+    @staticmethod
+    def moving_averages(cumulative_closes: np.ndarray, window: int | np.ndarray) -> np.ndarray:
+        """
+        Computes the moving average for every candle from the running total of closing prices.
+        Matches iterate(): while fewer than window candles have been seen, the total so far is still divided by the window.
+        :param cumulative_closes: Output of cumulative_closes().
+        :param window: Moving average window. Pass a column of windows (shape (n, 1)) to get one row of averages per window.
+        :return: The moving average at each candle.
+        """
+        window_starts: np.ndarray = np.maximum(np.arange(1, len(cumulative_closes)) - window, 0)
+        return (cumulative_closes[1:] - cumulative_closes[window_starts]) / window
+
+    @staticmethod
+    def crossover_signals(short_averages: np.ndarray, long_averages: np.ndarray, long_window: int | np.ndarray) -> np.ndarray:
+        """
+        Generates the crossover signal for every candle, in the same way as generate_signal().
+        Also accepts 2-D arrays with one row per window pair, in which case long_window holds one window per row.
+        :param short_averages: Short moving average at each candle.
+        :param long_averages: Long moving average at each candle.
+        :param long_window: Long moving average window. No signals are generated before the long window is full.
+        :return: An array of signals: 1 for buy, -1 for sell and 0 for nothing.
+        """
+        differences: np.ndarray = MovingAverageCrossoverSignalGenerator.average_differences(short_averages, long_averages)
+        previous_differences: np.ndarray = differences[..., :-1]
+        current_differences: np.ndarray = differences[..., 1:]
+        signals: np.ndarray = np.zeros(differences.shape, dtype=np.int64)
+        signals[..., 1:] = np.where((current_differences <= 0) & (0 < previous_differences), -1,
+                                    np.where((previous_differences < 0) & (0 <= current_differences), 1, 0))
+        signals[np.arange(differences.shape[-1]) < np.asarray(long_window)[..., None]] = 0
+        return signals
+
+    def _generate_signals_vectorised(self, candles: DataFrame) -> DataFrame:
+        """
+        Generates the signals and averages for all candles at once, using array operations over the closing prices.
+        :param candles: The candles to generate signals for.
+        :return: The candles, along with the signal, short average and long average columns.
+        """
+        cumulative_closes: np.ndarray = self.cumulative_closes(candles[Price.MID_CLOSE.value].to_numpy(dtype=np.float64))
+        short_averages: np.ndarray = self.moving_averages(cumulative_closes, self.short_window)
+        long_averages: np.ndarray = self.moving_averages(cumulative_closes, self.long_window)
+        signals: DataFrame = candles.reindex(columns=Candle.columns()).reset_index(drop=True)
+        signals['signal'] = self.crossover_signals(short_averages, long_averages, self.long_window)
+        signals['short_average'] = short_averages
+        signals['long_average'] = long_averages
+        return signals
+
+    @override
+    def generate_signals_for_backtesting(self, candles: DataFrame, use_pips: bool, vectorised: bool = False) -> None:
+        """
+        Generate signals for all candles in one go, for backtesting.
+        :param candles: DataFrame containing all historical data to generate signals for.
+        :param use_pips: Whether to use pips to calculate returns. If false, will use nominal value.
+        :param vectorised: If True, computes the averages and signals over the whole DataFrame with array operations
+        instead of iterating candle by candle. The iteration queue is not populated in this mode.
+        """
+        if not vectorised:
+            super().generate_signals_for_backtesting(candles, use_pips)
+            return
+        if self.queue:
+            raise ValueError("Please do not initialise the iteration queue if backtesting.")
+        self.signals = self._generate_signals_vectorised(candles)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import itertools
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.model.Granularity import Granularity
+from src.model.candle.Candle import Candle
+from src.model.candle.Price import Price
+from src.service.signal_generators.MovingAverageCrossoverSignalGenerator import MovingAverageCrossoverSignalGenerator
+from src.util.IndicatorEvaluation import IndicatorEvaluation, evaluate_signal_matrix
+
+
+class MovingAverageCrossoverSweep:
+    """
+    Generates Moving Average Crossover signals for every logical combination of a set of windows in one go, for backtesting.
+    The running total of closing prices is computed once, every window's averages are derived from it and all window pairs
+    are evaluated together as a 2-D signal matrix. Produces the same signals as a MovingAverageCrossoverSignalGenerator per pair.
+    """
+    def __init__(self, pair: str, pip_location: float, granularity: Granularity, ma_windows: List[int], window_pairs: List[Tuple[int, int]] | None = None):
+        """
+        :param window_pairs: If provided, only these window pairs are evaluated, rather than all combinations of ma_windows.
+        """
+        self.pair: str = pair
+        self.pip_location: float = pip_location
+        self.granularity: Granularity = granularity
+        self.window_pairs: List[Tuple[int, int]] = window_pairs if window_pairs is not None else self.get_window_pairs(ma_windows)
+        self.windows: List[int] = sorted(set(itertools.chain.from_iterable(self.window_pairs)))
+        self.candles: DataFrame | None = None
+        self.averages: np.ndarray | None = None
+        self.signals: np.ndarray | None = None
+
+    @staticmethod
+    def get_window_pairs(ma_windows: List[int]) -> List[Tuple[int, int]]:
+        """
+        :return: Every logical combination of the windows, in the order of the window combinations.
+        """
+        return [(short_window, long_window) for short_window, long_window in itertools.combinations(ma_windows, 2) if short_window < long_window]
+
+    def generate_signals_for_backtesting(self, candles: DataFrame) -> None:
+        """
+        Generate signals for all window pairs and all candles.
+        :param candles: DataFrame containing all historical data to generate signals for.
+        """
+        cumulative_closes: np.ndarray = MovingAverageCrossoverSignalGenerator.cumulative_closes(candles[Price.MID_CLOSE.value].to_numpy(dtype=np.float64))
+        # One row of averages per window, one row of signals per window pair.
+        self.averages = MovingAverageCrossoverSignalGenerator.moving_averages(cumulative_closes, np.array(self.windows)[:, None])
+        short_rows: List[int] = [self.windows.index(short_window) for short_window, _ in self.window_pairs]
+        long_rows: List[int] = [self.windows.index(long_window) for _, long_window in self.window_pairs]
+        long_windows: np.ndarray = np.array([long_window for _, long_window in self.window_pairs])
+        self.signals = MovingAverageCrossoverSignalGenerator.crossover_signals(self.averages[short_rows], self.averages[long_rows], long_windows)
+        self.candles = candles.reindex(columns=Candle.columns()).reset_index(drop=True)
+
+    def generate_signals_dataframe(self, short_window: int, long_window: int) -> DataFrame:
+        """
+        :return: The signals DataFrame for a single window pair, as returned by MovingAverageCrossoverSignalGenerator.
+        """
+        if self.signals is None:
+            raise ValueError("Please generate signals before attempting to retrieve them.")
+        return self.candles.assign(signal=self.signals[self.window_pairs.index((short_window, long_window))],
+                                   short_average=self.averages[self.windows.index(short_window)],
+                                   long_average=self.averages[self.windows.index(long_window)])
+
+    def evaluate(self, risk_free_rate: float = 0.0) -> DataFrame:
+        """
+        Evaluates all window pairs at once from the signal matrix, with gains in pips.
+        :param risk_free_rate: The risk-free return per trade, in pips, for the Sharpe ratio.
+        :return: The metrics of each window pair, indexed by short and long window, in the order of the window combinations.
+        """
+        if self.signals is None:
+            raise ValueError("Please generate signals before evaluating them.")
+        metrics: Dict[str, np.ndarray] = evaluate_signal_matrix(self.signals, self.candles[Price.MID_CLOSE.value].to_numpy(), self.candles['time'].to_numpy(),
+                                                                self.pip_location, risk_free_rate)
+        return DataFrame(metrics, index=pd.MultiIndex.from_tuples(self.window_pairs, names=['short_window', 'long_window']))
+
+    def evaluate_indicators(self, risk_free_rate: float = 0.0) -> Dict[Tuple[int, int], IndicatorEvaluation]:
+        """
+        :return: The indicator evaluation for each window pair, in the order of the window combinations. Their signals are None.
+        """
+        return {window_pair: IndicatorEvaluation.from_metrics(self.pair, metrics)
+                for window_pair, metrics in zip(self.window_pairs, self.evaluate(risk_free_rate).to_dict('records'))}
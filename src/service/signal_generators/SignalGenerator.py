@@ -1,42 +1,51 @@
-from collections import deque
-
 import pandas as pd
-import seaborn as sns
 
 from pandas import DataFrame
 
 from src.util.IndicatorEvaluation import IndicatorEvaluation
+from src.util.IterationHistory import IterationHistory
 from src.model.candle.Candle import Candle
 from src.model.Granularity import Granularity
 from src.model.signal_generator_iterations.SignalGeneratorIteration import SignalGeneratorIteration
 
 pd.options.mode.chained_assignment = None
-sns.set_theme()
 
 
 class SignalGenerator:
     """
     Parent class SignalGenerator. Extend for each indicator and implement iterate().
     """
-    def __init__(self, pair: str, pip_location: float, granularity: Granularity, initial_candles: DataFrame):
+    # The type of the iterations recorded in the queue. Override along with iterate().
+    iteration_type: type = SignalGeneratorIteration
+
+    def __init__(self, pair: str, pip_location: float, granularity: Granularity, initial_candles: DataFrame,
+                 max_iterations_in_memory: int | None = None, iteration_log_filename: str | None = None):
+        """
+        :param max_iterations_in_memory: If provided, only this many of the latest iterations are kept in memory. Use for long-running
+        generators, e.g. when trading live.
+        :param iteration_log_filename: If provided along with max_iterations_in_memory, older iterations are appended to this file
+        rather than dropped, so the full history can still be read.
+        """
         self.pair: str = pair
         self.pip_location: float = pip_location
         self.granularity: Granularity = granularity
-        self.queue: deque[SignalGeneratorIteration] | None = None
+        self.queue: IterationHistory = IterationHistory(self.iteration_type, max_iterations_in_memory, iteration_log_filename)
+        # Signals generated in one go for backtesting, if the generator supports it. Takes precedence over the queue.
+        self.signals: DataFrame | None = None
 
     def iterate_from_dataframe(self, candles: DataFrame) -> None:
         """
         Use this method to iterate the generator based on candles in a provided DataFrame.
         :param candles: The candles to generate signals for.
         """
-        for index, row in candles.iterrows():
-            candle: Candle = Candle.from_dict(row.to_dict())  # TODO: Check whether this is correct
-            self.iterate(candle)
+        for candle_values in candles.reindex(columns=Candle.columns()).itertuples(index=False, name=None):
+            self.iterate(Candle(*candle_values))
 
     def iterate(self, candle: Candle) -> None:
         """
-        Iterate the signal generator. Append the SignalGeneratorIteration object to the queue.
-        Do not forget to append the latest candle to the queue when implementing.
+        Iterate the signal generator. Record the iteration in the queue, using queue.record() to avoid creating an
+        iteration object, or queue.append().
+        Do not forget to record the latest candle when implementing.
         :param candle: The latest candle.
         """
         raise NotImplementedError("Please implement method before iterating the signal generator.")
@@ -53,10 +62,16 @@ class SignalGenerator:
             raise ValueError("Please do not initialise the iteration queue if backtesting.")
         self.iterate_from_dataframe(candles)
 
-    def generate_signals_dataframe(self) -> DataFrame:
+    def generate_signals_dataframe(self, full_history: bool = True) -> DataFrame:
+        """
+        :param full_history: If True, includes the iterations logged to disk as well as those in memory.
+        :return: A DataFrame with one row per iteration, containing the candle, the signal and any indicator values.
+        """
+        if self.signals is not None:
+            return self.signals
         if not self.queue:
             raise ValueError("Please iterate the signal generator before attempting to retrieve signals.")
-        return DataFrame([vars(iteration.candle) | {"signal": iteration.signal} for iteration in self.queue])
+        return self.queue.to_dataframe(full_history)
 
     def evaluate_indicator(self) -> IndicatorEvaluation:
         """
@@ -78,10 +93,11 @@ class SignalGenerator:
         - Total time in the market - Calculate the duration of each trade. The performance of a strategy will depend on the short, medium and long-term
         - properties of a currency pair, which is important to calculate.
         - You should also compare the results to indices such as the S&P 500.
-        :return:
+        :return: The evaluation of the signals, with gains in pips. The Sharpe ratio is computed per trade, with a risk-free rate of zero.
         """
         indicator_evaluation: IndicatorEvaluation = IndicatorEvaluation(
             pair=self.pair,
             signals=self.generate_signals_dataframe(),
+            pip_location=self.pip_location,
         )
         return indicator_evaluation
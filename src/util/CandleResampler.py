@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.model.Granularity import Granularity
+from src.model.candle.Price import CANDLES_DF_COLUMNS
+from src.util.CandleDecoding import to_epoch_time, to_local_time
+from src.util.CandleStore import CandleStore
+
+# OANDA's default candle alignment: candles of two hours or more start at 17:00 New York time, and weekly candles on Fridays.
+DAILY_ALIGNMENT_HOUR: int = 17
+ALIGNMENT_TIMEZONE: str = 'America/New_York'
+WEEKLY_ALIGNMENT_DAY: int = 4
+DAY_NANOSECONDS: int = 24 * 3600 * 10 ** 9
+
+
+def _to_nanoseconds(duration: timedelta) -> int:
+    return int(duration / timedelta(microseconds=1)) * 1000
+
+
+class CandleResampler:
+    """
+    Builds candles of a coarser granularity from stored candles of a finer granularity, instead of downloading them.
+    Candles are aligned as OANDA aligns them, and the resampled candles are cached in the candle store.
+    """
+    def __init__(self, candle_store: CandleStore):
+        self.candle_store: CandleStore = candle_store
+
+    @staticmethod
+    def can_resample(source_granularity: Granularity, granularity: Granularity) -> bool:
+        """
+        :return: Whether each candle of the granularity is made of whole candles of the source granularity.
+        """
+        if source_granularity.value >= granularity.value:
+            return False
+        if granularity in (Granularity.W, Granularity.M):
+            return Granularity.D.value % source_granularity.value == timedelta(0)
+        return granularity.value % source_granularity.value == timedelta(0)
+
+    @staticmethod
+    def get_candle_bounds(epoch_times: np.ndarray, granularity: Granularity) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Finds the candle of the given granularity that each time falls into.
+        Up to hourly candles are aligned to UTC. Longer candles are aligned to DAILY_ALIGNMENT_HOUR in ALIGNMENT_TIMEZONE.
+        :param epoch_times: Epoch times, in nanoseconds.
+        :return: A key identifying each time's candle, and the candle's start and end epoch times.
+        """
+        if granularity.value <= Granularity.H1.value:
+            granularity_nanoseconds: int = _to_nanoseconds(granularity.value)
+            starts: np.ndarray = epoch_times - epoch_times % granularity_nanoseconds
+            return starts, starts, starts + granularity_nanoseconds
+        # Wall clock times in the alignment timezone, shifted so that candles start at midnight.
+        alignment_nanoseconds: int = DAILY_ALIGNMENT_HOUR * 3600 * 10 ** 9
+        wall_times: np.ndarray = pd.to_datetime(epoch_times, utc=True).tz_convert(ALIGNMENT_TIMEZONE).tz_localize(None).asi8
+        aligned_times: np.ndarray = wall_times - alignment_nanoseconds
+        if granularity == Granularity.M:
+            months: np.ndarray = aligned_times.view('datetime64[ns]').astype('datetime64[M]')
+            aligned_starts: np.ndarray = months.astype('datetime64[ns]').view(np.int64)
+            aligned_ends: np.ndarray = (months + 1).astype('datetime64[ns]').view(np.int64)
+        elif granularity == Granularity.W:
+            days: np.ndarray = aligned_times // DAY_NANOSECONDS
+            # The epoch started on a Thursday.
+            days_since_alignment_day: np.ndarray = (days + 3 - WEEKLY_ALIGNMENT_DAY) % 7
+            aligned_starts: np.ndarray = (days - days_since_alignment_day) * DAY_NANOSECONDS
+            aligned_ends: np.ndarray = aligned_starts + 7 * DAY_NANOSECONDS
+        else:
+            granularity_nanoseconds: int = _to_nanoseconds(granularity.value)
+            aligned_starts: np.ndarray = aligned_times - aligned_times % granularity_nanoseconds
+            aligned_ends: np.ndarray = aligned_starts + granularity_nanoseconds
+        return aligned_starts, epoch_times - (aligned_times - aligned_starts), epoch_times + (aligned_ends - aligned_times)
+
+    @staticmethod
+    def get_candle_start(time: datetime, granularity: Granularity) -> datetime:
+        """
+        :param time: Naive local time.
+        :return: The start of the candle of the given granularity that the time falls into, as a naive local time.
+        """
+        _, starts, _ = CandleResampler.get_candle_bounds(to_epoch_time(np.array([time], dtype='datetime64[ns]')), granularity)
+        return pd.Timestamp(to_local_time(starts)[0]).to_pydatetime()
+
+    @staticmethod
+    def resample(candles: DataFrame, granularity: Granularity, from_time: datetime | None = None, to_time: datetime | None = None) -> DataFrame:
+        """
+        Aggregates candles into candles of a coarser granularity: first open, highest high, lowest low and last close of each of
+        the bid, ask and mid prices, and the total volume.
+        :param candles: Candles in the CANDLES_DF_COLUMNS schema, sorted by time, with naive local times.
+        :param granularity: The granularity to resample to.
+        :param from_time: If provided, candles starting before this time are dropped, as they may be missing prices.
+        :param to_time: If provided, candles ending after this time are dropped, as they may be missing prices.
+        :return: The resampled candles, in the CANDLES_DF_COLUMNS schema.
+        """
+        if candles.empty:
+            return DataFrame(columns=CANDLES_DF_COLUMNS)
+        epoch_times: np.ndarray = to_epoch_time(pd.to_datetime(candles['time']).to_numpy(dtype='datetime64[ns]'))
+        keys, starts, ends = CandleResampler.get_candle_bounds(epoch_times, granularity)
+        first_rows: np.ndarray = np.flatnonzero(np.diff(keys, prepend=keys[0] - 1))
+        last_rows: np.ndarray = np.append(first_rows[1:], len(keys)) - 1
+        resampled_candles: DataFrame = DataFrame({'time': to_local_time(starts[first_rows])})
+        for column in CANDLES_DF_COLUMNS[1:]:
+            values: np.ndarray = candles[column].to_numpy(dtype=np.float64)
+            if column == 'volume':
+                resampled_candles[column] = np.add.reduceat(values, first_rows)
+            elif column.endswith('_o'):
+                resampled_candles[column] = values[first_rows]
+            elif column.endswith('_h'):
+                resampled_candles[column] = np.maximum.reduceat(values, first_rows)
+            elif column.endswith('_l'):
+                resampled_candles[column] = np.minimum.reduceat(values, first_rows)
+            else:
+                resampled_candles[column] = values[last_rows]
+        complete: np.ndarray = np.ones(len(first_rows), dtype=bool)
+        if from_time is not None:
+            complete &= to_epoch_time(np.array([from_time], dtype='datetime64[ns]'))[0] <= starts[first_rows]
+        if to_time is not None:
+            complete &= ends[first_rows] <= to_epoch_time(np.array([to_time], dtype='datetime64[ns]'))[0]
+        return resampled_candles[complete].reset_index(drop=True)
+
+    def get_source_granularity(self, pair: str, granularity: Granularity, from_time: datetime, to_time: datetime) -> Granularity | None:
+        """
+        :return: The coarsest stored granularity that the candles can be resampled from over the whole time range, or None.
+        """
+        for source_granularity in sorted(Granularity, key=lambda g: g.value, reverse=True):
+            if self.can_resample(source_granularity, granularity) and self.candle_store.covers(pair, source_granularity, from_time, to_time):
+                return source_granularity
+        return None
+
+    def get_candles(self, pair: str, granularity: Granularity, from_time: datetime, to_time: datetime) -> DataFrame | None:
+        """
+        Reads candles from the store, resampling and caching them from a finer granularity if they are not stored.
+        :return: The candles between the two times, or None if neither they nor finer candles covering the range are stored.
+        """
+        if self.candle_store.covers(pair, granularity, from_time, to_time):
+            return self.candle_store.read(pair, granularity, from_time, to_time)
+        source_granularity: Granularity | None = self.get_source_granularity(pair, granularity, from_time, to_time)
+        if source_granularity is None:
+            return None
+        source_candles: DataFrame = self.candle_store.read(pair, source_granularity, from_time, to_time)
+        candles: DataFrame = self.resample(source_candles[source_candles['time'] < to_time], granularity, from_time, to_time)
+        print("Resampled {} {} candles for pair {} from {} candles".format(candles.shape[0], granularity.name, pair, source_granularity.name))
+        # The candle that the range ends in could not be completed, so only record the range up to its start.
+        self.candle_store.append(pair, granularity, candles, from_time, self.get_candle_start(to_time, granularity))
+        return candles
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.model.Granularity import Granularity
+from src.model.candle.Price import CANDLES_DF_COLUMNS
+
+COVERAGE_FILENAME: str = 'coverage.json'
+
+
+class CandleStore:
+    """
+    Historical candle store, partitioned by pair, granularity and month. Each partition holds one array per candle column,
+    so that a time range query only reads the months it overlaps.
+    The store also records which time ranges have been downloaded, as gaps in the candles (e.g. weekends) do not mean
+    that data is missing.
+    Layout: <folder>/<pair>/<granularity>/<YYYY-MM>.npz and <folder>/<pair>/<granularity>/coverage.json
+    """
+    def __init__(self, folder: str):
+        self.folder: str = folder
+
+    def _get_partition_folder(self, pair: str, granularity: Granularity) -> Path:
+        return Path(self.folder) / pair / granularity.name
+
+    def _get_partition_filename(self, pair: str, granularity: Granularity, month: pd.Period) -> Path:
+        return self._get_partition_folder(pair, granularity) / '{}.npz'.format(month.strftime('%Y-%m'))
+
+    def _read_partition(self, filename: Path) -> DataFrame:
+        with np.load(filename) as partition:
+            columns = {column: partition[column] for column in CANDLES_DF_COLUMNS if column != 'time'}
+            return DataFrame({'time': partition['time'].view('datetime64[ns]')} | columns)
+
+    @staticmethod
+    def _write_partition(filename: Path, candles: DataFrame) -> None:
+        columns = {column: candles[column].to_numpy(dtype=np.float64) for column in CANDLES_DF_COLUMNS if column != 'time'}
+        temporary_filename: Path = filename.with_suffix('.tmp')
+        with open(temporary_filename, 'wb') as file:
+            np.savez(file, time=candles['time'].to_numpy(dtype='datetime64[ns]').view(np.int64), **columns)
+        os.replace(temporary_filename, filename)
+
+    def read(self, pair: str, granularity: Granularity, from_time: datetime, to_time: datetime) -> DataFrame:
+        """
+        Reads the stored candles between two times, inclusive, from the partitions that overlap the range.
+        :return: The candles, sorted by time. Empty if none are stored.
+        """
+        partitions: List[DataFrame] = []
+        for month in pd.period_range(from_time, to_time, freq='M'):
+            filename: Path = self._get_partition_filename(pair, granularity, month)
+            if filename.exists():
+                partitions.append(self._read_partition(filename))
+        if not partitions:
+            return DataFrame(columns=CANDLES_DF_COLUMNS)
+        candles: DataFrame = pd.concat(partitions, ignore_index=True)
+        return candles[(from_time <= candles['time']) & (candles['time'] <= to_time)].reset_index(drop=True)
+
+    def append(self, pair: str, granularity: Granularity, candles: DataFrame, from_time: datetime, to_time: datetime) -> None:
+        """
+        Merges candles into the store, replacing any stored candles with the same time, and records the range as downloaded.
+        :param candles: DataFrame in the CANDLES_DF_COLUMNS schema.
+        :param from_time: The start of the range the candles were downloaded for.
+        :param to_time: The end of the range the candles were downloaded for.
+        """
+        partition_folder: Path = self._get_partition_folder(pair, granularity)
+        partition_folder.mkdir(parents=True, exist_ok=True)
+        candles = candles[CANDLES_DF_COLUMNS].assign(time=pd.to_datetime(candles['time']))
+        for month, month_candles in candles.groupby(candles['time'].dt.to_period('M')):
+            filename: Path = self._get_partition_filename(pair, granularity, month)
+            if filename.exists():
+                month_candles = pd.concat([self._read_partition(filename), month_candles], ignore_index=True)
+            month_candles = month_candles.drop_duplicates(subset='time', keep='last').sort_values(by='time')
+            self._write_partition(filename, month_candles)
+        if from_time < to_time:
+            self._add_coverage(pair, granularity, from_time, to_time)
+
+    def get_coverage(self, pair: str, granularity: Granularity) -> List[Tuple[datetime, datetime]]:
+        """
+        :return: The sorted, non-overlapping time ranges that have been downloaded for a pair and granularity.
+        """
+        filename: Path = self._get_partition_folder(pair, granularity) / COVERAGE_FILENAME
+        if not filename.exists():
+            return []
+        with open(filename) as file:
+            return [(datetime.fromisoformat(start), datetime.fromisoformat(end)) for start, end in json.load(file)]
+
+    def _add_coverage(self, pair: str, granularity: Granularity, from_time: datetime, to_time: datetime) -> None:
+        coverage: List[Tuple[datetime, datetime]] = []
+        for start, end in sorted(self.get_coverage(pair, granularity) + [(from_time, to_time)]):
+            if coverage and start <= coverage[-1][1]:
+                coverage[-1] = (coverage[-1][0], max(coverage[-1][1], end))
+            else:
+                coverage.append((start, end))
+        with open(self._get_partition_folder(pair, granularity) / COVERAGE_FILENAME, 'w') as file:
+            json.dump([(start.isoformat(), end.isoformat()) for start, end in coverage], file)
+
+    def covers(self, pair: str, granularity: Granularity, from_time: datetime, to_time: datetime) -> bool:
+        """
+        :return: Whether the whole time range has been downloaded.
+        """
+        return any(start <= from_time and to_time <= end for start, end in self.get_coverage(pair, granularity))
+
+    def get_missing_ranges(self, pair: str, granularity: Granularity, from_time: datetime, to_time: datetime) -> List[Tuple[datetime, datetime]]:
+        """
+        :return: The parts of the time range that have not been downloaded yet, in order.
+        """
+        missing_ranges: List[Tuple[datetime, datetime]] = []
+        start: datetime = from_time
+        for covered_start, covered_end in self.get_coverage(pair, granularity):
+            if covered_end <= start:
+                continue
+            if to_time <= covered_start:
+                break
+            if start < covered_start:
+                missing_ranges.append((start, covered_start))
+            start = covered_end
+        if start < to_time:
+            missing_ranges.append((start, to_time))
+        return missing_ranges
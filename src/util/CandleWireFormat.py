@@ -0,0 +1,55 @@
+"""
+Encoding of the candles sent between the live data store and the traders. Candles are sent either as JSON, or in a compact binary
+frame carrying one or more candles. The message's content type says which, so that consumers can fall back to JSON.
+"""
+from __future__ import annotations
+
+import json
+import struct
+from datetime import datetime
+from typing import Dict, List, Literal, Tuple
+
+from src.model.candle.Candle import Candle, CANDLE_STRUCT
+
+JSON_CONTENT_TYPE: str = 'application/json'
+BINARY_CONTENT_TYPE: str = 'application/vnd.fxbot.candles'
+# Bump whenever the binary layout changes. Consumers reject frames with versions they do not know, rather than misreading them.
+BINARY_FORMAT_VERSION: int = 1
+SUPPORTED_BINARY_FORMAT_VERSIONS: Tuple[int, ...] = (1,)
+# A binary frame is a header of the format version and the number of candles, followed by the candles in CANDLE_STRUCT layout.
+FRAME_HEADER_STRUCT: struct.Struct = struct.Struct('<BI')
+
+WireFormat = Literal['json', 'binary']
+
+
+def encode_candles(candles: List[Candle], wire_format: WireFormat = 'binary') -> Tuple[str, bytes]:
+    """
+    :param candles: The candles to send in one message.
+    :return: The content type to send the message with, and the message body.
+    """
+    if wire_format == 'json':
+        candles_json: str = candles[0].serialise() if len(candles) == 1 else '[{}]'.format(', '.join(candle.serialise() for candle in candles))
+        return JSON_CONTENT_TYPE, candles_json.encode('utf-8')
+    return BINARY_CONTENT_TYPE, FRAME_HEADER_STRUCT.pack(BINARY_FORMAT_VERSION, len(candles)) + b''.join(candle.to_bytes() for candle in candles)
+
+
+def decode_candles(content_type: str | None, body: bytes | str) -> List[Candle]:
+    """
+    :param content_type: The content type the message was sent with. Messages without one are assumed to be JSON.
+    :param body: A single candle, or a batch of candles.
+    :return: The candles in the message.
+    """
+    if content_type != BINARY_CONTENT_TYPE:
+        candles_json: Dict | List[Dict] = json.loads(body)
+        return [_candle_from_json(candle_dict) for candle_dict in (candles_json if isinstance(candles_json, list) else [candles_json])]
+    version, number_of_candles = FRAME_HEADER_STRUCT.unpack_from(body)
+    if version not in SUPPORTED_BINARY_FORMAT_VERSIONS:
+        raise ValueError("Unsupported candle wire format version {}. Supported versions: {}".format(version, SUPPORTED_BINARY_FORMAT_VERSIONS))
+    if len(body) != FRAME_HEADER_STRUCT.size + number_of_candles * CANDLE_STRUCT.size:
+        raise ValueError("Candle frame of {} bytes does not hold {} candles.".format(len(body), number_of_candles))
+    return [Candle.from_values(values) for values in CANDLE_STRUCT.iter_unpack(memoryview(body)[FRAME_HEADER_STRUCT.size:])]
+
+
+def _candle_from_json(candle_dict: Dict) -> Candle:
+    candle_dict['time'] = datetime.fromtimestamp(candle_dict['time'])
+    return Candle(**candle_dict)
@@ -1,22 +1,71 @@
+import functools
 import json
 import os
+from typing import Any, Callable, Dict
 
 PROJECT_ROOT_FOLDER_NAME = 'fxbot'
 
-current_project_root: str = os.path.dirname(os.getcwd())
-if not current_project_root.endswith(PROJECT_ROOT_FOLDER_NAME):
-    raise RuntimeError("Please run this project from the project root. Current directory: {}".format(current_project_root))
-
-credentials = json.load(open(os.path.join(current_project_root, 'configuration/credentials.json')))
-
-OANDA_DEMO_API_KEY = credentials['OANDA_DEMO_API_KEY']
-OANDA_DEMO_ACCOUNT_ID = credentials['OANDA_DEMO_ACCOUNT_ID']
 OANDA_DEMO_HOSTNAME = "api-fxpractice.oanda.com"
+OANDA_DEMO_STREAM_HOSTNAME = "stream-fxpractice.oanda.com"
 
-OANDA_LIVE_API_KEY = credentials['OANDA_LIVE_API_KEY']
-OANDA_LIVE_ACCOUNT_ID = credentials['OANDA_LIVE_ACCOUNT_ID']
 OANDA_LIVE_HOSTNAME = "api-fxtrade.oanda.com"
+OANDA_LIVE_STREAM_HOSTNAME = "stream-fxtrade.oanda.com"
 
 DATA_FOLDER = 'data'
-INSTRUMENTS_FILENAME = '{}/{}/instruments.pkl'.format(current_project_root, DATA_FOLDER)
-CANDLE_FOLDER = '{}/{}/historical_data'.format(current_project_root, DATA_FOLDER)
+
+
+@functools.cache
+def get_project_root() -> str:
+    """
+    The project root is checked, and the credentials are read, on first use rather than on import, so that importing a module
+    does not fail or touch the disk.
+    """
+    current_project_root: str = os.path.dirname(os.getcwd())
+    if not current_project_root.endswith(PROJECT_ROOT_FOLDER_NAME):
+        raise RuntimeError("Please run this project from the project root. Current directory: {}".format(current_project_root))
+    return current_project_root
+
+
+@functools.cache
+def get_credentials() -> Dict[str, str]:
+    with open(os.path.join(get_project_root(), 'configuration/credentials.json')) as credentials_file:
+        return json.load(credentials_file)
+
+
+def get_api_key(live: bool) -> str:
+    return get_credentials()['OANDA_LIVE_API_KEY' if live else 'OANDA_DEMO_API_KEY']
+
+
+def get_account_id(live: bool) -> str:
+    return get_credentials()['OANDA_LIVE_ACCOUNT_ID' if live else 'OANDA_DEMO_ACCOUNT_ID']
+
+
+def get_instruments_filename() -> str:
+    return '{}/{}/instruments.pkl'.format(get_project_root(), DATA_FOLDER)
+
+
+def get_candle_folder() -> str:
+    return '{}/{}/historical_data'.format(get_project_root(), DATA_FOLDER)
+
+
+def get_results_filename() -> str:
+    return '{}/{}/backtest_results.sqlite'.format(get_project_root(), DATA_FOLDER)
+
+
+# Constants depending on the project root or the credentials, resolved on first access.
+_LAZY_CONSTANTS: Dict[str, Callable[[], Any]] = {
+    'current_project_root': get_project_root,
+    'credentials': get_credentials,
+    'OANDA_DEMO_API_KEY': lambda: get_api_key(live=False),
+    'OANDA_DEMO_ACCOUNT_ID': lambda: get_account_id(live=False),
+    'OANDA_LIVE_API_KEY': lambda: get_api_key(live=True),
+    'OANDA_LIVE_ACCOUNT_ID': lambda: get_account_id(live=True),
+    'INSTRUMENTS_FILENAME': get_instruments_filename,
+    'CANDLE_FOLDER': get_candle_folder,
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_CONSTANTS:
+        return _LAZY_CONSTANTS[name]()
+    raise AttributeError("module {} has no attribute {}".format(__name__, name))
@@ -1,27 +1,162 @@
-from typing import Tuple
+from __future__ import annotations
+
+from typing import Dict, Mapping, Tuple
+
+import numpy as np
 from pandas import DataFrame
 
+# The metrics of an evaluation, in the order they are reported.
+METRICS: Tuple[str, ...] = ('num_longs', 'num_shorts', 'total_trades', 'buy_hold_returns', 'total_gain', 'mean_gain', 'min_gain', 'max_gain',
+                            'sharpe_ratio', 'max_drawdown', 'profit_to_drawdown', 'time_in_market')
+# Strategy variants are evaluated in chunks of at most this many candles in total, so that memory stays bounded however many there are.
+MAX_CANDLES_PER_CHUNK: int = 2 ** 21
+
+
+def _latest_signal_indices(signals: np.ndarray) -> np.ndarray:
+    """
+    :return: The index of the latest non-zero signal at or before each candle, or 0 if there is none.
+    """
+    candle_indices: np.ndarray = np.arange(signals.shape[-1], dtype=np.int32 if signals.shape[-1] < 2 ** 31 else np.int64)
+    return np.maximum.accumulate(np.where(signals != 0, candle_indices, 0), axis=-1)
+
+
+def _evaluate_trades(trade_variants: np.ndarray, trade_gains: np.ndarray, equity: np.ndarray, risk_free_rate: float) -> Dict[str, np.ndarray]:
+    """
+    Computes the gain and risk metrics of each strategy variant.
+    :param trade_variants: The variant, i.e. the row of the equity, of each trade.
+    :param trade_gains: The gain of each trade.
+    :param equity: The cumulative gain, starting at zero, one row per variant.
+    :param risk_free_rate: The risk-free return per trade, in the unit of the gains.
+    :return: The total, mean, min and max gain, the Sharpe ratio of the trades, the maximum drawdown of the equity and the profit
+    to drawdown ratio of each variant. Metrics that are undefined, e.g. the mean gain without trades, are NaN.
+    """
+    number_of_variants: int = len(equity)
+    number_of_trades: np.ndarray = np.bincount(trade_variants, minlength=number_of_variants)
+    total_gain: np.ndarray = np.bincount(trade_variants, weights=trade_gains, minlength=number_of_variants)
+    # fmin and fmax ignore the initial NaN, which is kept for variants without trades.
+    min_gain: np.ndarray = np.full(number_of_variants, np.nan)
+    max_gain: np.ndarray = np.full(number_of_variants, np.nan)
+    np.fmin.at(min_gain, trade_variants, trade_gains)
+    np.fmax.at(max_gain, trade_variants, trade_gains)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_gain: np.ndarray = total_gain / number_of_trades
+        variance: np.ndarray = np.bincount(trade_variants, weights=(trade_gains - mean_gain[trade_variants]) ** 2, minlength=number_of_variants) / number_of_trades
+        standard_deviation: np.ndarray = np.sqrt(variance)
+        sharpe_ratio: np.ndarray = np.where(standard_deviation > 0, (mean_gain - risk_free_rate) / standard_deviation, np.nan)
+        max_drawdown: np.ndarray = (np.maximum.accumulate(equity, axis=-1) - equity).max(axis=-1)
+        profit_to_drawdown: np.ndarray = np.where(max_drawdown > 0, total_gain / max_drawdown, np.nan)
+    return {
+        'total_gain': total_gain,
+        'mean_gain': mean_gain,
+        'min_gain': min_gain,
+        'max_gain': max_gain,
+        'sharpe_ratio': sharpe_ratio,
+        'max_drawdown': max_drawdown,
+        'profit_to_drawdown': profit_to_drawdown,
+    }
+
+
+def _evaluate_signal_rows(signals: np.ndarray, price_changes: np.ndarray, candle_minutes: np.ndarray, risk_free_rate: float) -> Dict[str, np.ndarray]:
+    latest_signal_indices: np.ndarray = _latest_signal_indices(signals)
+    positions: np.ndarray = np.take_along_axis(signals, latest_signal_indices, axis=-1)
+    in_market: np.ndarray = positions[:, :-1] != 0
+    equity: np.ndarray = np.zeros(signals.shape, dtype=np.float64)
+    np.cumsum(positions[:, :-1] * price_changes, axis=-1, out=equity[:, 1:])
+    # Each signal closes the open trade, if any, and the last trade is closed at the last candle. Only the trades are gathered,
+    # as there are far fewer of them than candles.
+    closed_variants, closed_candles = np.nonzero((signals[:, 1:] != 0) & in_market)
+    open_variants: np.ndarray = np.flatnonzero(positions[:, -1])
+    trade_variants: np.ndarray = np.concatenate((closed_variants, open_variants))
+    exit_candles: np.ndarray = np.concatenate((closed_candles + 1, np.full(len(open_variants), signals.shape[-1] - 1)))
+    entry_candles: np.ndarray = np.concatenate((latest_signal_indices[closed_variants, closed_candles], latest_signal_indices[open_variants, -1]))
+    trade_gains: np.ndarray = equity[trade_variants, exit_candles] - equity[trade_variants, entry_candles]
+    metrics: Dict[str, np.ndarray] = _evaluate_trades(trade_variants, trade_gains, equity, risk_free_rate)
+    metrics['num_longs'] = (signals == 1).sum(axis=-1)
+    metrics['num_shorts'] = (signals == -1).sum(axis=-1)
+    metrics['time_in_market'] = in_market @ candle_minutes
+    return metrics
 
-class IndicatorEvaluation:
-    def __init__(self, pair: str, signals: DataFrame):
-        self.pair: str = pair
-        self.signals: DataFrame = signals
-        self.num_longs, self.num_shorts = self._indicator_stats()
-        self.total_trades = self.num_shorts + self.num_longs
-        self.buy_hold_returns, self.total_gain, self.mean_gain, self.min_gain, self.max_gain = self._evaluate_indicator()
 
-    def _indicator_stats(self) -> Tuple[float, float]:
+def evaluate_signal_matrix(signals: np.ndarray, closes: np.ndarray, times: np.ndarray, pip_location: float | None = None,
+                           risk_free_rate: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Evaluates many variants of a strategy on the same candles at once, e.g. every window pair of the MA crossover, without
+    building a DataFrame per variant. Each signal opens a position of one unit in its direction, closing the open one, which is
+    held until the next signal or the last candle, and is marked to market at each close.
+    :param signals: The signals of each variant, one row per variant and one column per candle: 1 for buy, -1 for sell and 0 for nothing.
+    :param closes: The closing price of each candle.
+    :param times: The time of each candle, as datetime64.
+    :param pip_location: If provided, gains are expressed in pips. If not, in nominal value.
+    :param risk_free_rate: The risk-free return per trade, for the Sharpe ratio.
+    :return: An array per metric in METRICS, with one value per variant. The time in the market is in minutes.
+    """
+    # Signals are narrowed to bytes, as the evaluation is bound by memory bandwidth.
+    signals = np.atleast_2d(np.asarray(signals, dtype=np.int8))
+    closes = np.asarray(closes, dtype=np.float64)
+    price_changes: np.ndarray = np.diff(closes) / (10 ** pip_location if pip_location is not None else 1)
+    candle_minutes: np.ndarray = np.diff(np.asarray(times, dtype='datetime64[ns]')) / np.timedelta64(1, 'm')
+    rows_per_chunk: int = max(MAX_CANDLES_PER_CHUNK // max(signals.shape[-1], 1), 1)
+    chunks = [_evaluate_signal_rows(signals[start:start + rows_per_chunk], price_changes, candle_minutes, risk_free_rate)
+              for start in range(0, len(signals), rows_per_chunk)]
+    metrics: Dict[str, np.ndarray] = {metric: np.concatenate([chunk[metric] for chunk in chunks]) if chunks else np.empty(0)
+                                      for metric in METRICS if metric not in ('total_trades', 'buy_hold_returns')}
+    metrics['total_trades'] = metrics['num_longs'] + metrics['num_shorts']
+    metrics['buy_hold_returns'] = np.full(len(signals), price_changes.sum())
+    return {metric: metrics[metric] for metric in METRICS}
+
+
+def evaluate_trade_gains(trades: DataFrame, risk_free_rate: float = 0.0) -> Dict[str, float]:
+    """
+    Evaluates simulated trades, e.g. those of the inside bar momentum indicator.
+    :param trades: One row per trade, with the signal, gain and duration in minutes of each trade.
+    :param risk_free_rate: The risk-free return per trade, for the Sharpe ratio.
+    :return: The value of each metric in METRICS. The time in the market is in minutes.
+    """
+    gains: np.ndarray = trades['gain'].to_numpy(dtype=np.float64)
+    signals: np.ndarray = trades['signal'].to_numpy()
+    equity: np.ndarray = np.concatenate(([0.0], np.nancumsum(gains)))
+    traded_gains: np.ndarray = gains[~np.isnan(gains)]
+    metrics: Dict[str, np.ndarray] = _evaluate_trades(np.zeros(len(traded_gains), dtype=np.int64), traded_gains, equity[None, :], risk_free_rate)
+    metrics['num_longs'] = (signals == 1).sum()
+    metrics['num_shorts'] = (signals == -1).sum()
+    metrics['total_trades'] = metrics['num_longs'] + metrics['num_shorts']
+    metrics['buy_hold_returns'] = np.nansum(gains * signals)
+    metrics['time_in_market'] = trades['duration'].sum() if 'duration' in trades.columns else np.nan
+    return {metric: np.asarray(metrics[metric]).item() for metric in METRICS}
+
+
+class IndicatorEvaluation:
+    def __init__(self, pair: str, signals: DataFrame, pip_location: float | None = None, risk_free_rate: float = 0.0):
         """
-        :return: A tuple containing the number of buys and the number of sells
+        :param signals: Either the candles along with their signals, or simulated trades with a gain column.
+        :param pip_location: If provided, gains computed from the candles are expressed in pips. Trade gains are used as they are.
+        :param risk_free_rate: The risk-free return per trade, for the Sharpe ratio.
         """
-        return (self.signals['signal'] == 1).sum(), (self.signals['signal'] == -1).sum()
+        if 'signal' not in signals.columns:
+            raise ValueError('Please generate trades before evaluating the indicator.')
+        self.pair: str = pair
+        self.signals: DataFrame | None = signals
+        if 'gain' in signals.columns:
+            self._set_metrics(evaluate_trade_gains(signals, risk_free_rate))
+        else:
+            metrics: Dict[str, np.ndarray] = evaluate_signal_matrix(signals['signal'].to_numpy(), signals['mid_c'].to_numpy(), signals['time'].to_numpy(),
+                                                                    pip_location, risk_free_rate)
+            self._set_metrics({metric: values[0].item() for metric, values in metrics.items()})
 
-    def _evaluate_indicator(self) -> Tuple[float, float, float, float, float]:
+    @classmethod
+    def from_metrics(cls, pair: str, metrics: Mapping[str, float]) -> IndicatorEvaluation:
         """
-        Evaluates the indicator against buying the stock once and holding.
-        :return: The total return from buying and holding the stock, and the total, mean, min and max return obtained from the strategy.
+        Creates an evaluation from metrics computed elsewhere, e.g. by evaluate_signal_matrix(). Its signals are None.
         """
-        if 'signal' not in self.signals.columns:
-            raise ValueError('Please generate trades before evaluating the indicator.')
-        buy_hold_returns = self.signals['gain'] * self.signals['signal']
-        return buy_hold_returns.sum(), self.signals['gain'].sum(), self.signals['gain'].mean(), self.signals['gain'].min(), self.signals['gain'].max()
+        evaluation: IndicatorEvaluation = cls.__new__(cls)
+        evaluation.pair = pair
+        evaluation.signals = None
+        evaluation._set_metrics(metrics)
+        return evaluation
+
+    def _set_metrics(self, metrics: Mapping[str, float]) -> None:
+        self.num_longs, self.num_shorts, self.total_trades = metrics['num_longs'], metrics['num_shorts'], metrics['total_trades']
+        self.buy_hold_returns, self.total_gain, self.mean_gain = metrics['buy_hold_returns'], metrics['total_gain'], metrics['mean_gain']
+        self.min_gain, self.max_gain = metrics['min_gain'], metrics['max_gain']
+        self.sharpe_ratio, self.max_drawdown, self.profit_to_drawdown = metrics['sharpe_ratio'], metrics['max_drawdown'], metrics['profit_to_drawdown']
+        self.time_in_market = metrics['time_in_market']
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import pandas as pd
+from pandas import DataFrame
+
+from src.util.Constants import get_instruments_filename
+
+
+class InstrumentRegistry:
+    """
+    Metadata of the account's instruments, indexed by name. The instruments file is read once, on the first lookup, rather than on
+    every lookup. Use get_instrument_registry() to share one registry across the process.
+    """
+    def __init__(self, instruments_filename: str | None = None):
+        """
+        :param instruments_filename: Defaults to the instruments file of the project.
+        """
+        self.instruments_filename: str | None = instruments_filename
+        self.instruments: Dict[str, Dict[str, Any]] | None = None
+
+    def load(self, instruments: DataFrame) -> None:
+        """
+        :param instruments: The instruments, one row per instrument with its name in the 'name' column, as retrieved from OANDA.
+        """
+        self.instruments = instruments.set_index('name', drop=False).to_dict('index')
+
+    def _get_instruments(self) -> Dict[str, Dict[str, Any]]:
+        if self.instruments is None:
+            try:
+                self.load(pd.read_pickle(self.instruments_filename or get_instruments_filename()))
+            except IOError:
+                raise IOError("Instruments file could not be found. Please first retrieve account instruments using get_instruments_and_save_to_file().")
+        return self.instruments
+
+    def refresh(self, data_client) -> None:
+        """
+        Retrieves the instruments from OANDA again, saving them to the instruments file.
+        :param data_client: The DataClient to retrieve the instruments with.
+        """
+        self.load(data_client.get_instruments_and_save_to_file())
+
+    def is_valid_pair(self, pair: str) -> bool:
+        return pair in self._get_instruments()
+
+    def get_pairs(self) -> List[str]:
+        return list(self._get_instruments())
+
+    def get_instrument(self, pair: str) -> Dict[str, Any]:
+        """
+        :return: All metadata of the pair, e.g. its pipLocation, displayPrecision, tradeUnitsPrecision and marginRate.
+        """
+        try:
+            return self._get_instruments()[pair]
+        except KeyError:
+            raise ValueError("Unknown instrument: {}".format(pair))
+
+    def get_pip_location(self, pair: str) -> float:
+        return float(self.get_instrument(pair)['pipLocation'])
+
+    def get_display_precision(self, pair: str) -> int:
+        return int(self.get_instrument(pair)['displayPrecision'])
+
+
+_instrument_registry: InstrumentRegistry | None = None
+
+
+def get_instrument_registry() -> InstrumentRegistry:
+    """
+    :return: The registry shared across the process.
+    """
+    global _instrument_registry
+    if _instrument_registry is None:
+        _instrument_registry = InstrumentRegistry()
+    return _instrument_registry
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import math
+import pickle
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.model.candle.Candle import Candle, CANDLE_COLUMNS
+from src.model.signal_generator_iterations.SignalGeneratorIteration import SignalGeneratorIteration
+
+INITIAL_CAPACITY: int = 1024
+
+
+def _get_column_dtypes(time_dtype: np.dtype, indicator_fields: Tuple[str, ...]) -> Dict[str, np.dtype]:
+    """
+    The dtypes follow the candle schema and the iteration type, rather than the first values recorded, so that e.g. an integer
+    volume followed by a missing one, or an integer average followed by a fractional one, are stored as they are.
+    :return: The dtype of each column: float64 for the candle prices, volume and indicator values, and int64 for the signal.
+    """
+    return ({'time': time_dtype} | {column: np.dtype(np.float64) for column in CANDLE_COLUMNS[1:]} | {'signal': np.dtype(np.int64)}
+            | {field: np.dtype(np.float64) for field in indicator_fields})
+
+
+class IterationHistory:
+    """
+    The iterations of a signal generator, oldest first, recorded into one growable NumPy array per field (the candle's columns,
+    the signal and the indicator values) rather than as objects. Signal DataFrames of unbounded histories are built from views of
+    these arrays, and iteration objects are only created when read, e.g. with history[-1] or by iterating over it.
+
+    By default, every iteration is kept in memory. If a maximum is set, only the latest iterations are kept in memory and older
+    ones are either dropped or, if a log file is given, appended to it so that the full history can still be read. Iterations
+    are moved out of memory in chunks, so up to twice the maximum can be held at a time.
+    Like a deque with a maximum length, len() and indexing cover the latest iterations only, while number_of_iterations counts
+    every iteration recorded.
+    """
+    def __init__(self, iteration_type: type = SignalGeneratorIteration, max_iterations_in_memory: int | None = None, log_filename: str | None = None):
+        """
+        :param iteration_type: The SignalGeneratorIteration subclass to create when reading iterations.
+        :param max_iterations_in_memory: Number of latest iterations to keep in memory. Keeps all iterations if None.
+        :param log_filename: Append-only log for iterations evicted from memory. Overwritten when the first iterations are evicted.
+        """
+        if max_iterations_in_memory is not None and max_iterations_in_memory < 1:
+            raise ValueError("At least one iteration must be kept in memory.")
+        self.iteration_type: type = iteration_type
+        self.max_iterations_in_memory: int | None = max_iterations_in_memory
+        self.log_filename: str | None = log_filename
+        self.columns: Dict[str, np.ndarray] = {}
+        self.indicator_fields: Tuple[str, ...] = ()
+        # Number of rows held in the column arrays, and number of iterations recorded in total.
+        self.size: int = 0
+        self.number_of_iterations: int = 0
+        self.number_of_logged_iterations: int = 0
+        # Number of leading rows that DataFrames returned by to_dataframe() are views of.
+        self.number_of_viewed_rows: int = 0
+        self.log_file: BinaryIO | None = None
+
+    def _initialise_columns(self, dtypes: Dict[str, np.dtype], indicator_fields: Tuple[str, ...], capacity: int = INITIAL_CAPACITY) -> None:
+        if self.max_iterations_in_memory is not None:
+            capacity = 2 * self.max_iterations_in_memory
+        self.columns = {field: np.empty(capacity, dtype=dtype) for field, dtype in dtypes.items()}
+        self.indicator_fields = indicator_fields
+
+    def record(self, candle: Candle, signal: int, **indicator_values: Any) -> None:
+        """
+        Records an iteration without creating an iteration object.
+        :param candle: The candle of the iteration.
+        :param signal: The signal generated for the candle.
+        :param indicator_values: The remaining fields of the iteration type, e.g. the moving averages.
+        """
+        if not self.columns:
+            time_dtype: np.dtype = np.dtype('datetime64[ns]') if isinstance(candle.time, datetime) else np.dtype(object)
+            self._initialise_columns(_get_column_dtypes(time_dtype, tuple(indicator_values.keys())), tuple(indicator_values.keys()))
+        elif self.size == len(self.columns['signal']):
+            self._make_space()
+        row: int = self.size
+        columns: Dict[str, np.ndarray] = self.columns
+        for column in CANDLE_COLUMNS:
+            value = getattr(candle, column)
+            columns[column][row] = np.nan if value is None else value
+        columns['signal'][row] = signal
+        for field, value in indicator_values.items():
+            columns[field][row] = np.nan if value is None else value
+        self.size += 1
+        self.number_of_iterations += 1
+
+    def extend(self, candles: DataFrame, signals: np.ndarray, **indicator_values: np.ndarray) -> None:
+        """
+        Records one iteration per candle in one go, e.g. for signals generated with array operations.
+        :param candles: The candles of the iterations, oldest first.
+        :param signals: The signal generated for each candle.
+        :param indicator_values: One array per remaining field of the iteration type.
+        """
+        candles = candles.reindex(columns=CANDLE_COLUMNS)
+        time_dtype: np.dtype = np.dtype('datetime64[ns]') if pd.api.types.is_datetime64_any_dtype(candles['time']) else np.dtype(object)
+        new_columns: Dict[str, np.ndarray] = ({'time': candles['time'].to_numpy(dtype=time_dtype)}
+                                              | {column: candles[column].to_numpy(dtype=np.float64) for column in CANDLE_COLUMNS[1:]}
+                                              | {'signal': np.asarray(signals, dtype=np.int64)}
+                                              | {field: np.asarray(values, dtype=np.float64) for field, values in indicator_values.items()})
+        number_of_candles: int = len(candles)
+        if not self.columns:
+            self._initialise_columns(_get_column_dtypes(time_dtype, tuple(indicator_values.keys())), tuple(indicator_values.keys()),
+                                     max(INITIAL_CAPACITY, number_of_candles))
+        # A bounded history can only make space for max_iterations_in_memory iterations at a time.
+        chunk_size: int = self.max_iterations_in_memory or max(number_of_candles, 1)
+        for start in range(0, number_of_candles, chunk_size):
+            stop: int = min(start + chunk_size, number_of_candles)
+            while self.size + stop - start > len(self.columns['signal']):
+                self._make_space()
+            for field, column in new_columns.items():
+                self.columns[field][self.size:self.size + stop - start] = column[start:stop]
+            self.size += stop - start
+            self.number_of_iterations += stop - start
+
+    def append(self, iteration: SignalGeneratorIteration) -> None:
+        self.record(iteration.candle, iteration.signal, **{field: value for field, value in vars(iteration).items() if field not in ('candle', 'signal')})
+
+    def _make_space(self) -> None:
+        """
+        Grows the columns if all iterations are kept in memory. Otherwise moves everything but the latest iterations out of memory.
+        """
+        if self.max_iterations_in_memory is None:
+            self.columns = {field: np.resize(column, 2 * len(column)) for field, column in self.columns.items()}
+            self.number_of_viewed_rows = 0
+            return
+        number_to_evict: int = self.size - self.max_iterations_in_memory
+        if self.log_filename:
+            self._log({field: column[:number_to_evict].copy() for field, column in self.columns.items()})
+        for column in self.columns.values():
+            column[:self.max_iterations_in_memory] = column[number_to_evict:self.size]
+        self.size = self.max_iterations_in_memory
+
+    def _log(self, chunk: Dict[str, np.ndarray]) -> None:
+        if self.log_file is None:
+            self.log_file = open(self.log_filename, 'ab' if self.number_of_logged_iterations else 'wb')
+        pickle.dump(chunk, self.log_file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.number_of_logged_iterations += len(chunk['signal'])
+
+    def _read_log(self) -> List[Dict[str, np.ndarray]]:
+        chunks: List[Dict[str, np.ndarray]] = []
+        if not self.number_of_logged_iterations:
+            return chunks
+        if self.log_file is not None:
+            self.log_file.flush()
+        with open(self.log_filename, 'rb') as log_file:
+            while True:
+                try:
+                    chunks.append(pickle.load(log_file))
+                except EOFError:
+                    return chunks
+
+    def _get_retained_start(self) -> int:
+        if self.max_iterations_in_memory is None:
+            return 0
+        return max(0, self.size - self.max_iterations_in_memory)
+
+    def latest(self, field: str) -> Any:
+        """
+        :return: The value of a field in the latest iteration, without creating the iteration.
+        """
+        if not self.size:
+            raise IndexError("No iterations have been recorded.")
+        return self.columns[field].item(self.size - 1)
+
+    def _create_iteration(self, row: int) -> SignalGeneratorIteration:
+        candle_values: List[Any] = []
+        for column in CANDLE_COLUMNS:
+            value = self.columns[column][row]
+            if isinstance(value, np.datetime64):
+                value = pd.Timestamp(value)
+            elif isinstance(value, np.floating):
+                value = None if math.isnan(value) else value.item()
+            candle_values.append(value)
+        return self.iteration_type(Candle(*candle_values), self.columns['signal'].item(row),
+                                   **{field: self.columns[field].item(row) for field in self.indicator_fields})
+
+    def pop(self) -> SignalGeneratorIteration:
+        if self.size <= self._get_retained_start():
+            raise IndexError("No iterations are held in memory.")
+        iteration: SignalGeneratorIteration = self._create_iteration(self.size - 1)
+        if self.size <= self.number_of_viewed_rows:
+            # The row is about to be overwritten by the next iteration, so stop sharing it with the DataFrames already returned.
+            self.columns = {field: column.copy() for field, column in self.columns.items()}
+            self.number_of_viewed_rows = 0
+        self.size -= 1
+        self.number_of_iterations -= 1
+        return iteration
+
+    def __len__(self) -> int:
+        return self.size - self._get_retained_start()
+
+    def __getitem__(self, index: int) -> SignalGeneratorIteration:
+        retained_start: int = self._get_retained_start()
+        row: int = (self.size if index < 0 else retained_start) + index
+        if not retained_start <= row < self.size:
+            raise IndexError("Iteration is not held in memory. Use read_all() to read the full history.")
+        return self._create_iteration(row)
+
+    def __iter__(self) -> Iterator[SignalGeneratorIteration]:
+        for row in range(self._get_retained_start(), self.size):
+            yield self._create_iteration(row)
+
+    def to_dataframe(self, full_history: bool = True) -> DataFrame:
+        """
+        :param full_history: If True, includes the iterations logged to disk as well as those in memory.
+        :return: A DataFrame with one row per iteration. If all iterations are kept in memory, its columns are views of the recorded
+        arrays, which are replaced rather than changed when they grow. A bounded history compacts its arrays in place, so its columns
+        are copies.
+        """
+        start: int = 0 if full_history else self._get_retained_start()
+        if self.max_iterations_in_memory is None:
+            columns: Dict[str, np.ndarray] = {field: column[start:self.size] for field, column in self.columns.items()}
+            self.number_of_viewed_rows = self.size
+        else:
+            columns: Dict[str, np.ndarray] = {field: column[start:self.size].copy() for field, column in self.columns.items()}
+        if full_history and self.number_of_logged_iterations:
+            chunks: List[Dict[str, np.ndarray]] = self._read_log() + [columns]
+            columns = {field: np.concatenate([chunk[field] for chunk in chunks]) for field in columns}
+        return DataFrame(columns, copy=False)
+
+    def read_all(self) -> Iterator[SignalGeneratorIteration]:
+        """
+        :return: Every iteration still available, oldest first: the logged iterations followed by those in memory.
+        """
+        for chunk in self._read_log():
+            history: IterationHistory = IterationHistory(self.iteration_type)
+            history.columns, history.indicator_fields = chunk, self.indicator_fields
+            history.size = history.number_of_iterations = len(chunk['signal'])
+            yield from history
+        for row in range(self.size):
+            yield self._create_iteration(row)
+
+    def close(self) -> None:
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, List
+
+# Latencies are counted in buckets that grow by RELATIVE_RESOLUTION, from MINIMUM_LATENCY up to MAXIMUM_LATENCY seconds,
+# so that percentiles are accurate to within RELATIVE_RESOLUTION while memory stays constant.
+MINIMUM_LATENCY: float = 1e-6
+MAXIMUM_LATENCY: float = 1e3
+RELATIVE_RESOLUTION: float = 0.05
+_LOG_BASE: float = math.log1p(RELATIVE_RESOLUTION)
+NUMBER_OF_BUCKETS: int = math.ceil(math.log(MAXIMUM_LATENCY / MINIMUM_LATENCY) / _LOG_BASE) + 1
+
+
+class LatencyHistogram:
+    """
+    Histogram of latencies with logarithmic buckets. Recording is O(1) and memory does not grow with the number of latencies.
+    """
+    def __init__(self):
+        self.counts: List[int] = [0] * NUMBER_OF_BUCKETS
+        self.count: int = 0
+        self.total: float = 0.0
+        self.maximum: float = 0.0
+
+    @staticmethod
+    def _get_bucket(latency: float) -> int:
+        if latency <= MINIMUM_LATENCY:
+            return 0
+        return min(int(math.log(latency / MINIMUM_LATENCY) / _LOG_BASE) + 1, NUMBER_OF_BUCKETS - 1)
+
+    @staticmethod
+    def _get_bucket_upper_bound(bucket: int) -> float:
+        return MINIMUM_LATENCY * math.exp(bucket * _LOG_BASE)
+
+    def record(self, latency: float) -> None:
+        """
+        :param latency: The latency, in seconds. Negative latencies, e.g. from clock adjustments, are counted as zero.
+        """
+        latency = max(latency, 0.0)
+        self.counts[self._get_bucket(latency)] += 1
+        self.count += 1
+        self.total += latency
+        self.maximum = max(self.maximum, latency)
+
+    def get_percentile(self, percentile: float) -> float:
+        """
+        :param percentile: The percentile, between 0 and 100.
+        :return: The latency below which the percentile of recorded latencies fall, in seconds, rounded up to its bucket.
+        """
+        if not self.count:
+            raise ValueError("No latencies have been recorded.")
+        rank: float = percentile / 100 * self.count
+        cumulative_count: int = 0
+        for bucket, count in enumerate(self.counts):
+            cumulative_count += count
+            if count and cumulative_count >= rank:
+                return min(self._get_bucket_upper_bound(bucket), self.maximum)
+        return self.maximum
+
+    def summarise(self) -> Dict[str, float]:
+        """
+        :return: The count, and the mean, p50, p99 and maximum latencies in milliseconds.
+        """
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count * 1e3,
+            'p50_ms': self.get_percentile(50) * 1e3,
+            'p99_ms': self.get_percentile(99) * 1e3,
+            'max_ms': self.maximum * 1e3,
+        }
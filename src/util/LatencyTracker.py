@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, List, Mapping, Tuple
+
+from src.util.LatencyHistogram import LatencyHistogram
+
+# The stages of the live pipeline, in order. Each message is stamped with the epoch time in nanoseconds at each stage.
+CANDLE_CLOSE: str = 'candle_close'
+PUBLISH: str = 'publish'
+CONSUME: str = 'consume'
+SIGNAL: str = 'signal'
+ORDER_SENT: str = 'order_sent'
+ORDER_ACKNOWLEDGED: str = 'order_acknowledged'
+STAGES: Tuple[str, ...] = (CANDLE_CLOSE, PUBLISH, CONSUME, SIGNAL, ORDER_SENT, ORDER_ACKNOWLEDGED)
+# Histogram of the latency from the first to the last stage a message reached.
+TOTAL: str = 'total'
+DEFAULT_LOG_INTERVAL_SECONDS: float = 60.0
+
+
+def stamp(stamps: Dict[str, int], stage: str) -> Dict[str, int]:
+    """
+    Stamps a message with the current time at a stage.
+    :return: The stamps, for chaining.
+    """
+    stamps[stage] = time.time_ns()
+    return stamps
+
+
+class LatencyTracker:
+    """
+    Keeps a latency histogram per stage of the live pipeline, measured from the previous stage a message was stamped at,
+    along with a histogram of the total latency. Stamps are epoch times so that they can be compared across processes on
+    the same host. Latencies can be recorded from several threads, e.g. when orders are acknowledged asynchronously.
+    """
+    def __init__(self, name: str, log_interval_seconds: float | None = DEFAULT_LOG_INTERVAL_SECONDS):
+        """
+        :param name: Name to log the summary under, e.g. the pair.
+        :param log_interval_seconds: How often record() logs a summary. Never logs if None.
+        """
+        self.name: str = name
+        self.log_interval_seconds: float | None = log_interval_seconds
+        self.histograms: Dict[str, LatencyHistogram] = {stage: LatencyHistogram() for stage in STAGES[1:] + (TOTAL,)}
+        self.last_log_time: float = time.monotonic()
+        self.lock: threading.Lock = threading.Lock()
+
+    def record(self, stamps: Mapping[str, int]) -> None:
+        """
+        Records the latencies of a message that has gone through the pipeline, then logs a summary if one is due.
+        :param stamps: Epoch time in nanoseconds per stage. Stages the message did not reach are skipped.
+        """
+        reached_stages: List[str] = [stage for stage in STAGES if stage in stamps]
+        with self.lock:
+            for previous_stage, stage in zip(reached_stages, reached_stages[1:]):
+                self.histograms[stage].record((stamps[stage] - stamps[previous_stage]) / 1e9)
+            if len(reached_stages) > 1:
+                self.histograms[TOTAL].record((stamps[reached_stages[-1]] - stamps[reached_stages[0]]) / 1e9)
+        self.log_summary_if_due()
+
+    def get_percentile(self, stage: str, percentile: float) -> float:
+        """
+        :param stage: A stage after the first one, or TOTAL.
+        :return: The percentile of the latency of the stage, in milliseconds.
+        """
+        return self.histograms[stage].get_percentile(percentile) * 1e3
+
+    def summarise(self) -> Dict[str, Dict[str, float]]:
+        """
+        :return: The count, mean, p50, p99 and maximum latency of each stage that has been reached, in milliseconds.
+        """
+        with self.lock:
+            return {stage: histogram.summarise() for stage, histogram in self.histograms.items() if histogram.count}
+
+    def log_summary_if_due(self) -> None:
+        with self.lock:
+            if self.log_interval_seconds is None or time.monotonic() - self.last_log_time < self.log_interval_seconds:
+                return
+            self.last_log_time = time.monotonic()
+        print("{}: Latency summary".format(self.name))
+        for stage, summary in self.summarise().items():
+            print("  {:<20} count: {:>8}, p50: {:>9.3f} ms, p99: {:>9.3f} ms, max: {:>9.3f} ms".format(
+                stage, summary['count'], summary['p50_ms'], summary['p99_ms'], summary['max_ms']))
@@ -8,8 +8,7 @@ class PlotProperties:
         self.ma_pairs: List[Tuple[int, int]] = ma_pairs
         self.from_time: datetime = from_time
         self.to_time: datetime = to_time
-        if currencies:
-            self.currency_pairs: List[str] = self.generate_currency_pairs()
+        self.currency_pairs: List[str] = self.generate_currency_pairs() if currencies else []
 
     def generate_currency_pairs(self) -> List[str]:
         currency_pairs: List[str] = []
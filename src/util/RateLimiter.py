@@ -0,0 +1,34 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket rate limiter that can be shared between threads. Tokens refill continuously at the given rate, up to the capacity,
+    which allows short bursts while keeping the average rate.
+    """
+    def __init__(self, rate: float, capacity: int):
+        """
+        :param rate: Tokens added per second.
+        :param capacity: Maximum number of tokens that can be stored, i.e. the largest burst allowed.
+        """
+        self.rate: float = rate
+        self.capacity: int = capacity
+        self.tokens: float = capacity
+        self.updated_at: float = time.monotonic()
+        self.lock: threading.Lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Takes a token, blocking until one is available.
+        """
+        while True:
+            with self.lock:
+                now: float = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait: float = (1 - self.tokens) / self.rate
+            time.sleep(wait)
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.model.Granularity import Granularity
+from src.model.Indicator import Indicator
+from src.model.candle.Price import CANDLES_DF_COLUMNS
+from src.util.IndicatorEvaluation import IndicatorEvaluation, METRICS
+
+# SQLite limits the number of parameters per statement, so keys are looked up in batches of this size.
+MAX_KEYS_PER_QUERY: int = 500
+COUNT_METRICS: Tuple[str, ...] = ('num_longs', 'num_shorts', 'total_trades')
+INFO_COLUMNS: Tuple[str, ...] = ('result_key', 'pair', 'indicator', 'granularity', 'parameters', 'data_hash', 'from_time', 'to_time', 'created_at')
+
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS results (
+    result_key TEXT PRIMARY KEY,
+    pair TEXT NOT NULL,
+    indicator TEXT NOT NULL,
+    granularity TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    data_hash TEXT NOT NULL,
+    from_time TEXT,
+    to_time TEXT,
+    created_at TEXT NOT NULL,
+    {metrics}
+);
+CREATE INDEX IF NOT EXISTS results_by_strategy ON results (indicator, granularity, pair);
+CREATE INDEX IF NOT EXISTS results_by_sharpe_ratio ON results (indicator, sharpe_ratio);
+""".format(metrics=',\n    '.join('{} {}'.format(metric, 'INTEGER' if metric in COUNT_METRICS else 'REAL') for metric in METRICS))
+
+
+def hash_candles(*candles: DataFrame) -> str:
+    """
+    :param candles: One or more candles DataFrames, e.g. the trade and the simulation candles of a strategy.
+    :return: A digest of the candles, which changes if any candle is added, removed or changed.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for candle_data in candles:
+        # The number of candles separates the DataFrames, so that moving candles from one to the other changes the digest.
+        digest.update(np.int64(len(candle_data)).tobytes())
+        for column in CANDLES_DF_COLUMNS:
+            values: np.ndarray = candle_data[column].to_numpy(dtype='datetime64[ns]' if column == 'time' else np.float64)
+            digest.update(np.ascontiguousarray(values).view(np.uint8))
+    return digest.hexdigest()
+
+
+def get_result_key(pair: str, indicator: Indicator, granularity: Granularity, data_hash: str, parameters: Dict[str, Any]) -> str:
+    """
+    :param data_hash: The hash of the candles the strategy was evaluated on, from hash_candles().
+    :param parameters: The parameters of the strategy, e.g. its windows. Must be serialisable to JSON.
+    :return: A key identifying the result of evaluating a strategy on some candles.
+    """
+    key: str = json.dumps([pair, indicator.value, granularity.name, data_hash, parameters], sort_keys=True)
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+class ResultStore:
+    """
+    Backtest results, stored in an SQLite database and keyed by the hash of the candles and the strategy parameters they were
+    computed from, so that reruns only compute new combinations. Results are indexed by strategy, for querying past results.
+    """
+    def __init__(self, filename: str):
+        self.filename: str = filename
+        if os.path.dirname(filename):
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript(SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        Opens a connection, commits on success or rolls back on error, and closes it.
+        """
+        connection: sqlite3.Connection = sqlite3.connect(self.filename)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _select(self, keys: List[str], columns: str) -> List[Tuple]:
+        rows: List[Tuple] = []
+        with self._connect() as connection:
+            for start in range(0, len(keys), MAX_KEYS_PER_QUERY):
+                batch: List[str] = keys[start:start + MAX_KEYS_PER_QUERY]
+                rows.extend(connection.execute('SELECT {} FROM results WHERE result_key IN ({})'.format(columns, ', '.join('?' * len(batch))), batch))
+        return rows
+
+    def get_stored_keys(self, keys: Iterable[str]) -> Set[str]:
+        """
+        :return: The keys, out of the given ones, that results are stored for.
+        """
+        return {key for key, in self._select(list(keys), 'result_key')}
+
+    def save(self, results: Iterable[Tuple[str, Dict[str, Any], IndicatorEvaluation]]) -> None:
+        """
+        Stores results in one transaction, replacing any stored under the same keys.
+        :param results: The key, the description and the evaluation of each result. The description holds the pair, indicator,
+        granularity, data_hash and parameters used for the key, and optionally the from_time and to_time of the candles.
+        """
+        created_at: str = datetime.now().isoformat()
+        rows: List[Tuple] = []
+        for result_key, description, evaluation in results:
+            metrics: List[float | int | None] = []
+            for metric in METRICS:
+                value = getattr(evaluation, metric)
+                # NaN is stored as NULL.
+                metrics.append(None if value is None or pd.isna(value) else int(value) if metric in COUNT_METRICS else float(value))
+            rows.append((result_key, description['pair'], description['indicator'].value, description['granularity'].name,
+                         json.dumps(description['parameters'], sort_keys=True), description['data_hash'],
+                         self._format_time(description.get('from_time')), self._format_time(description.get('to_time')), created_at, *metrics))
+        with self._connect() as connection:
+            connection.executemany('INSERT OR REPLACE INTO results ({}) VALUES ({})'.format(', '.join(INFO_COLUMNS + METRICS),
+                                                                                            ', '.join('?' * (len(INFO_COLUMNS) + len(METRICS)))), rows)
+
+    @staticmethod
+    def _format_time(time: datetime | None) -> str | None:
+        return time.isoformat() if time is not None else None
+
+    def get_results(self, keys: List[str]) -> DataFrame:
+        """
+        :return: The stored results for the keys, in the order of the keys, indexed by pair. Keys without results are skipped.
+        """
+        results: DataFrame = DataFrame(self._select(keys, ', '.join(INFO_COLUMNS + METRICS)), columns=list(INFO_COLUMNS + METRICS))
+        order: Dict[str, int] = {key: index for index, key in enumerate(keys)}
+        results = results.sort_values('result_key', key=lambda result_keys: result_keys.map(order))
+        return results.astype({metric: np.float64 for metric in METRICS if metric not in COUNT_METRICS}).set_index('pair')
+
+    def query(self, pair: str | None = None, indicator: Indicator | None = None, granularity: Granularity | None = None,
+              order_by: str | None = None, ascending: bool = False, limit: int | None = None) -> DataFrame:
+        """
+        Queries past results, e.g. the ten MA crossover results with the highest Sharpe ratio.
+        :param order_by: The metric to sort the results by, e.g. 'sharpe_ratio'. Results without it come last.
+        :param limit: If provided, returns at most this many results.
+        :return: The results, indexed by pair.
+        """
+        conditions: List[str] = []
+        parameters: List[Any] = []
+        for column, value in (('pair', pair), ('indicator', indicator.value if indicator else None), ('granularity', granularity.name if granularity else None)):
+            if value is not None:
+                conditions.append('{} = ?'.format(column))
+                parameters.append(value)
+        sql: str = 'SELECT * FROM results'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        if order_by is not None:
+            if order_by not in METRICS:
+                raise ValueError("Cannot order results by '{}'. Please choose one of {}.".format(order_by, ', '.join(METRICS)))
+            sql += ' ORDER BY {0} IS NULL, {0} {1}'.format(order_by, 'ASC' if ascending else 'DESC')
+        if limit is not None:
+            sql += ' LIMIT ?'
+            parameters.append(limit)
+        with self._connect() as connection:
+            results: DataFrame = pd.read_sql_query(sql, connection, params=parameters)
+        return results.astype({metric: np.float64 for metric in METRICS if metric not in COUNT_METRICS}).set_index('pair')
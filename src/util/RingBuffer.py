@@ -0,0 +1,44 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-capacity first-in-first-out buffer of numbers, backed by a preallocated NumPy array.
+    Memory stays constant and appending does not allocate.
+    """
+    def __init__(self, capacity: int, dtype: type = np.float64):
+        self.values: np.ndarray = np.zeros(capacity, dtype=dtype)
+        self.capacity: int = capacity
+        self.start: int = 0
+        self.size: int = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def is_full(self) -> bool:
+        return self.size == self.capacity
+
+    def append(self, value: float) -> float | None:
+        """
+        Appends a value, evicting the oldest one if the buffer is full.
+        :return: The evicted value, or None if the buffer was not full.
+        """
+        if self.size < self.capacity:
+            self.values[(self.start + self.size) % self.capacity] = value
+            self.size += 1
+            return None
+        evicted: float = self.values.item(self.start)
+        self.values[self.start] = value
+        self.start = (self.start + 1) % self.capacity
+        return evicted
+
+    def latest(self) -> float:
+        if not self.size:
+            raise IndexError("The ring buffer is empty.")
+        return self.values.item((self.start + self.size - 1) % self.capacity)
+
+    def to_array(self) -> np.ndarray:
+        """
+        :return: A copy of the values, oldest first.
+        """
+        return np.roll(self.values, -self.start)[:self.size]
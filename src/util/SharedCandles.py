@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+
+@dataclass(frozen=True)
+class SharedCandlesHandle:
+    """
+    Small, picklable description of candles placed in shared memory. Send this to worker processes instead of the DataFrame.
+    """
+    times_name: str
+    prices_name: str
+    length: int
+    price_columns: Tuple[str, ...]
+
+    def attach(self) -> Tuple[DataFrame, List[SharedMemory]]:
+        """
+        Maps the shared candles into this process without copying them. Only call this from a child process of the process
+        that created the SharedCandles, as they share a resource tracker.
+        Keep the returned shared memory blocks alive (and close them) for as long as the DataFrame is in use.
+        :return: The candles DataFrame and the shared memory blocks backing it.
+        """
+        times_memory: SharedMemory = SharedMemory(name=self.times_name)
+        prices_memory: SharedMemory = SharedMemory(name=self.prices_name)
+        times: np.ndarray = np.ndarray((self.length,), dtype='datetime64[ns]', buffer=times_memory.buf)
+        prices: np.ndarray = np.ndarray((self.length, len(self.price_columns)), dtype=np.float64, buffer=prices_memory.buf)
+        candles: DataFrame = DataFrame(prices, columns=list(self.price_columns), copy=False)
+        candles.insert(0, 'time', times)
+        return candles, [times_memory, prices_memory]
+
+
+class SharedCandles:
+    """
+    Copies the time and price columns of a candles DataFrame into shared memory once, so that any number of worker processes
+    can read them through a SharedCandlesHandle without the DataFrame being pickled.
+    Use as a context manager, or call release() once all workers are done.
+    """
+    def __init__(self, candles: DataFrame):
+        price_columns: List[str] = [column for column in candles.columns if column != 'time']
+        length: int = candles.shape[0]
+        # Shared memory blocks cannot be empty.
+        self.times_memory: SharedMemory = SharedMemory(create=True, size=max(length * 8, 1))
+        self.prices_memory: SharedMemory = SharedMemory(create=True, size=max(length * len(price_columns) * 8, 1))
+        times: np.ndarray = np.ndarray((length,), dtype='datetime64[ns]', buffer=self.times_memory.buf)
+        times[:] = pd.to_datetime(candles['time']).to_numpy(dtype='datetime64[ns]')
+        prices: np.ndarray = np.ndarray((length, len(price_columns)), dtype=np.float64, buffer=self.prices_memory.buf)
+        prices[:] = candles[price_columns].to_numpy(dtype=np.float64)
+        self.handle: SharedCandlesHandle = SharedCandlesHandle(self.times_memory.name, self.prices_memory.name, length, tuple(price_columns))
+
+    def release(self) -> None:
+        for memory in (self.times_memory, self.prices_memory):
+            memory.close()
+            memory.unlink()
+
+    def __enter__(self) -> SharedCandles:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
@@ -1,12 +1,13 @@
 import os
 from datetime import datetime
-from pathlib import Path
 from typing import List, Dict, Any
 
-import pandas as pd
 from pandas import DataFrame
 
-from src.util.Constants import INSTRUMENTS_FILENAME, CANDLE_FOLDER, DATA_FOLDER
+from src.util.CandleResampler import CandleResampler
+from src.util.CandleStore import CandleStore
+from src.util.ResultStore import ResultStore
+from src.util.Constants import get_instruments_filename, get_candle_folder, get_results_filename, DATA_FOLDER
 from src.model.Granularity import Granularity
 from src.model.candle.Price import Price, CANDLES_DF_COLUMNS
 
@@ -25,7 +26,7 @@ def prepare_candle(_candle: Dict[str, Any]) -> Dict[str, float | datetime]:
 
 
 def instruments_file_exists() -> bool:
-    return os.path.exists(INSTRUMENTS_FILENAME)
+    return os.path.exists(get_instruments_filename())
 
 
 def save_instruments_to_file(instruments: DataFrame):
@@ -35,7 +36,7 @@ def save_instruments_to_file(instruments: DataFrame):
     """
     try:
         os.makedirs(DATA_FOLDER, exist_ok=True)
-        instruments.to_pickle(INSTRUMENTS_FILENAME)
+        instruments.to_pickle(get_instruments_filename())
     except Exception as e:
         raise IOError("Could not save instruments to file. Error: {}".format(e))
 
@@ -44,9 +45,17 @@ def validate_candles_df(candles: DataFrame) -> bool:
     return list(candles.columns) == CANDLES_DF_COLUMNS
 
 
+def get_candle_store() -> CandleStore:
+    return CandleStore(get_candle_folder())
+
+
+def get_result_store() -> ResultStore:
+    return ResultStore(get_results_filename())
+
+
 def save_candles_to_file(candles: DataFrame, pair: str, granularity: Granularity, from_time: datetime, to_time: datetime):
     """
-    Save candles to file.
+    Save candles to the candle store.
     :param to_time: The date that candles are collected up to.
     :param from_time: The date that the candles start from.
     :param candles: DF containing candles.
@@ -54,33 +63,24 @@ def save_candles_to_file(candles: DataFrame, pair: str, granularity: Granularity
     :param granularity: Granularity of the candles.
     """
     try:
-        Path(CANDLE_FOLDER).mkdir(parents=True, exist_ok=True)
-        candles.to_pickle(get_historical_data_filename(pair, granularity, from_time, to_time))
+        get_candle_store().append(pair, granularity, candles, from_time, to_time)
     except Exception as e:
         raise IOError("Could not save candles to file. Error: {}".format(e))
 
 
-def get_historical_data_filename(pair: str, granularity: Granularity, from_time: datetime, to_time: datetime) -> str:
-    return '{}/{}_{}_from_{}_to_{}.pkl'.format(CANDLE_FOLDER, pair, granularity.name, from_time.strftime("%Y-%m-%dT%H-%M-%S"),
-                                               to_time.strftime("%Y-%m-%dT%H-%M-%S"))
-
-
 def get_downloaded_price_data_for_pair(pair: str, granularity: Granularity, from_time: datetime, to_time: datetime) -> DataFrame:
     """
-    Retrieves downloaded price data for a given pair and granularity, between 2 provided dates. Returns an empty DataFrame if no data is found.
+    Retrieves downloaded price data for a given pair and granularity, between 2 provided dates. If the range has not been downloaded
+    at this granularity, but has been at a finer one, the candles are resampled from the finer candles. Returns an empty DataFrame if
+    neither is the case.
     :param pair: Currency pair to retrieve data for
     :param granularity: Granularity to retrieve data for
     :param from_time: Start time to retrieve data from.
     :param to_time: End time to retrieve data to.
     :return: A DataFrame with the retrieved data if found, empty DataFrame if not.
     """
-    try:
-        candles = pd.read_pickle(get_historical_data_filename(pair, granularity, from_time, to_time))
-    except FileNotFoundError:
+    candles: DataFrame | None = CandleResampler(get_candle_store()).get_candles(pair, granularity, from_time, to_time)
+    if candles is None:
         print("No historical data found for currency pair {} at granularity {}. Downloading...".format(pair, granularity.name))
         return DataFrame(columns=['time'] + [column for column in Price.__members__])
-    columns = [col for col in candles.columns if col not in ['time', 'volume']]
-    candles[columns] = candles[columns].apply(pd.to_numeric, errors='coerce')
     return candles
-
-
@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas import DataFrame
+
+from src.model.Granularity import Granularity
+from src.model.Indicator import Indicator
+
+PAIR: str = "EUR_USD"
+OTHER_PAIR: str = "GBP_USD"
+MA_WINDOWS = [4, 8, 16]
+
+
+@pytest.fixture
+def backtester(data_folder, monkeypatch, create_candles):
+    from src.app.Backtester import Backtester
+    from src.util.InstrumentRegistry import get_instrument_registry
+    from src.util.Utilities import get_candle_store
+    for pair, phase in ((PAIR, 0), (OTHER_PAIR, 1)):
+        candles: DataFrame = create_candles(1 + 0.01 * np.sin(np.linspace(phase, 20 + phase, 500)))
+        get_candle_store().append(pair, Granularity.M5, candles, candles['time'].iloc[0].to_pydatetime(), candles['time'].iloc[-1].to_pydatetime())
+    monkeypatch.setattr(get_instrument_registry(), 'instruments', {pair: {'name': pair, 'pipLocation': -4} for pair in (PAIR, OTHER_PAIR)})
+    os.makedirs('test_results', exist_ok=True)
+    yield Backtester(indicator=Indicator.MA_CROSSOVER)
+
+
+def run(backtester, **kwargs) -> None:
+    backtester.run(trade_granularity=Granularity.M5, from_time=pd.Timestamp('2024-06-03').to_pydatetime(),
+                   to_time=pd.Timestamp('2024-06-04 17:35').to_pydatetime(), use_only_downloaded_price_data=True, file_type='csv',
+                   **{'currencies': ['EUR', 'USD'], 'ma_windows': MA_WINDOWS} | kwargs)
+
+
+class TestBacktester:
+    def test_stored_results_are_not_computed_again(self, backtester, monkeypatch):
+        from src.app.Backtester import Backtester
+        swept_window_pairs = []
+        sweep_ma_crossover = Backtester.sweep_ma_crossover
+
+        def record_sweep(*args):
+            swept_window_pairs.append(args[-1])
+            return sweep_ma_crossover(*args)
+        monkeypatch.setattr(Backtester, 'sweep_ma_crossover', staticmethod(record_sweep))
+        run(backtester)
+        run(backtester, ma_windows=MA_WINDOWS + [32])
+        assert swept_window_pairs == [[(4, 8), (4, 16), (8, 16)], [(4, 32), (8, 32), (16, 32)]]
+        results: DataFrame = backtester.result_store.query(pair=PAIR, indicator=Indicator.MA_CROSSOVER)
+        assert len(results) == 6
+        assert results['total_trades'].gt(0).all()
+
+    def test_results_are_recomputed_on_request(self, backtester, monkeypatch):
+        run(backtester)
+        saved = []
+        monkeypatch.setattr(backtester.result_store, 'save', lambda results: saved.append(list(results)))
+        run(backtester)
+        run(backtester, recompute=True)
+        assert [len(results) for results in saved] == [0, 3]
+
+    def test_parallel_run_matches_serial_run(self, backtester, monkeypatch):
+        saved_keys = []
+        save = backtester.result_store.save
+
+        def record_save(results):
+            results = list(results)
+            saved_keys.extend(key for key, _, _ in results)
+            save(results)
+        monkeypatch.setattr(backtester.result_store, 'save', record_save)
+        run(backtester, currencies=['EUR', 'GBP', 'USD'])
+        serial_results: DataFrame = backtester.result_store.query().drop(columns='created_at')
+        run(backtester, currencies=['EUR', 'GBP', 'USD'], workers=2, recompute=True)
+        parallel_results: DataFrame = backtester.result_store.query().drop(columns='created_at')
+        assert len(saved_keys) == 12
+        assert set(serial_results.index) == {PAIR, OTHER_PAIR}
+        pd.testing.assert_frame_equal(parallel_results.sort_values('result_key'), serial_results.sort_values('result_key'))
+
+    def test_inside_bar_momentum_results_depend_on_the_simulation_candles(self, backtester):
+        from src.app.Backtester import Backtester
+        from src.util.Utilities import get_downloaded_price_data_for_pair
+        inside_bar_backtester: Backtester = Backtester(indicator=Indicator.INSIDE_BAR_MOMENTUM, result_store=backtester.result_store)
+        candles: DataFrame = get_downloaded_price_data_for_pair(PAIR, Granularity.M5, pd.Timestamp('2024-06-03').to_pydatetime(),
+                                                                pd.Timestamp('2024-06-04 17:35').to_pydatetime())
+        changed_candles: DataFrame = candles.copy()
+        changed_candles.loc[10, 'bid_l'] -= 1e-4
+
+        def describe(simulation_candles: DataFrame):
+            return inside_bar_backtester.describe_results({PAIR: candles}, Granularity.M5, Granularity.M5, None, candles['time'].iloc[0],
+                                                          candles['time'].iloc[-1], {PAIR: simulation_candles})
+        assert list(describe(candles)) == list(describe(candles.copy()))
+        assert list(describe(changed_candles)) != list(describe(candles))
@@ -0,0 +1,43 @@
+from typing import List
+
+import numpy as np
+import pytest
+from pandas import DataFrame
+
+from src.model.Granularity import Granularity
+from src.model.Indicator import Indicator
+
+PAIRS: List[str] = ["EUR_USD", "GBP_USD"]
+NUMBER_OF_CANDLES: int = 240
+
+
+@pytest.fixture
+def historical_replay(data_folder, monkeypatch):
+    from src.app.HistoricalReplay import HistoricalReplay
+    from src.client.DataClient import DataClient
+    monkeypatch.setattr(DataClient, 'get_pip_location', staticmethod(lambda pair: -4.0))
+    return HistoricalReplay(PAIRS, Indicator.MA_CROSSOVER, Granularity.S30, 100, {'short_window': 2, 'long_window': 4})
+
+
+class TestHistoricalReplay:
+    def test_candles_are_split_into_quotes(self, create_candles):
+        from src.app.HistoricalReplay import HistoricalReplay
+        candles: DataFrame = create_candles([1.0, 1.1], freq='5s', half_spread=0.0001)
+        candles['mid_h'] = candles['mid_c'] + 0.05
+        candles['mid_l'] = candles['mid_c'] - 0.05
+        quotes = list(HistoricalReplay.candles_to_quotes(PAIRS[0], candles, Granularity.S5))
+        assert len(quotes) == 8
+        assert [quote.mid for _, quote in quotes[:4]] == pytest.approx([1.0, 0.95, 1.05, 1.0])
+        assert quotes[1][1].time - quotes[0][1].time == Granularity.S5.value / 4
+
+    def test_replay_runs_candles_through_the_live_pipeline(self, historical_replay, create_candles):
+        closes: np.ndarray = 1 + 0.01 * np.sin(np.linspace(0, 8 * np.pi, NUMBER_OF_CANDLES))
+        report = historical_replay.replay_candles({pair: create_candles(closes, freq='5s', half_spread=0.0001) for pair in PAIRS}, Granularity.S5)
+        assert report.number_of_quotes == 4 * NUMBER_OF_CANDLES * len(PAIRS)
+        # At most one S30 candle per six S5 candles, as candles only close on the first quote past their granularity.
+        assert 0 < report.number_of_candles <= NUMBER_OF_CANDLES // 6 * len(PAIRS)
+        assert report.number_of_orders > 0
+        assert report.latency['total']['count'] == report.number_of_candles
+        assert report.latency['order_acknowledged']['count'] == report.number_of_orders
+        assert set(report.realised_pl) == set(PAIRS)
+        assert report.candles_per_second > 0
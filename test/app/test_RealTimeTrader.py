@@ -0,0 +1,85 @@
+import time
+from types import SimpleNamespace
+from typing import List
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas import DataFrame
+
+from src.model.Granularity import Granularity
+from src.model.Indicator import Indicator
+from src.model.candle.Candle import Candle
+from src.util.CandleWireFormat import encode_candles
+
+PAIR: str = "EUR_USD"
+SHORT_WINDOW: int = 2
+LONG_WINDOW: int = 4
+INITIAL_CLOSES: List[float] = list(np.linspace(1.0, 0.9, 10))
+
+
+class FakeOrderEndpoint:
+    """
+    Local stand-in for the v20 order.market endpoint, acknowledging orders after a delay. Records the units of each order.
+    """
+    def __init__(self, latency_seconds: float = 0):
+        self.latency_seconds: float = latency_seconds
+        self.units: List[int] = []
+
+    def market(self, account_id: str, instrument: str, units: int, **_) -> SimpleNamespace:
+        time.sleep(self.latency_seconds)
+        self.units.append(units)
+        return SimpleNamespace(status=201, body={'orderFillTransaction': {'units': units}})
+
+
+@pytest.fixture
+def live_trader(data_folder, monkeypatch, create_candles):
+    from src.app.RealTimeTrader import LiveTrader
+    from src.client.DataClient import DataClient
+    monkeypatch.setattr(DataClient, 'get_pip_location', staticmethod(lambda pair: -4.0))
+    monkeypatch.setattr(LiveTrader, '_get_initial_price_data', lambda self: create_candles(INITIAL_CLOSES, freq='30s'))
+    live_trader = LiveTrader(PAIR, Indicator.MA_CROSSOVER, Granularity.S30, False, pd.Timestamp('2024-06-03').to_pydatetime(), 100,
+                             {'short_window': SHORT_WINDOW, 'long_window': LONG_WINDOW})
+    live_trader.order_client.api.order = FakeOrderEndpoint()
+    yield live_trader
+    live_trader.order_client.close()
+
+
+def consume(live_trader, candles: DataFrame) -> None:
+    for candle_values in candles.reindex(columns=Candle.columns()).itertuples(index=False, name=None):
+        content_type, body = encode_candles([Candle(*candle_values)])
+        live_trader.consume_candle(None, None, SimpleNamespace(headers=None, content_type=content_type), body)
+
+
+class TestLiveTrader:
+    def test_orders_are_only_placed_on_signals(self, live_trader, create_candles):
+        candles: DataFrame = create_candles(INITIAL_CLOSES + [1.0, 1.1, 1.1, 1.0, 0.8, 0.7], freq='30s')
+        consume(live_trader, candles.iloc[10:])
+        live_trader.order_client.wait_for_orders()
+        signals: List[int] = [signal for signal in live_trader.signal_generator.generate_signals_dataframe()['signal'] if signal]
+        assert signals == [1, -1]
+        assert live_trader.order_client.api.order.units == [100, -100]
+
+    def test_window_and_iterations_in_memory_are_bounded(self, live_trader, create_candles):
+        from src.app.RealTimeTrader import LIVE_WINDOW_SIZE
+        window_size: int = max(LIVE_WINDOW_SIZE, LONG_WINDOW)
+        consume(live_trader, create_candles(INITIAL_CLOSES + list(np.linspace(1, 2, window_size + 50)), freq='30s')[10:])
+        assert len(live_trader.candles) == window_size
+        assert live_trader.candles.latest().mid_c == 2
+        assert len(live_trader.signal_generator.queue) <= window_size
+        assert live_trader.signal_generator.queue[-1].candle.mid_c == 2
+
+    def test_repeated_candles_are_ignored(self, live_trader, create_candles):
+        candles: DataFrame = create_candles(INITIAL_CLOSES + [1.0], freq='30s')
+        consume(live_trader, candles.iloc[[10, 10]])
+        assert len(live_trader.signal_generator.queue) == 11
+
+    def test_consumption_does_not_wait_for_orders(self, live_trader, create_candles):
+        live_trader.order_client.api.order = FakeOrderEndpoint(latency_seconds=0.5)
+        candles: DataFrame = create_candles(INITIAL_CLOSES + [1.0, 1.1, 1.1, 1.0, 0.8, 0.7], freq='30s')
+        start_time: float = time.perf_counter()
+        consume(live_trader, candles.iloc[10:])
+        assert time.perf_counter() - start_time < 0.5
+        live_trader.order_client.wait_for_orders()
+        assert live_trader.order_client.api.order.units == [100, -100]
+        assert live_trader.get_latency_summary()['order_acknowledged']['p50_ms'] >= 500
@@ -0,0 +1,15 @@
+from types import SimpleNamespace
+
+import v20
+
+from src.client.ConnectionPool import mount_connection_pool
+
+
+class TestConnectionPool:
+    def test_pool_is_mounted_on_the_context_session(self):
+        api: v20.Context = v20.Context(hostname='localhost', port=8080, ssl=False)
+        assert mount_connection_pool(api, 8)
+        assert api._session.get_adapter('http://localhost:8080')._pool_maxsize == 8
+
+    def test_context_without_a_session_is_left_as_it_is(self):
+        assert not mount_connection_pool(SimpleNamespace(), 8)
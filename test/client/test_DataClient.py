@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+
+import pandas as pd
+import pytest
+
+from src.model.Granularity import Granularity
+
+PAIR: str = "EUR_USD"
+GRANULARITY: Granularity = Granularity.H1
+
+
+class FakeInstrumentEndpoint:
+    """
+    Local stand-in for the v20 instrument.candles endpoint. Serves one complete candle per granularity, and records each request.
+    """
+    def __init__(self, granularity: Granularity):
+        self.granularity_seconds: int = int(granularity.value.total_seconds())
+        self.requests: List[SimpleNamespace] = []
+
+    def _create_candle(self, timestamp: int) -> SimpleNamespace:
+        price: str = '{:.5f}'.format(1 + (timestamp % 86400) / 1e6)
+        prices = SimpleNamespace(o=price, h=price, l=price, c=price)
+        return SimpleNamespace(complete=True, time=str(timestamp), volume=1, mid=prices, bid=prices, ask=prices)
+
+    def candles(self, instrument: str, fromTime: float, granularity: str, price: str, count: int = None, toTime: float = None) -> SimpleNamespace:
+        self.requests.append(SimpleNamespace(instrument=instrument, fromTime=fromTime, toTime=toTime, granularity=granularity, price=price, count=count))
+        first_timestamp: int = -(-int(fromTime) // self.granularity_seconds) * self.granularity_seconds
+        if toTime is not None:
+            count = (int(toTime) - first_timestamp) // self.granularity_seconds + 1
+        candles = [self._create_candle(first_timestamp + index * self.granularity_seconds) for index in range(count)]
+        return SimpleNamespace(status=200, body={'candles': candles})
+
+
+class FakePricingEndpoint:
+    """
+    Local stand-in for the v20 pricing.get endpoint. Serves one price per requested instrument, and records each request.
+    """
+    def __init__(self):
+        self.requests: List[str] = []
+
+    def get(self, account_id: str, instruments: str) -> SimpleNamespace:
+        self.requests.append(instruments)
+        prices = [SimpleNamespace(instrument=instrument, time='1717372800.000000000', asks=[SimpleNamespace(price=1.2)], bids=[SimpleNamespace(price=1.0)])
+                  for instrument in instruments.split(',')]
+        return SimpleNamespace(status=200, body={'prices': prices})
+
+
+@pytest.fixture
+def data_client(data_folder):
+    from src.client.DataClient import DataClient
+    data_client = DataClient(live=False)
+    data_client.api.instrument = FakeInstrumentEndpoint(GRANULARITY)
+    yield data_client
+
+
+@pytest.fixture
+def concurrent_data_client(data_folder):
+    from src.client.DataClient import DataClient
+    data_client = DataClient(live=False, max_concurrent_requests=4)
+    data_client.api.instrument = FakeInstrumentEndpoint(Granularity.M1)
+    yield data_client
+
+
+class TestDataClient:
+    def test_incremental_download_fetches_only_missing_range(self, data_client):
+        from_time: datetime = datetime(2024, 6, 3)
+        candles = data_client.create_data_for_pair(PAIR, GRANULARITY, from_time, from_time + timedelta(days=2), incremental=True)
+        assert candles.shape[0] == 48
+        assert len(data_client.api.instrument.requests) == 1
+        # Extending the range by a day should only download the extra day.
+        candles = data_client.create_data_for_pair(PAIR, GRANULARITY, from_time, from_time + timedelta(days=3), incremental=True)
+        assert candles.shape[0] == 72
+        assert candles['time'].is_unique and candles['time'].is_monotonic_increasing
+        assert len(data_client.api.instrument.requests) == 2
+        assert data_client.api.instrument.requests[-1].count == 24
+
+    def test_incremental_download_skips_stored_range(self, data_client):
+        from_time: datetime = datetime(2024, 6, 3)
+        data_client.create_data_for_pair(PAIR, GRANULARITY, from_time, from_time + timedelta(days=3), incremental=True)
+        candles = data_client.create_data_for_pair(PAIR, GRANULARITY, from_time + timedelta(days=1), from_time + timedelta(days=2), incremental=True)
+        assert candles.shape[0] == 25
+        assert len(data_client.api.instrument.requests) == 1
+
+    def test_concurrent_download_stitches_pages_in_order(self, data_client, concurrent_data_client):
+        from_time: datetime = datetime(2024, 6, 3)
+        to_time: datetime = from_time + timedelta(days=10)
+        data_client.api.instrument = FakeInstrumentEndpoint(Granularity.M1)
+        candles = concurrent_data_client.get_candles_for_pair(PAIR, Granularity.M1, from_time, to_time)
+        assert len(concurrent_data_client.api.instrument.requests) == 3
+        assert candles.shape[0] == 14400
+        assert candles['time'].is_unique and candles['time'].is_monotonic_increasing
+        pd.testing.assert_frame_equal(candles, data_client.get_candles_for_pair(PAIR, Granularity.M1, from_time, to_time))
+
+    def test_prices_for_all_pairs_are_requested_at_once(self, data_client):
+        data_client.api.pricing = FakePricingEndpoint()
+        quotes = data_client.get_prices(["EUR_USD", "GBP_USD", "USD_JPY"])
+        assert len(data_client.api.pricing.requests) == 1
+        assert list(quotes) == ["EUR_USD", "GBP_USD", "USD_JPY"]
+        assert quotes["GBP_USD"].mid == pytest.approx(1.1)
+        assert quotes["GBP_USD"].time == datetime.fromtimestamp(1717372800)
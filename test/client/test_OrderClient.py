@@ -0,0 +1,89 @@
+import time
+from concurrent.futures import Future
+from typing import List
+
+import pytest
+
+from src.client.LocalOrderServer import LocalOrderServer
+
+PAIR: str = "EUR_USD"
+PAIRS: List[str] = ["EUR_USD", "GBP_USD", "USD_JPY", "AUD_USD"]
+LATENCY_SECONDS: float = 0.2
+
+
+@pytest.fixture
+def order_server():
+    server: LocalOrderServer = LocalOrderServer(LATENCY_SECONDS).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def order_client(project_root, order_server):
+    from src.client.OrderClient import OrderClient
+    order_client = OrderClient(live=False, hostname='localhost', port=order_server.port, ssl=False, max_concurrent_orders=2, max_queued_orders=2)
+    yield order_client
+    order_client.close()
+
+
+class TestOrderClient:
+    def test_submitted_orders_complete_with_fill_results(self, order_client):
+        completed_orders: List[Future] = []
+        start_time: float = time.perf_counter()
+        orders: List[Future] = [order_client.submit_market_order(PAIR, units, 'FOK', 1, on_complete=completed_orders.append) for units in (100, -100)]
+        assert time.perf_counter() - start_time < LATENCY_SECONDS
+        assert [order.result()['orderFillTransaction'].units for order in orders] == [100, -100]
+        order_client.wait_for_orders()
+        assert len(completed_orders) == 2
+
+    def test_waiting_for_orders_waits_for_their_callbacks(self, order_client):
+        completed_orders: List[Future] = []
+
+        def complete_slowly(order: Future) -> None:
+            time.sleep(LATENCY_SECONDS)
+            completed_orders.append(order)
+
+        for pair in PAIRS[:2]:
+            order_client.submit_market_order(pair, 100, 'FOK', 1, on_complete=complete_slowly)
+        order_client.wait_for_orders()
+        assert len(completed_orders) == 2
+
+    def test_orders_are_sent_concurrently_up_to_the_limit(self, order_client, order_server):
+        start_time: float = time.perf_counter()
+        for pair in PAIRS:
+            order_client.submit_market_order(pair, 100, 'FOK', 1)
+        order_client.wait_for_orders()
+        assert order_server.max_requests_in_flight == 2
+        assert time.perf_counter() - start_time < 3 * LATENCY_SECONDS
+
+    def test_warmed_up_connections_are_reused_by_orders(self, order_client, order_server):
+        order_client.warm_up()
+        assert order_server.number_of_connections == 2
+        for pair in PAIRS:
+            order_client.submit_market_order(pair, 100, 'FOK', 1)
+        order_client.wait_for_orders()
+        assert len(order_server.orders) == len(PAIRS)
+        assert order_server.number_of_connections == 2
+
+    def test_orders_for_the_same_pair_are_sent_in_submission_order(self, order_client, order_server):
+        order_server.latency_seconds = 0.01
+        for units in range(1, 5):
+            order_client.submit_market_order(PAIR, units, 'FOK', 1)
+        order_client.wait_for_orders()
+        assert order_server.max_requests_in_flight == 1
+        assert [int(order['units']) for order in order_server.orders] == [1, 2, 3, 4]
+
+    def test_submitting_beyond_the_queue_fails_without_blocking(self, order_client):
+        for _ in range(4):
+            order_client.submit_market_order(PAIR, 100, 'FOK', 1)
+        start_time: float = time.perf_counter()
+        with pytest.raises(RuntimeError):
+            order_client.submit_market_order(PAIR, 100, 'FOK', 1)
+        assert time.perf_counter() - start_time < LATENCY_SECONDS
+        order_client.wait_for_orders()
+        order_client.submit_market_order(PAIR, 100, 'FOK', 1).result()
+
+    def test_failed_orders_surface_through_the_future(self, order_client, order_server):
+        order_server.error_message = 'Insufficient margin'
+        with pytest.raises(Exception, match='Insufficient margin'):
+            order_client.submit_market_order(PAIR, 100, 'FOK', 1).result()
@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import List
+
+import pytest
+
+from src.client.PaperBroker import PaperBroker
+from src.model.Quote import Quote
+
+PAIR: str = "EUR_USD"
+
+
+@pytest.fixture
+def paper_broker() -> PaperBroker:
+    paper_broker: PaperBroker = PaperBroker()
+    paper_broker.update_quote(PAIR, Quote(time=datetime(2024, 6, 3), ask=1.1002, bid=1.1000, mid=1.1001))
+    return paper_broker
+
+
+class TestPaperBroker:
+    def test_buys_fill_at_the_ask_and_sells_at_the_bid(self, paper_broker):
+        assert paper_broker.place_market_order(PAIR, 100, 'FOK', 1)['orderFillTransaction']['price'] == 1.1002
+        assert paper_broker.place_market_order(PAIR, -300, 'FOK', 1)['orderFillTransaction']['price'] == 1.1000
+        assert paper_broker.positions[PAIR] == -200
+        assert paper_broker.average_prices[PAIR] == 1.1000
+
+    def test_pl_is_realised_when_positions_are_reduced(self, paper_broker):
+        paper_broker.place_market_order(PAIR, 100, 'FOK', 1)
+        paper_broker.update_quote(PAIR, Quote(time=datetime(2024, 6, 3, 0, 1), ask=1.1012, bid=1.1010, mid=1.1011))
+        paper_broker.place_market_order(PAIR, -100, 'FOK', 1)
+        assert paper_broker.positions[PAIR] == 0
+        assert paper_broker.realised_pl[PAIR] == pytest.approx(100 * (1.1010 - 1.1002))
+
+    def test_submitted_orders_complete_before_returning(self, paper_broker):
+        completed: List = []
+        future = paper_broker.submit_market_order(PAIR, 100, 'FOK', 1, on_complete=completed.append)
+        assert completed == [future]
+        assert future.result()['orderFillTransaction']['units'] == 100
+
+    def test_orders_fail_without_a_price(self, paper_broker):
+        with pytest.raises(ValueError):
+            paper_broker.submit_market_order("GBP_USD", 100, 'FOK', 1).result()
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import List, Tuple
+
+import pytest
+
+from src.client.ReplayPriceStreamServer import ReplayPriceStreamServer
+from src.model.Granularity import Granularity
+from src.model.Quote import Quote
+from src.service.CandleGenerator import CandleGenerator
+
+PAIR: str = "EUR_USD"
+
+
+def create_quotes(size: int) -> List[Quote]:
+    return [Quote(time=datetime(2024, 6, 3) + timedelta(seconds=index), ask=1.1 + index / 1e5 + 0.00005, bid=1.1 + index / 1e5 - 0.00005,
+                  mid=1.1 + index / 1e5) for index in range(size)]
+
+
+@pytest.fixture
+def replay_server(request):
+    quotes_per_connection: int | None = getattr(request, 'param', None)
+    server: ReplayPriceStreamServer = ReplayPriceStreamServer(PAIR, create_quotes(100), quotes_per_connection=quotes_per_connection).start()
+    yield server
+    server.stop()
+
+
+def create_price_stream_client(port: int, max_reconnect_attempts: int | None = None):
+    from src.client.PriceStreamClient import PriceStreamClient
+    return PriceStreamClient(live=False, hostname='localhost', port=port, ssl=False, initial_backoff_seconds=0.01,
+                             max_reconnect_attempts=max_reconnect_attempts)
+
+
+class TestPriceStreamClient:
+    def test_quotes_are_streamed_in_order(self, project_root, replay_server):
+        streamed_quotes: List[Tuple[str, Quote]] = list(islice(create_price_stream_client(replay_server.port).stream([PAIR]), 100))
+        assert [pair for pair, _ in streamed_quotes] == [PAIR] * 100
+        assert [quote for _, quote in streamed_quotes] == replay_server.quotes
+
+    @pytest.mark.parametrize('replay_server', [30], indirect=True)
+    def test_stream_reconnects_when_dropped(self, project_root, replay_server):
+        client = create_price_stream_client(replay_server.port)
+        streamed_quotes: List[Tuple[str, Quote]] = list(islice(client.stream([PAIR]), 100))
+        assert [quote.time for _, quote in streamed_quotes] == [quote.time for quote in replay_server.quotes]
+        assert replay_server.number_of_connections == 4
+        assert client.number_of_reconnections == 3
+
+    def test_stream_gives_up_after_max_reconnect_attempts(self, project_root, replay_server):
+        replay_server.stop()
+        with pytest.raises(ConnectionError):
+            next(create_price_stream_client(replay_server.port, max_reconnect_attempts=2).stream([PAIR]))
+
+    def test_streamed_quotes_generate_candles(self, project_root, replay_server):
+        candle_generator: CandleGenerator = CandleGenerator(PAIR, Granularity.S30)
+        candles = [candle_generator.generate(quote) for _, quote in islice(create_price_stream_client(replay_server.port).stream([PAIR]), 100)]
+        assert len([candle for candle in candles if candle]) == 3
@@ -0,0 +1,66 @@
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.typing import ArrayLike
+from pandas import DataFrame
+
+from src.model.candle.Price import CANDLES_DF_COLUMNS
+
+CREDENTIALS_TEMPLATE_FILE = '{}/../configuration/credentials_template.json'.format(os.path.dirname(__file__))
+
+
+@pytest.fixture(scope='session')
+def project_root(tmp_path_factory):
+    """
+    src.util.Constants expects to be imported from <project root>/src, with credentials in <project root>/configuration.
+    Creates such a project root in a temporary folder, so that modules depending on it can be tested without real credentials.
+    """
+    root = tmp_path_factory.mktemp('project') / 'fxbot'
+    (root / 'src').mkdir(parents=True)
+    (root / 'configuration').mkdir()
+    with open(CREDENTIALS_TEMPLATE_FILE) as template, open(root / 'configuration' / 'credentials.json', 'w') as credentials:
+        json.dump(json.load(template), credentials)
+    working_directory = os.getcwd()
+    os.chdir(root / 'src')
+    yield root
+    os.chdir(working_directory)
+
+
+@pytest.fixture
+def data_folder(project_root):
+    yield project_root / 'data'
+    shutil.rmtree(project_root / 'data', ignore_errors=True)
+
+
+def _create_candles(mid_closes: ArrayLike, start_time: datetime | str = '2024-06-03', freq: str = '5min', volume: ArrayLike = 1.0,
+                    half_spread: float = 0.0, column_step: float = 0.0) -> DataFrame:
+    """
+    :param mid_closes: The mid closing price of each candle. Opens, highs and lows are the same as the closes.
+    :param start_time: The time of the first candle.
+    :param freq: The time between candles.
+    :param volume: The volume of all candles, or of each candle.
+    :param half_spread: Added to the ask prices, and subtracted from the bid prices.
+    :param column_step: Added once more to each price column than to the one before it, in CANDLES_DF_COLUMNS order, so that
+    every column holds different values.
+    :return: Candles with all the columns in CANDLES_DF_COLUMNS.
+    """
+    mid_closes = np.asarray(mid_closes, dtype=np.float64)
+    candles: DataFrame = DataFrame({'time': pd.date_range(start_time, periods=len(mid_closes), freq=freq), 'volume': np.broadcast_to(volume, mid_closes.shape).astype(np.float64)})
+    for index, column in enumerate(CANDLES_DF_COLUMNS[2:]):
+        spread: float = half_spread if column.startswith('ask') else -half_spread if column.startswith('bid') else 0.0
+        candles[column] = mid_closes + spread + index * column_step
+    return candles
+
+
+@pytest.fixture
+def create_candles() -> Callable[..., DataFrame]:
+    """
+    Factory of candles DataFrames, shared by the tests that need candles.
+    """
+    return _create_candles
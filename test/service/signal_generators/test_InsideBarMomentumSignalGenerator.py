@@ -0,0 +1,62 @@
+import os
+from typing import Any, Dict
+
+import pandas as pd
+import pytest
+from pandas import DataFrame
+
+from src.model.Granularity import Granularity
+from src.model.candle.Candle import Candle
+from src.service.signal_generators.InsideBarMomentumSignalGenerator import InsideBarMomentumSignalGenerator
+from src.model.signal_generator_iterations.InsideBarMomentumIteration import InsideBarMomentumIteration
+
+CANDLE_DATA_FILE = '{}/candle_data.csv'.format(os.path.dirname(__file__))
+
+
+@pytest.fixture
+def signal_generator_params():
+    yield {
+        'pair': "EUR_USD",
+        'pip_location': -4,
+        'granularity': Granularity.H4,
+    }
+
+
+def create_candle(mid_o: float, mid_h: float, mid_l: float, mid_c: float) -> Candle:
+    return Candle(time="2024-01-01 00:00:00", volume=1, ask_o=mid_o, ask_h=mid_h, ask_l=mid_l, ask_c=mid_c, bid_o=mid_o, bid_h=mid_h, bid_l=mid_l,
+                  bid_c=mid_c, mid_o=mid_o, mid_h=mid_h, mid_l=mid_l, mid_c=mid_c)
+
+
+class TestInsideBarMomentumSignalGenerator:
+    def test_granularity_must_be_at_least_h4(self, signal_generator_params: Dict[str, Any]):
+        with pytest.raises(ValueError):
+            InsideBarMomentumSignalGenerator(**signal_generator_params | {'granularity': Granularity.H1})
+
+    def test_inside_bar_gives_signal_in_direction_of_previous_candle(self, signal_generator_params: Dict[str, Any]):
+        signal_generator = InsideBarMomentumSignalGenerator(**signal_generator_params)
+        previous_candle: Candle = create_candle(mid_o=1.0, mid_h=1.5, mid_l=0.5, mid_c=1.2)
+        candle: Candle = create_candle(mid_o=1.1, mid_h=1.3, mid_l=0.9, mid_c=1.2)
+        signal_generator.iterate(previous_candle)
+        signal_generator.iterate(candle)
+        assert signal_generator.queue[0].signal == 0
+        assert signal_generator.queue[-1] == InsideBarMomentumIteration(candle=candle, signal=1, range_prev=1.0, mid_h_prev=1.5, mid_l_prev=0.5,
+                                                                        direction_prev=1.0, entry_stop=1.6, stop_loss=1.1, take_profit=2.3)
+
+    def test_candle_outside_previous_range_gives_no_signal(self, signal_generator_params: Dict[str, Any]):
+        signal_generator = InsideBarMomentumSignalGenerator(**signal_generator_params)
+        signal_generator.iterate(create_candle(mid_o=1.2, mid_h=1.5, mid_l=0.5, mid_c=1.0))
+        signal_generator.iterate(create_candle(mid_o=1.1, mid_h=1.6, mid_l=0.9, mid_c=1.2))
+        assert signal_generator.queue[-1].signal == 0
+        assert signal_generator.queue[-1].direction_prev == -1.0
+
+    def test_vectorised_signals_match_iterative_signals(self, signal_generator_params: Dict[str, Any]):
+        candle_data: DataFrame = pd.read_csv(CANDLE_DATA_FILE)
+        iterative_generator = InsideBarMomentumSignalGenerator(**signal_generator_params)
+        iterative_generator.generate_signals_for_backtesting(candle_data, use_pips=True)
+        vectorised_generator = InsideBarMomentumSignalGenerator(**signal_generator_params)
+        vectorised_generator.generate_signals_for_backtesting(candle_data, use_pips=True, vectorised=True)
+        iterative_signals: DataFrame = iterative_generator.generate_signals_dataframe()
+        vectorised_signals: DataFrame = vectorised_generator.generate_signals_dataframe()
+        assert (vectorised_signals['signal'] == 1).any() and (vectorised_signals['signal'] == -1).any()
+        pd.testing.assert_frame_equal(vectorised_signals, iterative_signals)
+        assert vectorised_generator.queue[-1] == iterative_generator.queue[-1]
@@ -1,6 +1,7 @@
 import os
 from typing import Any, Dict, Tuple
 
+import numpy as np
 import pandas as pd
 import pytest
 from pandas import DataFrame
@@ -53,21 +54,21 @@ class TestMovingAverageCrossoverSignalGenerator:
                                    candle_data: Tuple[DataFrame, DataFrame]):
         initial_data, _ = candle_data
         signal_generator = MovingAverageCrossoverSignalGenerator(**signal_generator_params, initial_candles=None)
-        # Given that queues are empty and averages are zero
-        assert len(signal_generator.long_candles_queue) == 0
-        assert len(signal_generator.short_candles_queue) == 0
+        # Given that buffers are empty and averages are zero
+        assert len(signal_generator.long_closes) == 0
+        assert len(signal_generator.short_closes) == 0
         assert signal_generator.current_long_average == 0
         assert signal_generator.current_short_average == 0
         # When the next candle is retrieved and the generator is iterated
         candle: Candle = Candle.from_dict(initial_data.iloc[0])
         signal_generator.iterate(candle)
-        # Then the long candles queue and average should update.
-        assert len(signal_generator.long_candles_queue) == 1
-        assert signal_generator.long_candles_queue.pop() == candle
+        # Then the long closes buffer and average should update.
+        assert len(signal_generator.long_closes) == 1
+        assert signal_generator.long_closes.latest() == candle.mid_c
         assert signal_generator.current_long_average == candle.mid_c / signal_generator.long_window
-        # Then the short candles queue and average should update.
-        assert len(signal_generator.short_candles_queue) == 1
-        assert signal_generator.short_candles_queue.pop() == candle
+        # Then the short closes buffer and average should update.
+        assert len(signal_generator.short_closes) == 1
+        assert signal_generator.short_closes.latest() == candle.mid_c
         assert signal_generator.current_short_average == candle.mid_c / signal_generator.short_window
         # Then the SignalGeneratorIteration queue should update.
         iteration = MovingAverageCrossoverIteration(candle=candle,
@@ -80,12 +81,13 @@ class TestMovingAverageCrossoverSignalGenerator:
     def test_iterate_queue_when_full(self, signal_generator_params: Dict[str, Any],
                                      candle_data: Tuple[DataFrame, DataFrame]):
         initial_data, new_data = candle_data
+        historical_closes = pd.concat([initial_data, new_data])['mid_c']
         long_window = signal_generator_params['long_window']
         short_window = signal_generator_params['short_window']
         signal_generator = MovingAverageCrossoverSignalGenerator(**signal_generator_params, initial_candles=initial_data)
-        # Given that both queues are full and averages are not zero
-        assert len(signal_generator.long_candles_queue) == long_window
-        assert len(signal_generator.short_candles_queue) == short_window
+        # Given that both buffers are full and averages are not zero
+        assert len(signal_generator.long_closes) == long_window
+        assert len(signal_generator.short_closes) == short_window
         prev_long_average: float = signal_generator.current_long_average
         prev_short_average: float = signal_generator.current_short_average
         assert prev_long_average != 0
@@ -94,11 +96,12 @@ class TestMovingAverageCrossoverSignalGenerator:
         # When the next candle is retrieved and the generator is iterated
         candle: Candle = Candle.from_dict(new_data.iloc[0])
         signal_generator.iterate(candle)
-        # Then both queues and averages should update.
-        assert len(signal_generator.long_candles_queue) == long_window
-        assert len(signal_generator.short_candles_queue) == short_window
-        assert signal_generator.long_candles_queue.pop() == candle
-        assert signal_generator.short_candles_queue.pop() == candle
+        # Then both buffers and averages should update.
+        assert len(signal_generator.long_closes) == long_window
+        assert len(signal_generator.short_closes) == short_window
+        assert signal_generator.long_closes.latest() == candle.mid_c
+        assert signal_generator.short_closes.latest() == candle.mid_c
+        assert list(signal_generator.long_closes.to_array()) == list(historical_closes[1:long_window + 1])
         assert signal_generator.current_long_average == (prev_long_average
                                                          - (initial_data.iloc[0]['mid_c'] / long_window)
                                                          + (candle.mid_c / long_window))
@@ -119,3 +122,73 @@ class TestMovingAverageCrossoverSignalGenerator:
         signal_generator.generate_signals_for_backtesting(candle_data, use_pips=True)
         assert len(signal_generator.queue) == candle_data.shape[0]
         assert signal_generator.queue[-1].candle.time == candle_data.iloc[-1]['time']
+
+    def test_vectorised_signals_match_iterative_signals(self, signal_generator_params: Dict[str, Any]):
+        candle_data: DataFrame = pd.read_csv(CANDLE_DATA_FILE)
+        iterative_generator = MovingAverageCrossoverSignalGenerator(**signal_generator_params, initial_candles=None)
+        iterative_generator.generate_signals_for_backtesting(candle_data, use_pips=True)
+        vectorised_generator = MovingAverageCrossoverSignalGenerator(**signal_generator_params, initial_candles=None)
+        vectorised_generator.generate_signals_for_backtesting(candle_data, use_pips=True, vectorised=True)
+        iterative_signals: DataFrame = iterative_generator.generate_signals_dataframe()
+        vectorised_signals: DataFrame = vectorised_generator.generate_signals_dataframe()
+        assert (vectorised_signals['signal'] != 0).any()
+        pd.testing.assert_frame_equal(vectorised_signals, iterative_signals, check_dtype=False)
+
+    def test_bounded_history_spills_older_iterations_to_log(self, signal_generator_params: Dict[str, Any], tmp_path):
+        candle_data: DataFrame = pd.read_csv(CANDLE_DATA_FILE)
+        signal_generator = MovingAverageCrossoverSignalGenerator(**signal_generator_params, initial_candles=candle_data)
+        bounded_signal_generator = MovingAverageCrossoverSignalGenerator(**signal_generator_params, initial_candles=candle_data,
+                                                                         max_iterations_in_memory=100,
+                                                                         iteration_log_filename=str(tmp_path / 'iterations.log'))
+        assert bounded_signal_generator.queue.number_of_iterations == candle_data.shape[0]
+        assert len(bounded_signal_generator.queue) == len(list(bounded_signal_generator.queue)) == 100
+        assert bounded_signal_generator.queue[0] == list(bounded_signal_generator.queue)[0]
+        assert bounded_signal_generator.queue.size <= 200
+        assert bounded_signal_generator.queue[-1] == signal_generator.queue[-1]
+        pd.testing.assert_frame_equal(bounded_signal_generator.generate_signals_dataframe(), signal_generator.generate_signals_dataframe())
+        assert bounded_signal_generator.generate_signals_dataframe(full_history=False).shape[0] == 100
+
+    def test_history_bounded_below_the_long_window_generates_the_same_signals(self, signal_generator_params: Dict[str, Any], tmp_path):
+        candle_data: DataFrame = pd.read_csv(CANDLE_DATA_FILE)
+        signal_generator = MovingAverageCrossoverSignalGenerator(**signal_generator_params, initial_candles=candle_data)
+        bounded_signal_generator = MovingAverageCrossoverSignalGenerator(**signal_generator_params, initial_candles=candle_data,
+                                                                         max_iterations_in_memory=signal_generator_params['short_window'],
+                                                                         iteration_log_filename=str(tmp_path / 'iterations.log'))
+        signals: DataFrame = signal_generator.generate_signals_dataframe()
+        assert (signals['signal'] != 0).any()
+        pd.testing.assert_frame_equal(bounded_signal_generator.generate_signals_dataframe(), signals)
+
+    def test_signals_dataframe_is_not_changed_by_later_iterations(self, signal_generator_params: Dict[str, Any]):
+        candle_data: DataFrame = pd.read_csv(CANDLE_DATA_FILE)
+        signal_generator = MovingAverageCrossoverSignalGenerator(**signal_generator_params, initial_candles=candle_data.iloc[:10],
+                                                                 max_iterations_in_memory=3)
+        signals: DataFrame = signal_generator.generate_signals_dataframe(full_history=False)
+        expected_signals: DataFrame = signals.copy()
+        # Enough iterations for the bounded queue to move its latest iterations to the start of its arrays.
+        signal_generator.iterate_from_dataframe(candle_data.iloc[10:20])
+        pd.testing.assert_frame_equal(signals, expected_signals)
+        assert signals.iloc[-1]['short_average'] != signal_generator.queue[-1].short_average
+
+    def test_unbounded_signals_dataframe_is_built_from_views(self, signal_generator_params: Dict[str, Any]):
+        candle_data: DataFrame = pd.read_csv(CANDLE_DATA_FILE)
+        signal_generator = MovingAverageCrossoverSignalGenerator(**signal_generator_params, initial_candles=candle_data.iloc[:100])
+        signals: DataFrame = signal_generator.generate_signals_dataframe()
+        assert all(np.shares_memory(signals[field].to_numpy(), signal_generator.queue.columns[field]) for field in ('mid_c', 'signal', 'short_average'))
+        expected_signals: DataFrame = signals.copy()
+        # A popped row is only overwritten once it is no longer shared, and growing the arrays replaces them.
+        signal_generator.queue.pop()
+        signal_generator.queue.record(signal_generator.queue[-1].candle, 1, short_average=0, long_average=0)
+        signal_generator.iterate_from_dataframe(candle_data.iloc[100:1100])
+        pd.testing.assert_frame_equal(signals, expected_signals)
+
+    def test_column_dtypes_do_not_depend_on_the_first_iteration(self, signal_generator_params: Dict[str, Any]):
+        candle_data: DataFrame = pd.read_csv(CANDLE_DATA_FILE).iloc[:10]
+        candle_data['volume'] = candle_data['volume'].round().astype(np.int64)
+        signal_generator = MovingAverageCrossoverSignalGenerator(**signal_generator_params, initial_candles=candle_data)
+        candle_values: Dict[str, Any] = candle_data.iloc[-1].to_dict() | {'time': candle_data.iloc[-1]['time'] + '1', 'volume': None}
+        signal_generator.iterate(Candle(**{column: candle_values[column] for column in Candle.columns()}))
+        signal_generator.queue.record(signal_generator.queue[-1].candle, 0, short_average=1.5, long_average=1)
+        signals: DataFrame = signal_generator.generate_signals_dataframe()
+        assert signals['volume'].dtype == np.float64 and np.isnan(signals.iloc[-2]['volume'])
+        assert signals['signal'].dtype == np.int64
+        assert signals.iloc[-1]['short_average'] == 1.5
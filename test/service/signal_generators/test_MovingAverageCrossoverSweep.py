@@ -0,0 +1,51 @@
+import os
+from typing import Any, Dict
+
+import pandas as pd
+import pytest
+from pandas import DataFrame
+
+from src.model.Granularity import Granularity
+from src.service.signal_generators.MovingAverageCrossoverSignalGenerator import MovingAverageCrossoverSignalGenerator
+from src.service.signal_generators.MovingAverageCrossoverSweep import MovingAverageCrossoverSweep
+from src.util.IndicatorEvaluation import IndicatorEvaluation
+
+CANDLE_DATA_FILE = '{}/candle_data.csv'.format(os.path.dirname(__file__))
+
+
+@pytest.fixture
+def sweep_params():
+    yield {
+        'pair': "EUR_USD",
+        'pip_location': -4,
+        'granularity': Granularity.S5,
+        'ma_windows': [4, 16, 8, 64, 32]
+    }
+
+
+class TestMovingAverageCrossoverSweep:
+    def test_window_pairs_follow_window_combinations(self, sweep_params: Dict[str, Any]):
+        sweep = MovingAverageCrossoverSweep(**sweep_params)
+        assert sweep.window_pairs == [(4, 16), (4, 8), (4, 64), (4, 32), (16, 64), (16, 32), (8, 64), (8, 32)]
+
+    def test_sweep_signals_match_signal_generator(self, sweep_params: Dict[str, Any]):
+        candle_data: DataFrame = pd.read_csv(CANDLE_DATA_FILE)
+        sweep = MovingAverageCrossoverSweep(**sweep_params)
+        sweep.generate_signals_for_backtesting(candle_data)
+        for short_window, long_window in sweep.window_pairs:
+            signal_generator = MovingAverageCrossoverSignalGenerator(sweep_params['pair'], sweep_params['pip_location'], sweep_params['granularity'],
+                                                                     short_window, long_window)
+            signal_generator.generate_signals_for_backtesting(candle_data, use_pips=True)
+            pd.testing.assert_frame_equal(sweep.generate_signals_dataframe(short_window, long_window),
+                                          signal_generator.generate_signals_dataframe(), check_dtype=False)
+
+    def test_sweep_evaluation_matches_evaluating_each_window_pair(self, sweep_params: Dict[str, Any]):
+        candle_data: DataFrame = pd.read_csv(CANDLE_DATA_FILE, parse_dates=['time'])
+        sweep = MovingAverageCrossoverSweep(**sweep_params)
+        sweep.generate_signals_for_backtesting(candle_data)
+        evaluation: DataFrame = sweep.evaluate()
+        assert list(evaluation.index) == sweep.window_pairs
+        for window_pair, indicator_evaluation in sweep.evaluate_indicators().items():
+            expected = IndicatorEvaluation(sweep_params['pair'], sweep.generate_signals_dataframe(*window_pair), sweep_params['pip_location'])
+            assert vars(indicator_evaluation) == pytest.approx(dict(vars(expected), signals=None), nan_ok=True)
+            assert evaluation.loc[window_pair, 'total_gain'] == pytest.approx(expected.total_gain)
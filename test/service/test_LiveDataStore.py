@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Dict, List
+
+import pika
+import pytest
+
+from src.model.Granularity import Granularity
+from src.model.Quote import Quote
+
+PAIRS: List[str] = ["EUR_USD", "GBP_USD"]
+GRANULARITIES: List[Granularity] = [Granularity.S5, Granularity.S30]
+
+
+class FakeChannel:
+    """
+    Local stand-in for a RabbitMQ channel. Records the messages published to each queue.
+    """
+    def __init__(self):
+        self.queues: Dict[str, List[SimpleNamespace]] = {}
+
+    def queue_declare(self, queue: str):
+        self.queues[queue] = []
+
+    def basic_publish(self, exchange: str, routing_key: str, body: str, properties: pika.BasicProperties = None):
+        self.queues[routing_key].append(SimpleNamespace(body=body, properties=properties))
+
+
+class FakeConnection:
+    def __init__(self, _):
+        self.channels: List[FakeChannel] = []
+
+    def channel(self) -> FakeChannel:
+        self.channels.append(FakeChannel())
+        return self.channels[-1]
+
+
+class FakePriceStreamClient:
+    """
+    Local stand-in for the PriceStreamClient, streaming no prices. Records the account of each client created.
+    """
+    accounts: List[bool] = []
+
+    def __init__(self, live: bool):
+        self.accounts.append(live)
+
+    def stream(self, pairs: List[str]):
+        return iter(())
+
+
+@pytest.fixture
+def live_data_store(project_root, monkeypatch):
+    from src.service.LiveDataStore import LiveDataStore
+    monkeypatch.setattr(pika, 'BlockingConnection', FakeConnection)
+    yield LiveDataStore(PAIRS, GRANULARITIES, Granularity.S5)
+
+
+class TestLiveDataStore:
+    def test_candles_are_published_per_pair_and_granularity_over_one_channel(self, live_data_store):
+        from src.service.LiveDataStore import get_channel_name
+        for second in range(62):
+            for pair in PAIRS:
+                live_data_store.ingest_quotes([(pair, Quote(time=datetime(2024, 6, 3) + timedelta(seconds=second), ask=1.1, bid=1.1, mid=1.1))])
+        assert len(live_data_store.connection.channels) == 1
+        queues: Dict[str, List[SimpleNamespace]] = live_data_store.channel.queues
+        for pair in PAIRS:
+            assert len(queues[get_channel_name(pair, Granularity.S5)]) == 10
+            assert len(queues[get_channel_name(pair, Granularity.S30)]) == 2
+        assert set(queues[get_channel_name(PAIRS[0], Granularity.S5)][0].properties.headers) == {'candle_close', 'publish'}
+
+    def test_candles_completed_together_are_published_in_one_message(self, live_data_store):
+        from src.service.LiveDataStore import get_channel_name
+        from src.util.CandleWireFormat import decode_candles
+        quotes = [(PAIRS[0], Quote(time=datetime(2024, 6, 3) + timedelta(seconds=second), ask=1.1, bid=1.1, mid=1.1)) for second in range(18)]
+        live_data_store.ingest_quotes(quotes)
+        messages: List[SimpleNamespace] = live_data_store.channel.queues[get_channel_name(PAIRS[0], Granularity.S5)]
+        assert len(messages) == 1
+        assert len(decode_candles(messages[0].properties.content_type, messages[0].body)) == 3
+
+    @pytest.mark.parametrize('live', [True, False])
+    def test_polled_and_streamed_prices_come_from_the_same_account(self, project_root, monkeypatch, live: bool):
+        import src.service.LiveDataStore as LiveDataStoreModule
+        monkeypatch.setattr(pika, 'BlockingConnection', FakeConnection)
+        monkeypatch.setattr(LiveDataStoreModule, 'PriceStreamClient', FakePriceStreamClient)
+        monkeypatch.setattr(FakePriceStreamClient, 'accounts', [])
+        assert LiveDataStoreModule.LiveDataStore(PAIRS, GRANULARITIES, Granularity.S5, live=live).data_client.live == live
+        LiveDataStoreModule.LiveDataStore(PAIRS, GRANULARITIES, Granularity.S5, streaming=True, live=live).stream()
+        assert FakePriceStreamClient.accounts == [live]
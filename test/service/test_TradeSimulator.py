@@ -0,0 +1,65 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas import DataFrame
+
+from src.model.Trade import Trade
+from src.model.candle.Price import Price
+from src.service.TradeSimulator import TradeSimulator
+
+
+def create_random_closes(periods: int, seed: int) -> np.ndarray:
+    random: np.random.Generator = np.random.default_rng(seed)
+    return 1.1 + np.cumsum(random.normal(0, 0.0005, periods))
+
+
+def create_signals(candles: DataFrame, number_of_signals: int, seed: int) -> DataFrame:
+    random: np.random.Generator = np.random.default_rng(seed)
+    signal_candles: DataFrame = candles.iloc[np.sort(random.choice(len(candles), number_of_signals, replace=False))]
+    signal: np.ndarray = random.choice([-1, 1], number_of_signals)
+    prices: np.ndarray = ((signal_candles[Price.ASK_CLOSE.value] + signal_candles[Price.BID_CLOSE.value]) / 2).to_numpy()
+    return DataFrame({'time': signal_candles['time'].to_numpy(),
+                      'signal': signal,
+                      'entry_stop': prices + signal * 0.001,
+                      'stop_loss': prices - signal * 0.002,
+                      'take_profit': prices + signal * 0.004})
+
+
+def simulate_with_trades(candles: DataFrame, signals: DataFrame) -> List[Dict]:
+    """
+    Updates a Trade candle by candle, replacing it on each signal.
+    """
+    signals_by_time: Dict = {row['time']: row for _, row in signals.iterrows()}
+    trades: List[Trade] = []
+    replaced_trades: List[Trade] = []
+    for _, candle in candles.iterrows():
+        if trades:
+            trades[-1].update(candle)
+        if candle['time'] in signals_by_time:
+            if trades and trades[-1].is_open():
+                trades[-1].close_trade(candle)
+                replaced_trades.append(trades[-1])
+            trades.append(Trade(signals_by_time[candle['time']]))
+    return [{'entry_time': trade.entry_time, 'entry_price': trade.entry_price, 'exit_time': trade.exit_time, 'exit_price': trade.exit_price,
+             'trade_closed': trade.exit_time is not None and trade not in replaced_trades} for trade in trades]
+
+
+class TestTradeSimulator:
+    @pytest.mark.parametrize('seed', [0, 1, 2])
+    def test_simulated_trades_match_trade_updates(self, seed: int, create_candles):
+        candles: DataFrame = create_candles(create_random_closes(3000, seed), start_time='2024-01-01', half_spread=0.0001)
+        signals: DataFrame = create_signals(candles, 60, seed)
+        simulated_trades: DataFrame = TradeSimulator(candles).simulate(signals)
+        expected_trades: DataFrame = DataFrame(simulate_with_trades(candles, signals))
+        assert simulated_trades['trade_closed'].any() and not simulated_trades['trade_closed'].all()
+        pd.testing.assert_frame_equal(simulated_trades[expected_trades.columns], expected_trades, check_dtype=False)
+        pd.testing.assert_frame_equal(simulated_trades[signals.columns], signals)
+
+    def test_signals_without_candles_are_never_entered(self, create_candles):
+        candles: DataFrame = create_candles(create_random_closes(10, 0), start_time='2024-01-01', half_spread=0.0001)
+        signals: DataFrame = create_signals(candles, 1, 0).assign(time=candles['time'].iloc[-1] + np.timedelta64(1, 'h'))
+        simulated_trades: DataFrame = TradeSimulator(candles).simulate(signals)
+        assert simulated_trades['entry_time'].isna().all()
+        assert not simulated_trades['trade_closed'].any()
@@ -0,0 +1,63 @@
+import time
+from types import SimpleNamespace
+from typing import List
+
+import pandas as pd
+import pytest
+from pandas import DataFrame
+
+from src.util.CandleDecoding import decode_candles, decoded_candles_to_dataframe
+
+
+def create_v20_candles(count: int, start_time: int = 1717372800, seconds_per_candle: int = 5) -> List[SimpleNamespace]:
+    candles: List[SimpleNamespace] = []
+    for index in range(count):
+        prices = [SimpleNamespace(o='1.1{:04d}'.format(index + offset), h='1.1{:04d}'.format(index + offset + 5),
+                                  l='1.1{:04d}'.format(index + offset + 1), c='1.1{:04d}'.format(index + offset + 3)) for offset in range(3)]
+        candles.append(SimpleNamespace(complete=index != count - 1, time='{}.000000000'.format(start_time + index * seconds_per_candle), volume=index,
+                                       mid=prices[0], bid=prices[1], ask=prices[2]))
+    return candles
+
+
+@pytest.fixture
+def time_zone(request, monkeypatch):
+    """
+    Sets the local time zone of the process for the duration of a test.
+    """
+    monkeypatch.setenv('TZ', request.param)
+    time.tzset()
+    yield request.param
+    monkeypatch.undo()
+    time.tzset()
+
+
+class TestCandleDecoding:
+    def test_decoded_candles_match_prepared_candles(self, project_root):
+        from src.util.Utilities import prepare_candle
+        candles: List[SimpleNamespace] = create_v20_candles(100)
+        prepared_candles: DataFrame = DataFrame([prepare_candle(vars(candle)) for candle in candles if candle.complete])
+        pd.testing.assert_frame_equal(decoded_candles_to_dataframe(decode_candles(candles)), prepared_candles, check_exact=True)
+
+    @pytest.mark.parametrize('time_zone, start_time', [
+        # Clocks go forward, and back, at 01:00 UTC.
+        ('Europe/London', pd.Timestamp('2024-03-31 00:00', tz='UTC').timestamp()),
+        ('Europe/London', pd.Timestamp('2024-10-27 00:00', tz='UTC').timestamp()),
+        # Offsets of a half hour, and of a half hour with clocks going forward at 05:30 UTC.
+        ('Asia/Kolkata', pd.Timestamp('2024-06-03 00:00', tz='UTC').timestamp()),
+        ('America/St_Johns', pd.Timestamp('2024-03-10 04:00', tz='UTC').timestamp()),
+    ], indirect=['time_zone'], ids=['london_clocks_forward', 'london_clocks_back', 'kolkata', 'st_johns_clocks_forward'])
+    def test_decoded_candles_match_prepared_candles_in_time_zone(self, project_root, time_zone, start_time):
+        from src.util.Utilities import prepare_candle
+        candles: List[SimpleNamespace] = create_v20_candles(50, int(start_time), seconds_per_candle=5 * 60)
+        prepared_candles: DataFrame = DataFrame([prepare_candle(vars(candle)) for candle in candles if candle.complete])
+        pd.testing.assert_frame_equal(decoded_candles_to_dataframe(decode_candles(candles)), prepared_candles, check_exact=True)
+
+    def test_decode_candles_returns_typed_columns(self):
+        columns = decode_candles(create_v20_candles(10))
+        assert columns['time'].dtype == 'int64'
+        assert columns['time'][1] - columns['time'][0] == 5 * 10 ** 9
+        assert all(column.dtype == 'float64' for name, column in columns.items() if name != 'time')
+        assert all(column.shape == (9,) for column in columns.values())
+
+    def test_decode_empty_page(self):
+        assert decoded_candles_to_dataframe(decode_candles([])).empty
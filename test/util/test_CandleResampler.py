@@ -0,0 +1,88 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas import DataFrame
+
+from src.model.Granularity import Granularity
+from src.model.candle.Price import CANDLES_DF_COLUMNS
+from src.util.CandleDecoding import to_epoch_time, to_local_time
+from src.util.CandleResampler import CandleResampler
+from src.util.CandleStore import CandleStore
+
+PAIR: str = "EUR_USD"
+
+
+def create_m5_candles(from_time: str, periods: int) -> DataFrame:
+    """
+    :param from_time: UTC start time.
+    """
+    random: np.random.Generator = np.random.default_rng(0)
+    epoch_times: np.ndarray = pd.date_range(from_time, periods=periods, freq='5min').asi8
+    candles: DataFrame = DataFrame({'time': to_local_time(epoch_times), 'volume': random.integers(1, 100, periods).astype(np.float64)})
+    for column in CANDLES_DF_COLUMNS[2:]:
+        candles[column] = 1.1 + random.normal(0, 0.001, periods)
+    return candles
+
+
+def get_utc_times(candles: DataFrame) -> pd.DatetimeIndex:
+    return pd.DatetimeIndex(to_epoch_time(candles['time'].to_numpy(dtype='datetime64[ns]')).view('datetime64[ns]'))
+
+
+class TestCandleResampler:
+    def test_resampled_prices_are_aggregated_per_candle(self):
+        candles: DataFrame = create_m5_candles('2024-01-08 00:00', 24)
+        resampled_candles: DataFrame = CandleResampler.resample(candles, Granularity.H1)
+        assert resampled_candles.shape[0] == 2
+        first_hour: DataFrame = candles.iloc[:12]
+        assert resampled_candles['time'].iloc[0] == first_hour['time'].iloc[0]
+        assert resampled_candles['bid_o'].iloc[0] == first_hour['bid_o'].iloc[0]
+        assert resampled_candles['ask_h'].iloc[0] == first_hour['ask_h'].max()
+        assert resampled_candles['mid_l'].iloc[0] == first_hour['mid_l'].min()
+        assert resampled_candles['mid_c'].iloc[0] == first_hour['mid_c'].iloc[-1]
+        assert resampled_candles['volume'].iloc[0] == first_hour['volume'].sum()
+
+    @pytest.mark.parametrize('from_time, first_hour', [('2024-01-08 00:00', 2), ('2024-07-08 00:00', 1)])
+    def test_h4_candles_start_at_17_new_york_time(self, from_time: str, first_hour: int):
+        resampled_candles: DataFrame = CandleResampler.resample(create_m5_candles(from_time, 12 * 24), Granularity.H4)
+        utc_times: pd.DatetimeIndex = get_utc_times(resampled_candles)
+        assert (utc_times.minute == 0).all()
+        assert (utc_times.hour % 4 == first_hour).all()
+
+    def test_daily_and_weekly_candles_start_at_17_new_york_time(self):
+        candles: DataFrame = create_m5_candles('2024-01-01 00:00', 12 * 24 * 21)
+        daily_times: pd.DatetimeIndex = get_utc_times(CandleResampler.resample(candles, Granularity.D))
+        assert (daily_times[1:].hour == 22).all()
+        weekly_times: pd.DatetimeIndex = get_utc_times(CandleResampler.resample(candles, Granularity.W))
+        assert (weekly_times.hour == 22).all() and (weekly_times.dayofweek == 4).all()
+
+    def test_incomplete_candles_at_the_edges_are_dropped(self):
+        candles: DataFrame = create_m5_candles('2024-01-08 00:30', 12 * 3)
+        resampled_candles: DataFrame = CandleResampler.resample(candles, Granularity.H1, candles['time'].iloc[0], candles['time'].iloc[-1])
+        assert list(get_utc_times(resampled_candles).hour) == [1, 2]
+
+    def test_resampling_in_steps_matches_resampling_directly(self):
+        candles: DataFrame = create_m5_candles('2024-03-01 00:00', 12 * 24 * 20)
+        hourly_candles: DataFrame = CandleResampler.resample(candles, Granularity.H1)
+        pd.testing.assert_frame_equal(CandleResampler.resample(hourly_candles, Granularity.H4), CandleResampler.resample(candles, Granularity.H4))
+
+    def test_resampled_candles_are_cached_in_the_store(self, tmp_path):
+        candle_store: CandleStore = CandleStore(str(tmp_path))
+        candles: DataFrame = create_m5_candles('2024-01-08 00:00', 12 * 24 * 2)
+        from_time: datetime = candles['time'].iloc[0].to_pydatetime()
+        to_time: datetime = from_time + Granularity.D.value * 2
+        candle_store.append(PAIR, Granularity.M5, candles, from_time, to_time)
+        resampler: CandleResampler = CandleResampler(candle_store)
+        assert not candle_store.get_coverage(PAIR, Granularity.H4)
+        resampled_candles: DataFrame = resampler.get_candles(PAIR, Granularity.H4, from_time, to_time)
+        assert not resampled_candles.empty
+        assert candle_store.get_coverage(PAIR, Granularity.H4)
+        pd.testing.assert_frame_equal(candle_store.read(PAIR, Granularity.H4, from_time, to_time), resampled_candles, check_dtype=False)
+        assert resampler.get_candles(PAIR, Granularity.H4, datetime(2023, 1, 1), to_time) is None
+
+    def test_only_nested_granularities_can_be_resampled(self):
+        assert CandleResampler.can_resample(Granularity.M5, Granularity.H4)
+        assert CandleResampler.can_resample(Granularity.H4, Granularity.W)
+        assert not CandleResampler.can_resample(Granularity.H3, Granularity.H4)
+        assert not CandleResampler.can_resample(Granularity.H4, Granularity.H1)
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas import DataFrame
+
+from src.model.Granularity import Granularity
+from src.model.candle.Price import CANDLES_DF_COLUMNS
+from src.util.CandleStore import CandleStore
+
+PAIR: str = "EUR_USD"
+
+
+@pytest.fixture
+def candle_store(tmp_path):
+    yield CandleStore(str(tmp_path))
+
+
+@pytest.fixture
+def create_daily_candles(create_candles):
+    return lambda from_time, periods: create_candles(np.arange(periods) + 1, start_time=from_time, freq='D', volume=np.arange(periods), column_step=1)
+
+
+class TestCandleStore:
+    def test_candles_are_partitioned_by_month(self, candle_store: CandleStore, create_daily_candles, tmp_path):
+        candle_store.append(PAIR, Granularity.D, create_daily_candles(datetime(2024, 1, 20), 20), datetime(2024, 1, 20), datetime(2024, 2, 8))
+        assert sorted(path.name for path in (tmp_path / PAIR / Granularity.D.name).glob('*.npz')) == ['2024-01.npz', '2024-02.npz']
+
+    def test_read_returns_candles_in_range(self, candle_store: CandleStore, create_daily_candles):
+        candles: DataFrame = create_daily_candles(datetime(2024, 1, 20), 20)
+        candle_store.append(PAIR, Granularity.D, candles, datetime(2024, 1, 20), datetime(2024, 2, 8))
+        stored_candles: DataFrame = candle_store.read(PAIR, Granularity.D, datetime(2024, 1, 25), datetime(2024, 2, 3))
+        assert list(stored_candles.columns) == CANDLES_DF_COLUMNS
+        pd.testing.assert_frame_equal(stored_candles, candles.iloc[5:15].reset_index(drop=True), check_dtype=False)
+
+    def test_append_merges_with_stored_candles(self, candle_store: CandleStore, create_daily_candles):
+        candle_store.append(PAIR, Granularity.D, create_daily_candles(datetime(2024, 1, 1), 10), datetime(2024, 1, 1), datetime(2024, 1, 10))
+        candle_store.append(PAIR, Granularity.D, create_daily_candles(datetime(2024, 1, 5), 10), datetime(2024, 1, 5), datetime(2024, 1, 14))
+        stored_candles: DataFrame = candle_store.read(PAIR, Granularity.D, datetime(2024, 1, 1), datetime(2024, 1, 31))
+        assert stored_candles.shape[0] == 14
+        assert stored_candles['time'].is_monotonic_increasing
+        assert stored_candles.iloc[4]['volume'] == 0
+
+    def test_coverage_is_merged(self, candle_store: CandleStore, create_daily_candles):
+        candle_store.append(PAIR, Granularity.D, create_daily_candles(datetime(2024, 1, 1), 10), datetime(2024, 1, 1), datetime(2024, 1, 10))
+        candle_store.append(PAIR, Granularity.D, create_daily_candles(datetime(2024, 1, 5), 10), datetime(2024, 1, 5), datetime(2024, 1, 14))
+        assert candle_store.get_coverage(PAIR, Granularity.D) == [(datetime(2024, 1, 1), datetime(2024, 1, 14))]
+        assert candle_store.covers(PAIR, Granularity.D, datetime(2024, 1, 2), datetime(2024, 1, 13))
+        assert not candle_store.covers(PAIR, Granularity.D, datetime(2024, 1, 2), datetime(2024, 1, 15))
@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import List
+
+import numpy as np
+import pytest
+from pandas import DataFrame
+
+from src.model.candle.Candle import Candle, CANDLE_STRUCT
+from src.util.CandleWireFormat import BINARY_CONTENT_TYPE, decode_candles, encode_candles, FRAME_HEADER_STRUCT, JSON_CONTENT_TYPE
+
+
+@pytest.fixture
+def create_candle_list(create_candles):
+    """
+    Factory of Candle lists, with a different value in each column.
+    """
+    def create(size: int) -> List[Candle]:
+        candles: DataFrame = create_candles(1.1 + np.arange(size) / 1e5, freq='30s', volume=10.0 + np.arange(size), column_step=1e-6)
+        return [Candle(*candle_values) for candle_values in candles.reindex(columns=Candle.columns()).itertuples(index=False, name=None)]
+    return create
+
+
+class TestCandleWireFormat:
+    @pytest.mark.parametrize('wire_format', ['binary', 'json'])
+    @pytest.mark.parametrize('size', [1, 5])
+    def test_candles_are_decoded_as_encoded(self, create_candle_list, wire_format: str, size: int):
+        candles: List[Candle] = create_candle_list(size)
+        assert decode_candles(*encode_candles(candles, wire_format)) == candles
+
+    def test_binary_frame_is_fixed_size(self, create_candle_list):
+        content_type, body = encode_candles(create_candle_list(5))
+        assert content_type == BINARY_CONTENT_TYPE
+        assert len(body) == FRAME_HEADER_STRUCT.size + 5 * CANDLE_STRUCT.size
+
+    def test_missing_values_survive_the_binary_format(self):
+        candle: Candle = Candle(datetime(2024, 6, 3), mid_o=1.1, mid_h=1.2, mid_l=1.0, mid_c=1.15)
+        assert Candle.from_bytes(candle.to_bytes()) == candle
+
+    def test_messages_without_a_content_type_fall_back_to_json(self, create_candle_list):
+        candle: Candle = create_candle_list(1)[0]
+        assert decode_candles(None, candle.serialise()) == [candle]
+        assert decode_candles(JSON_CONTENT_TYPE, encode_candles([candle], 'json')[1]) == [candle]
+
+    def test_unsupported_versions_are_rejected(self, create_candle_list):
+        _, body = encode_candles(create_candle_list(1))
+        with pytest.raises(ValueError):
+            decode_candles(BINARY_CONTENT_TYPE, FRAME_HEADER_STRUCT.pack(99, 1) + body[FRAME_HEADER_STRUCT.size:])
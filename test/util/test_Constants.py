@@ -0,0 +1,26 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_FOLDER: str = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestConstants:
+    @pytest.mark.parametrize('entry_point', ['src.real_time_trading_main', 'src.backtesting_main'])
+    def test_entry_points_import_without_credentials_or_plotting_libraries(self, tmp_path, entry_point: str):
+        script: str = ("import importlib, json, sys; importlib.import_module('{}'); "
+                       "print(json.dumps([module for module in ('plotly', 'seaborn', 'matplotlib') if module in sys.modules]))").format(entry_point)
+        process = subprocess.run([sys.executable, '-c', script], cwd=tmp_path, env=dict(os.environ, PYTHONPATH=PROJECT_FOLDER), capture_output=True, text=True)
+        assert process.returncode == 0, process.stderr
+        assert json.loads(process.stdout.splitlines()[-1]) == []
+
+    def test_credentials_are_read_on_first_use(self, project_root):
+        import src.util.Constants as Constants
+        with open(project_root / 'configuration' / 'credentials.json') as credentials_file:
+            credentials = json.load(credentials_file)
+        assert Constants.get_api_key(live=False) == credentials['OANDA_DEMO_API_KEY']
+        assert Constants.OANDA_LIVE_ACCOUNT_ID == credentials['OANDA_LIVE_ACCOUNT_ID']
+        assert Constants.INSTRUMENTS_FILENAME == '{}/data/instruments.pkl'.format(project_root)
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas import DataFrame
+
+import src.util.IndicatorEvaluation as IndicatorEvaluationModule
+from src.util.IndicatorEvaluation import IndicatorEvaluation, METRICS, evaluate_signal_matrix
+
+
+def create_signals(closes, signals) -> DataFrame:
+    return DataFrame({'time': pd.date_range('2024-06-03', periods=len(closes), freq='30s'), 'mid_c': closes, 'signal': signals})
+
+
+class TestIndicatorEvaluation:
+    def test_signals_are_evaluated_as_positions_held_until_the_next_signal(self):
+        evaluation = IndicatorEvaluation("EUR_USD", create_signals([1.0, 1.1, 1.3, 1.2, 1.0, 1.1], [0, 1, 0, -1, 0, 0]))
+        assert (evaluation.num_longs, evaluation.num_shorts, evaluation.total_trades) == (1, 1, 2)
+        # Long from 1.1 to 1.2, then short from 1.2 to 1.1.
+        assert evaluation.total_gain == pytest.approx(0.2)
+        assert (evaluation.min_gain, evaluation.mean_gain, evaluation.max_gain) == pytest.approx((0.1, 0.1, 0.1))
+        assert evaluation.buy_hold_returns == pytest.approx(0.1)
+        assert evaluation.max_drawdown == pytest.approx(0.1)
+        assert evaluation.profit_to_drawdown == pytest.approx(2)
+        assert np.isnan(evaluation.sharpe_ratio)
+        assert evaluation.time_in_market == 2
+
+    def test_gains_are_expressed_in_pips(self):
+        evaluation = IndicatorEvaluation("EUR_USD", create_signals([1.0, 1.0, 1.001], [0, 1, 0]), pip_location=-4)
+        assert evaluation.total_gain == pytest.approx(10)
+
+    def test_trades_are_evaluated_from_their_gains(self):
+        trades = DataFrame({'signal': [1, -1, 1], 'gain': [10.0, -5.0, 20.0], 'duration': [60.0, 30.0, 90.0]})
+        evaluation = IndicatorEvaluation("EUR_USD", trades, risk_free_rate=1.0)
+        assert (evaluation.total_gain, evaluation.min_gain, evaluation.max_gain) == (25, -5, 20)
+        assert evaluation.max_drawdown == 5
+        assert evaluation.profit_to_drawdown == 5
+        assert evaluation.sharpe_ratio == pytest.approx((25 / 3 - 1) / np.std([10, -5, 20]))
+        assert evaluation.time_in_market == 180
+
+    def test_evaluations_without_trades_are_undefined(self):
+        evaluation = IndicatorEvaluation("EUR_USD", create_signals([1.0, 1.1, 1.2], [0, 0, 0]))
+        assert evaluation.total_trades == 0
+        assert evaluation.total_gain == 0
+        assert np.isnan(evaluation.mean_gain) and np.isnan(evaluation.min_gain) and np.isnan(evaluation.profit_to_drawdown)
+
+    def test_signal_matrix_matches_evaluating_each_variant(self, monkeypatch):
+        random = np.random.default_rng(0)
+        closes = 1 + np.cumsum(random.normal(0, 0.001, 500))
+        signal_matrix = random.choice([-1, 0, 0, 0, 1], size=(7, 500))
+        times = pd.date_range('2024-06-03', periods=500, freq='5min').to_numpy()
+        # Evaluate the variants in chunks of two.
+        monkeypatch.setattr(IndicatorEvaluationModule, 'MAX_CANDLES_PER_CHUNK', 1000)
+        metrics = evaluate_signal_matrix(signal_matrix, closes, times, pip_location=-4)
+        for row, signals in enumerate(signal_matrix):
+            evaluation = IndicatorEvaluation("EUR_USD", DataFrame({'time': times, 'mid_c': closes, 'signal': signals}), pip_location=-4)
+            for metric in METRICS:
+                assert metrics[metric][row] == pytest.approx(getattr(evaluation, metric), nan_ok=True)
@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from pandas import DataFrame
+
+INSTRUMENTS: DataFrame = DataFrame({'name': ['EUR_USD', 'USD_JPY'], 'pipLocation': [-4, -2], 'displayPrecision': [5, 3], 'marginRate': ['0.02', '0.04']})
+
+
+@pytest.fixture
+def instruments_filename(data_folder):
+    data_folder.mkdir(exist_ok=True)
+    instruments_filename = str(data_folder / 'instruments.pkl')
+    INSTRUMENTS.to_pickle(instruments_filename)
+    yield instruments_filename
+
+
+class TestInstrumentRegistry:
+    def test_instruments_are_read_once_on_first_lookup(self, instruments_filename, monkeypatch):
+        from src.util.InstrumentRegistry import InstrumentRegistry
+        instrument_registry: InstrumentRegistry = InstrumentRegistry(instruments_filename)
+        assert instrument_registry.instruments is None
+        assert instrument_registry.get_pip_location('USD_JPY') == -2
+        monkeypatch.setattr(pd, 'read_pickle', lambda _: pytest.fail("The instruments file was read again."))
+        assert instrument_registry.get_pip_location('EUR_USD') == -4
+        assert instrument_registry.get_display_precision('EUR_USD') == 5
+        assert instrument_registry.get_instrument('USD_JPY')['marginRate'] == '0.04'
+
+    def test_pairs_are_validated(self, instruments_filename):
+        from src.util.InstrumentRegistry import InstrumentRegistry
+        instrument_registry: InstrumentRegistry = InstrumentRegistry(instruments_filename)
+        assert instrument_registry.is_valid_pair('EUR_USD')
+        assert not instrument_registry.is_valid_pair('USD_EUR')
+        assert instrument_registry.get_pairs() == ['EUR_USD', 'USD_JPY']
+        with pytest.raises(ValueError):
+            instrument_registry.get_pip_location('USD_EUR')
+
+    def test_refresh_retrieves_the_instruments_again(self, instruments_filename):
+        from src.util.InstrumentRegistry import InstrumentRegistry
+        instrument_registry: InstrumentRegistry = InstrumentRegistry(instruments_filename)
+        assert not instrument_registry.is_valid_pair('GBP_USD')
+        data_client = SimpleNamespace(get_instruments_and_save_to_file=lambda: DataFrame({'name': ['GBP_USD'], 'pipLocation': [-4]}))
+        instrument_registry.refresh(data_client)
+        assert instrument_registry.get_pairs() == ['GBP_USD']
+
+    def test_missing_instruments_file_is_reported(self, data_folder):
+        from src.util.InstrumentRegistry import InstrumentRegistry
+        with pytest.raises(IOError):
+            InstrumentRegistry(str(data_folder / 'instruments.pkl')).is_valid_pair('EUR_USD')
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from src.util.LatencyHistogram import LatencyHistogram, RELATIVE_RESOLUTION
+from src.util.LatencyTracker import CANDLE_CLOSE, CONSUME, LatencyTracker, ORDER_ACKNOWLEDGED, ORDER_SENT, PUBLISH, SIGNAL, TOTAL
+
+MILLISECOND: int = 1_000_000
+
+
+class TestLatencyHistogram:
+    def test_percentiles_are_within_the_resolution(self):
+        latencies: np.ndarray = np.random.default_rng(0).lognormal(-6, 1, 10000)
+        histogram: LatencyHistogram = LatencyHistogram()
+        for latency in latencies:
+            histogram.record(latency)
+        for percentile in (50, 99):
+            assert histogram.get_percentile(percentile) == pytest.approx(np.percentile(latencies, percentile), rel=RELATIVE_RESOLUTION * 2)
+        assert histogram.summarise()['max_ms'] == pytest.approx(latencies.max() * 1e3)
+
+    def test_empty_histogram_has_no_percentiles(self):
+        with pytest.raises(ValueError):
+            LatencyHistogram().get_percentile(50)
+
+
+class TestLatencyTracker:
+    def test_latencies_are_measured_from_the_previous_stage(self):
+        tracker: LatencyTracker = LatencyTracker('EUR_USD', log_interval_seconds=None)
+        tracker.record({CANDLE_CLOSE: 0, PUBLISH: 100 * MILLISECOND, CONSUME: 102 * MILLISECOND, SIGNAL: 103 * MILLISECOND,
+                        ORDER_SENT: 103 * MILLISECOND, ORDER_ACKNOWLEDGED: 153 * MILLISECOND})
+        summary = tracker.summarise()
+        assert summary[PUBLISH]['p50_ms'] == pytest.approx(100)
+        assert summary[CONSUME]['p99_ms'] == pytest.approx(2)
+        assert summary[ORDER_SENT]['max_ms'] == 0
+        assert summary[ORDER_ACKNOWLEDGED]['p50_ms'] == pytest.approx(50)
+        assert tracker.get_percentile(TOTAL, 50) == pytest.approx(153)
+
+    def test_missing_stages_are_skipped(self):
+        tracker: LatencyTracker = LatencyTracker('EUR_USD', log_interval_seconds=None)
+        tracker.record({CONSUME: 0, SIGNAL: 5 * MILLISECOND})
+        assert set(tracker.summarise()) == {SIGNAL, TOTAL}
+
+    def test_summary_is_logged_periodically(self, capsys):
+        tracker: LatencyTracker = LatencyTracker('EUR_USD', log_interval_seconds=0)
+        tracker.record({CONSUME: 0, SIGNAL: MILLISECOND})
+        assert 'EUR_USD: Latency summary' in capsys.readouterr().out
+        tracker.log_interval_seconds = 3600
+        tracker.record({CONSUME: 0, SIGNAL: MILLISECOND})
+        assert capsys.readouterr().out == ''
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from pandas import DataFrame
+
+from src.model.Granularity import Granularity
+from src.model.Indicator import Indicator
+from src.util.IndicatorEvaluation import IndicatorEvaluation, METRICS
+from src.util.ResultStore import ResultStore, get_result_key, hash_candles
+
+PAIR: str = "EUR_USD"
+
+
+def create_evaluation(total_gain: float, sharpe_ratio: float) -> IndicatorEvaluation:
+    metrics = {metric: 0 for metric in METRICS} | {'total_gain': total_gain, 'sharpe_ratio': sharpe_ratio, 'mean_gain': np.nan}
+    return IndicatorEvaluation.from_metrics(PAIR, metrics)
+
+
+def describe(window: int):
+    parameters = {'short_window': window, 'long_window': 2 * window}
+    description = {'pair': PAIR, 'indicator': Indicator.MA_CROSSOVER, 'granularity': Granularity.M5, 'data_hash': 'hash', 'parameters': parameters}
+    return get_result_key(PAIR, Indicator.MA_CROSSOVER, Granularity.M5, 'hash', parameters), description
+
+
+@pytest.fixture
+def result_store(tmp_path) -> ResultStore:
+    return ResultStore(str(tmp_path / 'results.sqlite'))
+
+
+class TestResultStore:
+    def test_candle_hash_changes_with_the_candles(self, create_candles):
+        candles: DataFrame = create_candles(np.linspace(1.0, 1.1, 10))
+        assert hash_candles(candles) == hash_candles(candles.copy())
+        changed_candles: DataFrame = candles.copy()
+        changed_candles.loc[5, 'bid_c'] += 1e-5
+        assert hash_candles(changed_candles) != hash_candles(candles)
+        assert hash_candles(candles.iloc[:9]) != hash_candles(candles)
+
+    def test_candle_hash_covers_each_dataframe(self, create_candles):
+        candles: DataFrame = create_candles(np.linspace(1.0, 1.1, 10))
+        assert hash_candles(candles, candles.iloc[:5]) != hash_candles(candles)
+        assert hash_candles(candles, candles.iloc[:5]) != hash_candles(candles, candles.iloc[:4])
+        assert hash_candles(candles.iloc[:5], candles) != hash_candles(candles, candles.iloc[:5])
+
+    def test_result_key_depends_on_the_parameters(self):
+        assert describe(4)[0] == describe(4)[0]
+        assert describe(4)[0] != describe(8)[0]
+
+    def test_saved_results_are_returned_in_the_order_of_the_keys(self, result_store):
+        (key_4, description_4), (key_8, description_8) = describe(4), describe(8)
+        result_store.save([(key_4, description_4, create_evaluation(1.0, 0.5)), (key_8, description_8, create_evaluation(2.0, 0.1))])
+        assert result_store.get_stored_keys([key_4, key_8, 'unknown']) == {key_4, key_8}
+        results: DataFrame = result_store.get_results([key_8, 'unknown', key_4])
+        assert list(results['total_gain']) == [2.0, 1.0]
+        assert results['mean_gain'].isna().all()
+        assert results.index.tolist() == [PAIR, PAIR]
+
+    def test_results_are_kept_across_instances_and_replaced_when_saved_again(self, result_store):
+        key, description = describe(4)
+        result_store.save([(key, description, create_evaluation(1.0, 0.5))])
+        result_store.save([(key, description, create_evaluation(3.0, 0.5))])
+        assert list(ResultStore(result_store.filename).get_results([key])['total_gain']) == [3.0]
+
+    def test_results_can_be_queried_by_strategy_and_ordered_by_metric(self, result_store):
+        result_store.save([(*describe(window), create_evaluation(window, sharpe_ratio)) for window, sharpe_ratio in ((4, 0.1), (8, 0.3), (16, np.nan))])
+        results: DataFrame = result_store.query(pair=PAIR, indicator=Indicator.MA_CROSSOVER, order_by='sharpe_ratio', limit=2)
+        assert list(results['total_gain']) == [8, 4]
+        assert result_store.query(indicator=Indicator.INSIDE_BAR_MOMENTUM).empty
+        with pytest.raises(ValueError):
+            result_store.query(order_by='pair; DROP TABLE results')
@@ -0,0 +1,45 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas import DataFrame
+
+from src.util.SharedCandles import SharedCandles, SharedCandlesHandle
+
+
+def attach_and_copy(handle: SharedCandlesHandle) -> Tuple[DataFrame, Dict[str, np.dtype]]:
+    """
+    Attaches the shared candles in a worker process, as the Backtester does, and returns a copy of them along with their dtypes.
+    """
+    candles, shared_memory = handle.attach()
+    try:
+        return candles.copy(), candles.dtypes.to_dict()
+    finally:
+        del candles
+        for memory in shared_memory:
+            memory.close()
+
+
+@pytest.fixture
+def candles(create_candles) -> DataFrame:
+    return create_candles(1 + 0.001 * np.sin(np.arange(100)), volume=np.arange(100), column_step=0.01)
+
+
+class TestSharedCandles:
+    def test_attached_candles_have_the_same_columns_and_values(self, candles):
+        with SharedCandles(candles) as shared_candles:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                attached_candles, dtypes = executor.submit(attach_and_copy, shared_candles.handle).result()
+        assert list(attached_candles.columns) == list(candles.columns)
+        assert dtypes == {'time': np.dtype('datetime64[ns]'), **{column: np.dtype(np.float64) for column in candles.columns[1:]}}
+        pd.testing.assert_frame_equal(attached_candles, candles)
+
+    def test_shared_memory_is_released(self, candles):
+        with SharedCandles(candles) as shared_candles:
+            handle: SharedCandlesHandle = shared_candles.handle
+        for name in (handle.times_name, handle.prices_name):
+            with pytest.raises(FileNotFoundError):
+                SharedMemory(name=name)